@@ -0,0 +1,244 @@
+"""Time the app's data paths on synthetic Airtable tables of several sizes.
+
+Each size gets a generated table behind the in-memory Table stub, then times:
+  sync_full           cold mirror sync of the core and bill-date projections
+  sync_incremental    a sync with nothing changed (modified-since + ID-only pass)
+  read_records        Dataset build, i.e. what airtable_read_records() normalizes
+  bill_dates          lazy normalization of the 72-column bill-date block into a datetime64 matrix
+  record_table        typed column store of the records (built once per data version)
+  write_through       patching ten edited records and one delete into the dataset and its table
+  snapshot_save       writing the dataset and bill-date block as an Arrow snapshot
+  snapshot_load       a restart: mapping the snapshot and reading back records and bill dates
+  overview_analytics  Overview aggregates plus the bill schedule and due counts
+  search_index        issuer/ISIN typeahead index (built once per data version)
+  database_filter     typeahead lookups, prefix and issuer filters, first page of each
+  fuzzy_index         trigram index over issuer/ISIN/GSTIN/email/address (built once per process)
+  fuzzy_update        re-indexing 100 changed records and removing 10
+  fuzzy_search        ranked fuzzy queries: fragments, typos, GSTIN, email and address
+  company_profiles    every issuer's dashboard profile (built once per data version)
+  company_dashboard   dashboard lookups for the largest issuers from the profiles
+
+Results are written as JSON with --json; --baseline compares against an
+earlier file and exits non-zero when a timing regressed by more than
+--tolerance.
+
+Usage: python benchmarks/bench_data_paths.py --records 1000 10000 100000 --json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from reminder.airtable_stub import StubTable
+from reminder.fuzzy import FuzzyIndex, search_rows
+from reminder.analytics import AnalyticsSummary
+from reminder.api import ReminderData, open_mirror
+from reminder.schedule import BillSchedule
+from reminder.snapshot import load_snapshot, save_snapshot
+from reminder.synthetic import make_records
+from reminder.table import RecordTable
+from reminder.profiles import CompanyProfiles
+from reminder.views import SearchIndex, page_frame, select_ids
+
+TODAY = date(2026, 1, 15)  # fixed, so runs on different days compare
+
+
+def best_of(repeat, fn, setup=None):
+    """Best and mean wall time of ``fn(setup())`` over ``repeat`` runs (setup not timed)."""
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn(state)
+        timings.append(time.perf_counter() - start)
+    return min(timings), sum(timings) / len(timings)
+
+
+def bench_size(count, repeat, workdir):
+    started = time.perf_counter()
+    airtable_records = make_records(count, seed=count, today=TODAY)
+    generated = time.perf_counter() - started
+    table = StubTable(airtable_records)
+    timings = {}
+
+    def fresh_mirror(_=None):
+        path = os.path.join(workdir, f"mirror-{count}-{time.perf_counter_ns()}.sqlite3")
+        return open_mirror(path)
+
+    def full_sync(mirror):
+        mirror.sync(table, projections=["core", "bill_dates"], full=True)
+
+    timings["sync_full"] = best_of(repeat, full_sync, fresh_mirror)
+
+    mirror = fresh_mirror()
+    full_sync(mirror)
+    timings["sync_incremental"] = best_of(repeat, lambda _: mirror.sync(table))
+
+    data = ReminderData(mirror)
+    timings["read_records"] = best_of(repeat, lambda _: data.build())
+
+    dataset = data.build()
+    # A fresh dataset per run, since the block is normalized once and then cached.
+    timings["bill_dates"] = best_of(repeat, lambda d: d.bill_dates(), data.build)
+    dataset.bill_dates()
+    normalized = [dataset.record(record_id) for record_id in dataset.ids]
+    timings["record_table"] = best_of(repeat, lambda _: RecordTable(normalized))
+    edited = [dict(r, fields=dict(r["fields"], Status="Closed")) for r in airtable_records[::max(count // 10, 1)]]
+    timings["write_through"] = best_of(repeat, lambda _: dataset.patched(upserts=edited, deletes=[dataset.ids[0]]))
+
+    snapshot_path = os.path.join(workdir, f"snapshot-{count}.arrow")
+    timings["snapshot_save"] = best_of(repeat, lambda _: save_snapshot(dataset, snapshot_path, mirror.mirror_id))
+    timings["snapshot_load"] = best_of(
+        repeat, lambda _: load_snapshot(snapshot_path, mirror.mirror_id).bill_dates()
+    )
+
+    def overview(_):
+        summary = AnalyticsSummary(dataset.table())
+        schedule = BillSchedule.from_dataset(dataset)
+        for days in (7, 30, 90):
+            schedule.count_due_within(days, TODAY)
+        schedule.due_within(7, TODAY)
+        return summary.company_table
+
+    timings["overview_analytics"] = best_of(repeat, overview)
+
+    issuers = sorted(dataset.by_issuer, key=lambda issuer: -len(dataset.by_issuer[issuer]))[:10]
+
+    timings["search_index"] = best_of(repeat, lambda _: SearchIndex(dataset))
+    index = SearchIndex(dataset)
+
+    def database(_):
+        for query, selection in (("", None), (issuers[0][:3], None), ("INE1", None), ("", issuers[0])):
+            index.any.suggest(query, 50)
+            ids = select_ids(dataset, index.any, query, selection)
+            page_frame(dataset, ids, 1, 50)
+
+    timings["database_filter"] = best_of(repeat, database)
+
+    rows = search_rows(airtable_records)
+    timings["fuzzy_index"] = best_of(repeat, lambda _: FuzzyIndex(rows))
+    fuzzy = FuzzyIndex(rows)
+    changed = [dict(row, Address=row["Address"] + " (updated)") for row in rows[:100]]
+    timings["fuzzy_update"] = best_of(
+        repeat, lambda _: (fuzzy.upsert(changed), fuzzy.remove([row["Record ID"] for row in rows[-10:]]))
+    )
+
+    sample = dataset.record(dataset.ids[len(dataset) // 2])
+    queries = [
+        issuers[0][:4], issuers[1].replace(" ", "", 1), sample["Issuer"][:-3] + "xx",
+        sample["ISIN"][:7], sample["GSTIN"][2:9], sample["Email ID"].split("@")[0], sample["Address"][:14],
+    ]
+
+    def fuzzy_search(_):
+        for query in queries:
+            fuzzy.search(query, 100)
+
+    timings["fuzzy_search"] = best_of(repeat, fuzzy_search)
+
+    schedule = BillSchedule.from_dataset(dataset)
+    timings["company_profiles"] = best_of(repeat, lambda _: CompanyProfiles(dataset, schedule))
+    profiles = CompanyProfiles(dataset, schedule)
+
+    def dashboard(_):
+        for issuer in issuers:
+            profile = profiles.get(issuer)
+            profile.upcoming_bills(TODAY), profile.next_bill_date(TODAY), profile.dates_by_year
+
+    timings["company_dashboard"] = best_of(repeat, dashboard)
+
+    bill_cells = sum(1 for record in airtable_records for key in record["fields"] if key.startswith("Bill Date"))
+    results = [
+        {"benchmark": name, "records": count, "seconds": round(best, 6), "mean_seconds": round(mean, 6),
+         "us_per_record": round(best / count * 1e6, 3)}
+        for name, (best, mean) in timings.items()
+    ]
+    info = {"records": count, "issuers": len(dataset.by_issuer), "bill_date_cells": bill_cells,
+            "generate_seconds": round(generated, 3), "stub_requests": table.requests}
+    mirror._conn.close()
+    return results, info
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, tolerance):
+    """Print the change against a baseline file; returns the regressed entries."""
+    with open(baseline_path) as f:
+        baseline = {(r["benchmark"], r["records"]): r["seconds"] for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\nagainst {baseline_path} (tolerance {tolerance:.0%}):")
+    for result in results:
+        before = baseline.get((result["benchmark"], result["records"]))
+        if not before:
+            continue
+        change = result["seconds"] / before - 1
+        flag = "  REGRESSION" if change > tolerance else ""
+        print(f"  {result['benchmark']:<20} {result['records']:>8}  {before:9.4f}s -> {result['seconds']:9.4f}s"
+              f"  {change:+7.1%}{flag}")
+        if flag:
+            regressions.append(result)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="table sizes to run (up to 500000)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="slowdown (fraction) reported as a regression")
+    args = parser.parse_args()
+    # The scalar date fallback warns once per odd format; the timings are what matter here.
+    warnings.filterwarnings("ignore", category=UserWarning, module="reminder.normalize")
+
+    workdir = tempfile.mkdtemp(prefix="reminder-bench-")
+    results, sizes = [], []
+    try:
+        for count in args.records:
+            size_results, info = bench_size(count, args.repeat, workdir)
+            results.extend(size_results)
+            sizes.append(info)
+            print(f"records: {count} ({info['issuers']} issuers, {info['bill_date_cells']} bill dates)")
+            for result in size_results:
+                print(f"  {result['benchmark']:<20} {result['seconds']:9.4f}s  "
+                      f"({result['us_per_record']:.2f} us/record)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "today": TODAY.isoformat(),
+        },
+        "sizes": sizes,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline and compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
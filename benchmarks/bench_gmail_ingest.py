@@ -0,0 +1,100 @@
+"""Time Gmail "ISIN Activated" ingestion against the in-memory Gmail and Airtable stubs.
+
+A mailbox with --emails activation emails (and as many unrelated ones) is
+ingested from scratch, then the run checks the cases a live mailbox hits:
+throttled fetches, a message that always fails, and an expired history cursor
+after someone changed a status by hand.
+
+Usage: python benchmarks/bench_gmail_ingest.py --records 2000 --emails 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reminder.airtable_stub import StubTable
+from reminder.dataset import Dataset
+from reminder.gmail_ingest import ISIN_PATTERN, GmailIngestor
+from reminder.gmail_stub import StubGmailService
+from reminder.ratelimit import TokenBucket
+from reminder.synthetic import make_records
+
+
+def activation_email(isin):
+    return f"<p>Dear client,</p><p>ISIN <b>{isin}</b> has been activated.</p>"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--emails", type=int, default=500)
+    args = parser.parse_args()
+
+    records = make_records(args.records, seed=1)
+    for record in records:
+        record["fields"]["Status"] = "Pending"
+    table = StubTable(records)
+    isins = [isin for isin in dict.fromkeys(r["fields"].get("ISIN", "") for r in records)
+             if ISIN_PATTERN.fullmatch(isin)][:args.emails]
+
+    gmail = StubGmailService()
+    for isin in isins:
+        gmail.add_message("ISIN Activated", activation_email(isin))
+        gmail.add_message("Weekly newsletter", "<p>Nothing to see here.</p>")
+
+    def load():
+        return Dataset(table.all())
+
+    def read(ids):
+        return [table.get(record_id) for record_id in ids]
+
+    state_path = os.path.join(tempfile.mkdtemp(), "gmail_state.json")
+
+    def ingestor():
+        return GmailIngestor(gmail, table, load, read, state_path=state_path,
+                             limiter=TokenBucket(10000, 10000), max_attempts=5)
+
+    # Backlog: every activation email applied, only matching messages fetched in full.
+    gmail.throttle(20)
+    start = time.perf_counter()
+    result = ingestor().poll()
+    elapsed = time.perf_counter() - start
+    active = {r["id"] for r in table.all() if r["fields"].get("Status") == "Active"}
+    assert result.messages == len(isins) and not result.errors and not result.unmatched, result
+    assert active == {r["id"] for r in records if r["fields"].get("ISIN") in set(isins)}
+    assert gmail.fetched["full"] == len(isins), gmail.fetched
+    print(f"backlog:        {elapsed:.2f}s  ({result.messages} emails, {len(result.updated)} records, "
+          f"{gmail.requests} requests, {gmail.batches} batches, fetched {gmail.fetched})")
+
+    # A message that always fails is poisoned; the cursor still moves past it.
+    broken = gmail.add_message("ISIN Activated", activation_email(isins[0]))
+    gmail.break_message(broken, 400)
+    gmail.add_message("ISIN Activated", "<p>No ISIN in this one.</p>")
+    before = ingestor().state.history_id
+    result = ingestor().poll()
+    assert [message_id for message_id, _ in result.poisoned] == [broken] and not result.errors, result
+    assert ingestor().state.history_id != before
+    assert not ingestor().poll().poisoned  # not fetched again
+
+    # Someone closes a record; the history cursor expires; the resync must not reopen it.
+    closed = next(iter(active))
+    table.update(closed, {"Status": "Closed"})
+    gmail.expire_history()
+    result = ingestor().poll()
+    assert not result.updated and not result.errors, result
+    assert table.get(closed)["fields"]["Status"] == "Closed"
+
+    # An activation email that arrives after the expiry still applies.
+    gmail.expire_history()
+    isin = table.get(closed)["fields"]["ISIN"]
+    gmail.add_message("ISIN Activated", activation_email(isin))
+    result = ingestor().poll()
+    assert result.messages == 1 and closed in {r["id"] for r in result.updated}, result
+    print("poison, resync and new-email checks passed")
+
+
+if __name__ == "__main__":
+    main()
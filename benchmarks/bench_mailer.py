@@ -0,0 +1,72 @@
+"""Compare one SMTP connection per message with the pooled mailer, against a local sink.
+
+Usage: python benchmarks/bench_mailer.py --messages 200 --connect-delay 0.05 --pool 4
+"""
+import argparse
+import os
+import smtplib
+import sys
+import time
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reminder.mailer import Mailer, SMTPPool
+from reminder.smtp_sink import SMTPSink
+
+
+def make_messages(count):
+    messages = []
+    for i in range(count):
+        msg = MIMEText(f"Bill {i} is due soon.")
+        msg["From"] = "reminders@example.com"
+        msg["To"] = f"client{i % 50}@example.com"
+        msg["Subject"] = f"Bill digest {i}"
+        messages.append(msg)
+    return messages
+
+
+def send_one_by_one(sink, messages):
+    """What send_otp_email() does: connect, log in, send, quit for every message."""
+    for msg in messages:
+        server = smtplib.SMTP(sink.host, sink.port)
+        server.login("user", "secret")
+        server.send_message(msg)
+        server.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--connect-delay", type=float, default=0.05,
+                        help="seconds the sink stalls per connection (stands in for TLS + login)")
+    parser.add_argument("--pool", type=int, default=4)
+    args = parser.parse_args()
+    messages = make_messages(args.messages)
+
+    with SMTPSink(connect_delay=args.connect_delay) as sink:
+        start = time.perf_counter()
+        send_one_by_one(sink, messages)
+        naive = time.perf_counter() - start
+        naive_connections = sink.connections
+
+    with SMTPSink(connect_delay=args.connect_delay) as sink:
+        pool = SMTPPool(sink.host, sink.port, "user", "secret", size=args.pool, starttls=False)
+        mailer = Mailer(pool, workers=args.pool)
+        start = time.perf_counter()
+        sent, errors = mailer.send_all(messages)
+        pooled = time.perf_counter() - start
+        assert sent == len(messages) and not errors
+        assert len(sink.messages) == len(messages)
+        stats = mailer.stats()
+        pool.close()
+
+    print(f"messages:            {args.messages}")
+    print(f"one connection each: {naive:.2f}s  ({args.messages / naive:.1f} msg/s, {naive_connections} connections)")
+    print(f"pooled mailer:       {pooled:.2f}s  ({args.messages / pooled:.1f} msg/s, "
+          f"{stats['connections_opened']} connections, {stats['reuse_rate']:.1%} reuse)")
+    print(f"speedup:             {naive / pooled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measure the cost of recording metrics on the hot path, alone and under thread contention.
+
+Usage: python benchmarks/bench_metrics.py --calls 200000 --threads 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reminder.metrics import Metrics
+
+
+def per_call(calls, fn):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+
+def contended(calls, threads, fn):
+    def work():
+        for _ in range(calls):
+            fn()
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / (calls * threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    metrics = Metrics()
+
+    def timed_block():
+        with metrics.timer("reminder_page_render_seconds", page="Overview"):
+            pass
+
+    cases = {
+        "inc": lambda: metrics.inc("reminder_cache_lookups_total", cache="analytics"),
+        "observe": lambda: metrics.observe("reminder_read_records_seconds", 0.012),
+        "timer": timed_block,
+    }
+    for name, fn in cases.items():
+        alone = per_call(args.calls, fn)
+        shared = contended(args.calls // args.threads, args.threads, fn)
+        print(f"{name:<8} {alone * 1e6:6.2f} us/call   {shared * 1e6:6.2f} us/call with {args.threads} threads")
+
+    start = time.perf_counter()
+    text = metrics.to_prometheus()
+    print(f"export:  {(time.perf_counter() - start) * 1e3:.2f} ms ({len(text.splitlines())} lines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare per-cell and batch normalization of Airtable records.
+
+Usage: python benchmarks/bench_normalize.py --records 5000 --repeat 3
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reminder.normalize import BILL_DATE_COUNT, normalize_record, normalize_records
+
+
+def random_date_string(rng):
+    """Return a bill date in one of the formats seen in the base."""
+    day, month, year = rng.randint(1, 28), rng.randint(1, 12), rng.randint(2020, 2030)
+    return rng.choice([
+        f"{year}-{month:02d}-{day:02d}",
+        f"{day:02d}/{month:02d}/{year}",
+        f"{day}/{month}/{year}",
+        f"{day:02d}-{month:02d}-{year}",
+        "not a date",
+    ])
+
+
+def make_records(count, seed=0):
+    """Build Airtable-shaped records with sparse bill-date columns."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        fields = {
+            "Issuer": f"Company {i % 500}",
+            "ISIN": f"INE{i:09d}",
+            "Status": rng.choice(["Active", "Pending", "Closed"]),
+            "Amount": rng.choice([0, 1500, "2500.50", ""]),
+            "ISIN allotment date": random_date_string(rng),
+        }
+        for n in range(1, rng.randint(1, BILL_DATE_COUNT) + 1):
+            fields[f"Bill Date {n}"] = random_date_string(rng)
+        records.append({"id": f"rec{i:014d}", "createdTime": "", "fields": fields})
+    return records
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    airtable_records = make_records(args.records)
+
+    per_cell_time, expected = best_of(
+        args.repeat, lambda: [normalize_record(r["fields"]) for r in airtable_records]
+    )
+    batch_time, actual = best_of(args.repeat, lambda: normalize_records(airtable_records))
+
+    if actual != expected:
+        sys.exit("Batch normalization output differs from the per-cell path")
+
+    print(f"records:  {args.records}")
+    print(f"per-cell: {per_cell_time:.3f}s")
+    print(f"batch:    {batch_time:.3f}s")
+    print(f"speedup:  {per_cell_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
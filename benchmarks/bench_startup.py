@@ -0,0 +1,81 @@
+"""Measure cold start of the Streamlit app: import time and login-page first paint.
+
+Each repeat runs in a fresh interpreter, like a new container, and renders the
+login page once (cold) and once more (a rerun). It also lists which heavy
+dependencies the login page pulled in.
+
+Usage: python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["pandas", "numpy", "pyairtable", "googleapiclient", "google_auth_oauthlib", "bs4", "openpyxl"]
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+app = AppTest.from_file({script!r}, default_timeout=60)
+app.run()
+first_paint = time.perf_counter()
+app.run()
+rerun = time.perf_counter()
+print(json.dumps({{
+    "streamlit_import": imported - started,
+    "first_paint": first_paint - imported,
+    "rerun": rerun - first_paint,
+    "errors": [e.message for e in app.exception],
+    "login_form": any(b.label == "Login" for b in app.button),
+    "heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once(env):
+    code = CHILD.format(script=os.path.join(ROOT, "index.py"), heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.update({
+        "SMTP_EMAIL": env.get("SMTP_EMAIL", "bench@example.com"),
+        "SMTP_PASSWORD": env.get("SMTP_PASSWORD", "bench"),
+        "ADMIN_EMAIL": env.get("ADMIN_EMAIL", "bench@example.com"),
+        "AIRTABLE_PERSONAL_ACCESS_TOKEN": env.get("AIRTABLE_PERSONAL_ACCESS_TOKEN", "patBench"),
+        "AIRTABLE_BASE_ID": env.get("AIRTABLE_BASE_ID", "appBench"),
+        "AIRTABLE_TABLE_NAME": env.get("AIRTABLE_TABLE_NAME", "Bench"),
+        "AIRTABLE_MIRROR_PATH": os.path.join(tempfile.mkdtemp(), "mirror.sqlite3"),
+    })
+    runs = [run_once(env) for _ in range(args.repeat)]
+    for run in runs:
+        assert not run["errors"], run["errors"]
+        assert run["login_form"], "login form was not rendered"
+
+    def median(key):
+        return statistics.median(run[key] for run in runs)
+
+    print(f"runs:                      {args.repeat} (fresh interpreter each)")
+    print(f"streamlit import:          {median('streamlit_import'):.3f}s")
+    print(f"login page first paint:    {median('first_paint'):.3f}s")
+    print(f"cold total:                {median('streamlit_import') + median('first_paint'):.3f}s")
+    print(f"login page rerun:          {median('rerun'):.3f}s")
+    print(f"heavy modules on login:    {', '.join(runs[-1]['heavy_modules']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
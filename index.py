@@ -1,24 +1,21 @@
 import streamlit as st
 from datetime import datetime, timedelta
-import uuid
-import pandas as pd
-from pyairtable import Api
 from dotenv import load_dotenv
 import pytz
 import os
 import random
-import smtplib
 import time
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import io
-from streamlit_option_menu import option_menu
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from bs4 import BeautifulSoup
-import base64
 import re
+import html
+# Heavy dependencies (pandas, pyairtable, Google API client, bs4) are imported
+# inside the functions that need them, so the login page renders without them.
+from reminder.mailer import Mailer, SMTPPool, group_by_recipient
+from reminder.metrics import Metrics
+from reminder.api import ReminderData, open_mirror
+from reminder.store import DatasetStore
 
 # --- HIDE STREAMLIT STYLE ---
 hide_st_style = """
@@ -46,6 +43,15 @@ IST = pytz.timezone('Asia/Kolkata')
 AIRTABLE_PERSONAL_ACCESS_TOKEN = os.getenv("AIRTABLE_PERSONAL_ACCESS_TOKEN")
 AIRTABLE_BASE_ID = os.getenv("AIRTABLE_BASE_ID")
 AIRTABLE_TABLE_NAME = os.getenv("AIRTABLE_TABLE_NAME")
+DATASET_REFRESH_SECONDS = int(os.getenv("DATASET_REFRESH_SECONDS", "120"))
+DATASET_RECONCILE_SECONDS = int(os.getenv("DATASET_RECONCILE_SECONDS", str(6 * 60 * 60)))
+AIRTABLE_MIRROR_PATH = os.getenv("AIRTABLE_MIRROR_PATH", os.path.join(".reminder", "airtable_mirror.sqlite3"))
+AIRTABLE_SNAPSHOT_PATH = os.getenv("AIRTABLE_SNAPSHOT_PATH", os.path.join(".reminder", "dataset_snapshot.arrow"))  # "" disables it
+AIRTABLE_FETCH_WORKERS = int(os.getenv("AIRTABLE_FETCH_WORKERS", "4"))
+AIRTABLE_PARTITION_DEPOSITORIES = [d.strip() for d in os.getenv("AIRTABLE_PARTITION_DEPOSITORIES", "NSDL,CDSL").split(",") if d.strip()]
+# Processes that don't run the reminder/Gmail workers retry taking them over this often.
+WORKER_TAKEOVER_SECONDS = int(os.getenv("WORKER_TAKEOVER_SECONDS", "60"))
+IMPORT_CHECKPOINT_DIR = os.getenv("IMPORT_CHECKPOINT_DIR", os.path.join(".reminder", "imports"))
 
 # -------- AUTHENTICATION CONFIG -------- #
 AUTH_USERNAME = os.getenv("AUTH_USERNAME", "admin")
@@ -54,13 +60,100 @@ AUTH_PASSWORD = os.getenv("AUTH_PASSWORD", "admin")
 # -------- EMAIL OTP CONFIG -------- #
 SMTP_EMAIL = os.getenv("SMTP_EMAIL")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
-SMTP_SERVER = "smtp.gmail.com"
-SMTP_PORT = 587
+SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() != "false"
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
 ADMIN_EMAIL = os.getenv("ADMIN_EMAIL")
 
+# -------- BILL REMINDER CONFIG -------- #
+REMINDER_EMAIL = os.getenv("REMINDER_EMAIL", ADMIN_EMAIL)
+REMINDER_LEAD_DAYS = int(os.getenv("REMINDER_LEAD_DAYS", "7"))
+REMINDER_STATE_PATH = os.getenv("REMINDER_STATE_PATH", os.path.join(".reminder", "scheduler_state.json"))
+
 # -------- GOOGLE API CONFIG -------- #
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 SUBJECT_FILTER = "ISIN Activated"
+GMAIL_TOKEN_FILE = os.getenv("GMAIL_TOKEN_FILE", "token.json")
+GMAIL_STATE_PATH = os.getenv("GMAIL_STATE_PATH", os.path.join(".reminder", "gmail_state.json"))
+GMAIL_POLL_SECONDS = int(os.getenv("GMAIL_POLL_SECONDS", "300"))
+GMAIL_ACTIVATED_STATUS = os.getenv("GMAIL_ACTIVATED_STATUS", "Active")
+GMAIL_BACKFILL_DAYS = int(os.getenv("GMAIL_BACKFILL_DAYS", "30"))  # emails the first run applies
+
+# -------- METRICS CONFIG -------- #
+METRICS_PATH = os.getenv("METRICS_PATH", os.path.join(".reminder", "metrics.prom"))  # "" disables the file
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # serves /metrics on localhost when set
+METRICS_ADMINS = [u.strip() for u in os.getenv("METRICS_ADMINS", AUTH_USERNAME).split(",") if u.strip()]
+
+# -------- METRICS -------- #
+@st.cache_resource
+def get_metrics():
+    """Process-wide metrics registry, exported in Prometheus text format."""
+    metrics = Metrics()
+    metrics.describe("reminder_page_render_seconds", "Time to render a page, by page.")
+    metrics.describe("reminder_read_records_seconds", "Time spent in airtable_read_records().")
+    metrics.describe("reminder_dataframe_build_seconds", "Time to build a derived frame, by frame.")
+    metrics.describe("reminder_smtp_send_seconds", "Time from first attempt to outcome per email.")
+    metrics.describe("reminder_cache_lookups_total", "Lookups of shared derived caches.")
+    metrics.describe("reminder_cache_misses_total", "Lookups that had to build the value.")
+    metrics.describe("reminder_metrics_export_errors_total", "Failed metrics file writes or endpoint starts.")
+    metrics.start_exporter(path=METRICS_PATH, port=METRICS_PORT)
+    return metrics
+
+def delivery_observer(mailer_name):
+    """``Mailer.on_delivery`` callback recording SMTP send time."""
+    metrics = get_metrics()
+
+    def on_delivery(seconds, error):
+        result = "ok" if error is None else "error"
+        metrics.observe("reminder_smtp_send_seconds", seconds, mailer=mailer_name, result=result)
+    return on_delivery
+
+def mailer_collector(mailer_name, mailer):
+    """Export-time samples from ``Mailer.stats()``."""
+    def collect():
+        stats = mailer.stats()
+        labels = {"mailer": mailer_name}
+        return [
+            ("reminder_mailer_sent_total", "counter", "Emails delivered.", labels, stats["sent"]),
+            ("reminder_mailer_failed_total", "counter", "Emails given up on.", labels, stats["failed"]),
+            ("reminder_mailer_retries_total", "counter", "Delivery retries.", labels, stats["retried"]),
+            ("reminder_mailer_connections_total", "counter", "SMTP sessions opened.", labels, stats["connections_opened"]),
+            ("reminder_mailer_queued", "gauge", "Emails waiting to be sent.", labels, stats["queued"]),
+        ]
+    return collect
+
+def is_admin():
+    """Whether the logged-in user may see the performance panel."""
+    return st.session_state.get("username") in METRICS_ADMINS
+
+def metrics_panel():
+    """Sidebar summary of the hot-path metrics (admins only)."""
+    metrics = get_metrics()
+    if metrics.exporter_error is not None:
+        st.caption(f"⚠️ Metrics export failed: {metrics.exporter_error}")
+    for cache in ("analytics", "bill_schedule", "company_profiles", "search_index"):
+        miss_rate = metrics.ratio("reminder_cache_misses_total", "reminder_cache_lookups_total", cache=cache)
+        if miss_rate is not None:
+            st.caption(f"🗃️ {cache} cache: {1 - miss_rate:.0%} hits")
+    rows = [
+        {
+            "Metric": row["metric"].replace("reminder_", ""),
+            "Labels": ", ".join(f"{k}={v}" for k, v in row["labels"].items()),
+            "Count": row["count"],
+            "Avg ms": row["avg_ms"],
+            "Max ms": row["max_ms"],
+            "Total": row["value"],
+        }
+        for row in metrics.snapshot()
+    ]
+    if rows:
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+    else:
+        st.caption("No measurements yet.")
+    targets = [t for t in (METRICS_PATH, f"http://127.0.0.1:{METRICS_PORT}/metrics" if METRICS_PORT else "") if t]
+    if targets:
+        st.caption("Prometheus export: " + ", ".join(targets))
 
 # -------- EMAIL FUNCTIONS -------- #
 def generate_otp():
@@ -119,42 +212,115 @@ def create_otp_email_template(otp):
     """
     return html_template
 
-def send_otp_email(to_email, otp):
-    """Send OTP via email using SMTP"""
-    try:
-        msg = MIMEMultipart('alternative')
-        msg['From'] = SMTP_EMAIL
-        msg['To'] = to_email
-        msg['Subject'] = f"🔐 Login OTP: {otp} - Reminder System"
-        
-        html_content = create_otp_email_template(otp)
-        html_part = MIMEText(html_content, 'html')
-        
-        text_content = f"""
-        Reminder System - Login OTP
-        
-        Your One-Time Password: {otp}
-        
-        This OTP expires in 5 minutes.
-        Do not share this code with anyone.
-        
-        Time: {datetime.now(IST).strftime('%Y-%m-%d %H:%M:%S IST')}
-        """
-        text_part = MIMEText(text_content, 'plain')
-        
-        msg.attach(text_part)
-        msg.attach(html_part)
-        
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_EMAIL, SMTP_PASSWORD)
-        server.send_message(msg)
-        server.quit()
-        
-        return True, "OTP sent successfully to your email!"
-        
-    except Exception as e:
-        return False, f"Failed to send email: {str(e)}"
+@st.cache_resource
+def get_otp_mailer():
+    """Single-session mailer for OTPs, so a code never waits behind reminder digests."""
+    pool = SMTPPool(
+        SMTP_SERVER, SMTP_PORT, SMTP_EMAIL, SMTP_PASSWORD,
+        size=1, starttls=SMTP_STARTTLS,
+    )
+    mailer = Mailer(pool, workers=1, max_attempts=2, on_delivery=delivery_observer("otp"))
+    get_metrics().register(mailer_collector("otp", mailer))
+    return mailer.start()
+
+def create_otp_email(to_email, otp):
+    """Build the OTP email message"""
+    msg = MIMEMultipart('alternative')
+    msg['From'] = SMTP_EMAIL
+    msg['To'] = to_email
+    msg['Subject'] = f"🔐 Login OTP: {otp} - Reminder System"
+
+    html_content = create_otp_email_template(otp)
+    html_part = MIMEText(html_content, 'html')
+
+    text_content = f"""
+    Reminder System - Login OTP
+
+    Your One-Time Password: {otp}
+
+    This OTP expires in 5 minutes.
+    Do not share this code with anyone.
+
+    Time: {datetime.now(IST).strftime('%Y-%m-%d %H:%M:%S IST')}
+    """
+    text_part = MIMEText(text_content, 'plain')
+
+    msg.attach(text_part)
+    msg.attach(html_part)
+    return msg
+
+def dispatch_otp_email(to_email, otp):
+    """Queue the OTP email and return its delivery ticket (a Future: True or the error)."""
+    return get_otp_mailer().submit(create_otp_email(to_email, otp))
+
+@st.cache_resource
+def get_mailer():
+    """Shared SMTP session pool and send queue for reminder emails."""
+    pool = SMTPPool(
+        SMTP_SERVER, SMTP_PORT, SMTP_EMAIL, SMTP_PASSWORD,
+        size=SMTP_POOL_SIZE, starttls=SMTP_STARTTLS,
+    )
+    mailer = Mailer(pool, workers=SMTP_POOL_SIZE, on_delivery=delivery_observer("reminders"))
+    get_metrics().register(mailer_collector("reminders", mailer))
+    return mailer.start()
+
+def create_reminder_digest(to_email, reminders):
+    """Build one digest email listing every bill coming due for a recipient."""
+    rows = "".join(
+        f"<tr><td>{html.escape(r.issuer)}</td><td>{html.escape(r.column)}</td>"
+        f"<td>{r.bill_date.strftime('%d-%m-%Y')}</td></tr>"
+        for r in sorted(reminders, key=lambda r: (r.bill_date, r.issuer))
+    )
+    html_content = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2>📅 Upcoming Bills</h2>
+        <p>The following {len(reminders)} bill(s) are due within {REMINDER_LEAD_DAYS} days:</p>
+        <table border="1" cellpadding="6" style="border-collapse: collapse;">
+            <tr><th>Issuer</th><th>Bill</th><th>Due Date</th></tr>
+            {rows}
+        </table>
+        <p style="color: #7f8c8d; font-size: 12px;">This is an automated email from Reminder System</p>
+    </body>
+    </html>
+    """
+    text_content = "\n".join(
+        f"{r.issuer} - {r.column} due {r.bill_date.strftime('%d-%m-%Y')}" for r in reminders
+    )
+
+    msg = MIMEMultipart('alternative')
+    msg['From'] = SMTP_EMAIL
+    msg['To'] = to_email
+    msg['Subject'] = f"📅 {len(reminders)} bill(s) due soon - Reminder System"
+    msg.attach(MIMEText(text_content, 'plain'))
+    msg.attach(MIMEText(html_content, 'html'))
+    return msg
+
+def send_reminder_digests(mailer, reminders):
+    """Send one digest per Email ID (REMINDER_EMAIL for records without one).
+
+    When some digests fail, raises NotifyError with only their reminders
+    (addressed to the recipients that failed), so the scheduler retries those
+    without re-sending digests that already went out.
+    """
+    from reminder.scheduler import NotifyError
+    digests = group_by_recipient(reminders, fallback=REMINDER_EMAIL)
+    tickets = {
+        to_email: mailer.submit(create_reminder_digest(to_email, items))
+        for to_email, items in digests.items()
+    }
+    failed, errors = {}, []
+    for to_email, ticket in tickets.items():
+        result = ticket.result()
+        if result is not True:
+            errors.append(result)
+            for reminder in digests[to_email]:
+                failed.setdefault(reminder, []).append(to_email)
+    if errors:
+        raise NotifyError(
+            f"{len(errors)} of {len(tickets)} digest(s) failed: {errors[0]}",
+            [reminder._replace(email=", ".join(addresses)) for reminder, addresses in failed.items()],
+        )
 
 # -------- AUTHENTICATION FUNCTIONS -------- #
 def init_session_state():
@@ -173,14 +339,40 @@ def init_session_state():
         st.session_state.login_attempts = 0
     if 'otp_attempts' not in st.session_state:
         st.session_state.otp_attempts = 0
+    if 'otp_ticket' not in st.session_state:
+        st.session_state.otp_ticket = None
     if 'page' not in st.session_state:
         st.session_state.page = "Overview"
+    if 'username' not in st.session_state:
+        st.session_state.username = None
 
 def is_otp_expired():
     """Check if OTP has expired"""
     if st.session_state.otp_expiry is None:
         return True
     return datetime.now() > st.session_state.otp_expiry
+def otp_delivery_status():
+    """Show how the OTP email went; only polls while it is still being sent."""
+    ticket = st.session_state.otp_ticket
+    if ticket is not None and not ticket.done():
+        otp_sending_status()
+    elif ticket is None or ticket.result() is True:
+        st.info("Please check your email for the verification code.")
+    else:
+        st.error(f"❌ Failed to send email: {ticket.result()}")
+
+@st.fragment(run_every=1)
+def otp_sending_status():
+    """Poll the OTP delivery ticket without blocking the rest of the page.
+
+    Once it settles, rerun the page so the final status renders outside this
+    fragment and the polling stops.
+    """
+    ticket = st.session_state.otp_ticket
+    if ticket is None or ticket.done():
+        st.rerun()
+    st.info("📨 Sending verification email...")
+
 def check_authentication():
     """Improved authentication system with pre-loading and smoother UI transition."""
     init_session_state()
@@ -214,19 +406,18 @@ def check_authentication():
                 
                 if login_submitted:
                     if username == AUTH_USERNAME and password == AUTH_PASSWORD:
-                        with st.spinner("Sending verification email..."):
-                            otp = generate_otp()
-                            success, message = send_otp_email(ADMIN_EMAIL, otp)
-                            
-                            if success:
-                                st.session_state.credentials_verified = True
-                                st.session_state.otp_code = otp
-                                st.session_state.otp_sent = True
-                                st.session_state.otp_expiry = datetime.now() + timedelta(minutes=5)
-                                st.session_state.otp_attempts = 0
-                                st.rerun()
-                            else:
-                                st.error(f"❌ {message}")
+                        # Send the code and warm up the shared dataset at the same time
+                        otp = generate_otp()
+                        st.session_state.otp_ticket = dispatch_otp_email(ADMIN_EMAIL, otp)
+                        warm_up_dataset()
+
+                        st.session_state.credentials_verified = True
+                        st.session_state.username = username
+                        st.session_state.otp_code = otp
+                        st.session_state.otp_sent = True
+                        st.session_state.otp_expiry = datetime.now() + timedelta(minutes=5)
+                        st.session_state.otp_attempts = 0
+                        st.rerun()
                     else:
                         st.session_state.login_attempts += 1
                         st.error(f"❌ Invalid credentials. Attempt {st.session_state.login_attempts}/5")
@@ -236,22 +427,18 @@ def check_authentication():
 
         elif st.session_state.otp_sent and not is_otp_expired():
             st.markdown("---")
+            otp_delivery_status()
             with st.form("otp_form"):
                 st.markdown("<h3 style='text-align: center;'>Email Verification</h3>", unsafe_allow_html=True)
-                st.info("Please check your email for the verification code.")
-                
+
                 entered_otp = st.text_input("Enter 6-digit verification code", max_chars=6, placeholder="Enter 6-digit code", label_visibility="collapsed")
                 
                 otp_submitted = st.form_submit_button("Verify", type="primary", use_container_width=True)
                 
                 if otp_submitted:
                     if entered_otp == st.session_state.otp_code:
-                        with st.spinner("Preparing your dashboard..."):
-                            airtable_read_records()
-                        
                         st.session_state.authenticated = True
-                        st.success("✅ Login successful!")
-                        time.sleep(1)
+                        st.session_state.otp_ticket = None
                         st.rerun()
                     else:
                         st.session_state.otp_attempts += 1
@@ -282,7 +469,41 @@ def logout():
     st.rerun()  
 
 # -------- AIRTABLE SETUP -------- #
-table = Api(AIRTABLE_PERSONAL_ACCESS_TOKEN).table(AIRTABLE_BASE_ID, AIRTABLE_TABLE_NAME)
+@st.cache_resource
+def get_airtable_client():
+    """Shared Airtable client: one rate limit, connection pool and metrics for the process."""
+    from reminder.client import AirtableClient
+    client = AirtableClient(AIRTABLE_PERSONAL_ACCESS_TOKEN, AIRTABLE_BASE_ID, AIRTABLE_TABLE_NAME)
+
+    def collect():
+        samples = []
+        for stats in client.stats():
+            labels = {"call": stats["call"]}
+            samples += [
+                ("reminder_airtable_calls_total", "counter", "Airtable client calls.", labels, stats["calls"]),
+                ("reminder_airtable_errors_total", "counter", "Airtable client calls that failed.", labels, stats["errors"]),
+                ("reminder_airtable_requests_total", "counter", "HTTP requests (pages) sent.", labels, stats["requests"]),
+                ("reminder_airtable_retries_total", "counter", "HTTP requests retried.", labels, stats["retries"]),
+                ("reminder_airtable_seconds_total", "counter", "Time spent in Airtable calls.", labels, stats["total_seconds"]),
+                ("reminder_airtable_max_seconds", "gauge", "Slowest Airtable call.", labels, stats["max_seconds"]),
+                ("reminder_airtable_throttled_seconds_total", "counter", "Time waiting on the rate limit.", labels, stats["throttled_seconds"]),
+            ]
+        return samples
+
+    get_metrics().register(collect)
+    return client
+
+@st.cache_resource
+def get_airtable_mirror():
+    """Open the local SQLite mirror shared by all sessions.
+
+    Core fields are always synced; the bill-date block only once a page needs it.
+    """
+    return open_mirror(
+        AIRTABLE_MIRROR_PATH,
+        depositories=AIRTABLE_PARTITION_DEPOSITORIES,
+        max_workers=AIRTABLE_FETCH_WORKERS,
+    )
 
 def get_ist_now():
     """Get current time in IST"""
@@ -295,70 +516,333 @@ def convert_to_ist(dt):
     else:
         return dt.astimezone(IST)
 
-# -------- HELPER FUNCTIONS -------- #
-def safe_float(value):
-    """Safely convert value to float, return 0.0 if conversion fails"""
-    if value is None or value == "":
-        return 0.0
-    try:
-        return float(value)
-    except (ValueError, TypeError):
-        return 0.0
-
-def safe_date_string(date_str):
-    """Safely format date string, return empty string if invalid"""
-    if not date_str:
-        return ""
-    try:
-        if isinstance(date_str, str):
-            # Added dayfirst=True to correctly parse D/M/Y formats
-            parsed_date = pd.to_datetime(date_str, errors='coerce', dayfirst=True) 
-            if pd.isna(parsed_date):
-                return ""
-            return parsed_date.strftime('%Y-%m-%d')
-        return date_str
-    except:
-        return ""
-
 # -------- AIRTABLE HELPERS (FINAL VERSION) -------- #
-@st.cache_data(ttl=120)
-def airtable_read_records():
-    """Read and clean Airtable records using case-insensitive lookup."""
+@st.cache_resource
+def get_dataset_store():
+    """Start the process-wide dataset store; it re-syncs the mirror in the background."""
+    # Incremental sync normally; a full refetch only when it's time to reconcile
+    data = ReminderData(
+        get_airtable_mirror(), get_airtable_client(),
+        reconcile_after=timedelta(seconds=DATASET_RECONCILE_SECONDS),
+        snapshot_path=AIRTABLE_SNAPSHOT_PATH,
+    )
+
+    def load(previous):
+        dataset = data.refresh(previous)
+        if previous is None and data.restored:
+            store.request_refresh()  # served from the snapshot; reconcile with Airtable right away
+        return dataset
+
+    store = DatasetStore(load, interval=DATASET_REFRESH_SECONDS)
+
+    def collect():
+        samples = [("reminder_dataset_refreshes_total", "counter", "Background dataset refreshes.", {}, store.refresh_count)]
+        if store.ready:
+            samples += [
+                ("reminder_dataset_age_seconds", "gauge", "Age of the dataset snapshot.", {}, round(store.age, 3)),
+                ("reminder_dataset_refresh_seconds", "gauge", "Duration of the last refresh.", {}, round(store.last_refresh_duration, 3)),
+            ]
+        return samples
+
+    get_metrics().register(collect)
+    return store.start()
+
+def load_dataset():
+    """Return the last good dataset snapshot without waiting on Airtable."""
     try:
-        airtable_records = table.all()
-        records = []
-        
-        for r in airtable_records:
-            f = r.get("fields", {})
-            f_lower = {k.lower(): v for k, v in f.items()}
-            
-            record = {
-                "Depository": str(f_lower.get("depository", "")).strip(),
-                "ISIN": str(f_lower.get("isin", "")).strip(),
-                "Issuer": str(f_lower.get("issuer", "")).strip(),
-                "ARN": str(f_lower.get("arn if isin na (nsdl)", "")).strip(),
-                "Status": str(f_lower.get("status", "")).strip(),
-                "No of ISINs": str(f_lower.get("no of isin", "")).strip(),
-                "ISIN Allotment Date": safe_date_string(f_lower.get("isin allotment date", "")),
-                "GSTIN": str(f_lower.get("gstin", "")).strip(),
-                "Address": str(f_lower.get("address", "")).strip(),
-                "Company Link": str(f_lower.get("company link", "")).strip(),
-                "Email ID": str(f_lower.get("email id", "")).strip(),
-                "Company Referred By": str(f_lower.get("company referred by", "")).strip(),
-                "Amount": safe_float(f_lower.get("amount", 0)),
-            }
-            
-            for i in range(1, 73):
-                field_name = f"bill date {i}"
-                display_name = f"Bill Date {i}"
-                record[display_name] = safe_date_string(f_lower.get(field_name, ""))
-            
-            records.append(record)
-            
-        return records
+        return get_dataset_store().get()
     except Exception as e:
         st.error(f"Error reading Airtable records: {str(e)}")
+        from reminder.dataset import Dataset
+        return Dataset([], version=-1)
+
+@st.cache_resource
+def get_bill_dates_lock():
+    """Lock so only one session fetches the bill-date block the first time."""
+    return threading.Lock()
+
+def load_bill_dataset():
+    """Return the dataset including the bill-date block, fetching the block on first use."""
+    dataset = load_dataset()
+    if dataset.has_bill_dates or dataset.version < 0:
+        return dataset
+    with get_bill_dates_lock():
+        dataset = load_dataset()
+        if not dataset.has_bill_dates:
+            mirror = get_airtable_mirror()
+            with st.spinner("Loading bill dates..."):
+                try:
+                    if "bill_dates" not in mirror.active_projections():  # else the mirror has them already
+                        mirror.sync(get_airtable_client(), projections=["bill_dates"])
+                except Exception as e:
+                    st.error(f"Error reading bill dates: {str(e)}")
+                    return dataset
+                store = get_dataset_store()
+                store.refresh()
+                dataset = store.get()
+    return dataset
+
+def warm_up_dataset():
+    """Start loading the dataset and the fuzzy index in the background (used at login).
+
+    Bill dates stay lazy: load_bill_dataset() fetches them for the views that need them.
+    """
+    store = get_dataset_store()
+    mirror = get_airtable_mirror()
+    fuzzy = get_fuzzy_index()
+
+    def prefetch_fuzzy_index():
+        try:
+            store.get()
+        except Exception:
+            return  # fuzzy_search_ids() starts the build once a page has data
+        start_fuzzy_index(fuzzy, mirror)
+
+    threading.Thread(target=prefetch_fuzzy_index, name="fuzzy-index-prefetch", daemon=True).start()
+
+@st.cache_resource(show_spinner=False)
+def get_reminder_scheduler():
+    """Start the bill reminder scheduler thread, or return None when SMTP is not configured."""
+    if not (SMTP_EMAIL and SMTP_PASSWORD):
+        return None
+    from reminder.scheduler import ReminderScheduler
+    table = get_airtable_client()
+    mirror = get_airtable_mirror()
+    store = get_dataset_store()
+    lock = get_bill_dates_lock()
+    mailer = get_mailer()
+    scheduler = ReminderScheduler(
+        lambda reminders: send_reminder_digests(mailer, reminders),
+        lead_days=REMINDER_LEAD_DAYS,
+        tz=IST,
+        state_path=REMINDER_STATE_PATH,
+    )
+
+    def on_change(changed, deleted):
+        scheduler.upsert(changed)
+        scheduler.remove(deleted)
+
+    def fetch_bill_dates():
+        # Seeded from the bill dates the mirror already holds; fetch the projection
+        # only if no bill-date view has yet. The mirror listener upserts what it changes.
+        with lock:
+            if "bill_dates" not in mirror.active_projections():
+                mirror.sync(table, projections=["bill_dates"])
+                store.request_refresh()
+
+    mirror.subscribe(on_change)
+    return scheduler.start(mirror.records, backfill=fetch_bill_dates)
+
+@st.cache_resource(show_spinner=False)
+def get_gmail_ingestor():
+    """Start the Gmail "ISIN Activated" worker, or return None without a Gmail token."""
+    if not os.path.exists(GMAIL_TOKEN_FILE):
+        return None
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import build
+    from reminder.gmail_ingest import GmailIngestor
+    credentials = Credentials.from_authorized_user_file(GMAIL_TOKEN_FILE, SCOPES)
+    service = build("gmail", "v1", credentials=credentials, cache_discovery=False)
+    mirror = get_airtable_mirror()
+    store = get_dataset_store()
+
+    def on_updated(records):
+        apply_writes(mirror, store, upserts=records)
+
+    ingestor = GmailIngestor(
+        service, get_airtable_client(), store.get, mirror.records,
+        state_path=GMAIL_STATE_PATH,
+        subject=SUBJECT_FILTER,
+        status=GMAIL_ACTIVATED_STATUS,
+        on_updated=on_updated,
+        backfill_days=GMAIL_BACKFILL_DAYS,
+    )
+    return ingestor.start(GMAIL_POLL_SECONDS)
+
+@st.cache_resource
+def get_leader_lock(path):
+    """Process-lifetime lock file electing the one process that runs a worker."""
+    from reminder.leader import LeaderLock
+    return LeaderLock(path)
+
+@st.cache_resource
+def start_background_workers():
+    """Start the reminder scheduler and Gmail ingestion off the request path, in one process only.
+
+    Called only after login, so the login page never imports what they need.
+    Each worker starts only in the process holding its lock (next to its
+    state file); the others stand by and retry every WORKER_TAKEOVER_SECONDS,
+    taking over if that process exits. Returns the dict the sidebar reads:
+    each worker stays None until started here (or when it is not configured),
+    and ``standby`` names the ones another process runs.
+    """
+    workers = {"scheduler": None, "ingestor": None, "error": None, "standby": set()}
+    # Resolve the shared resources they use here, in the script thread.
+    get_airtable_client(), get_airtable_mirror(), get_dataset_store(), get_bill_dates_lock()
+    pending = {
+        "scheduler": (get_leader_lock(REMINDER_STATE_PATH + ".lock"), get_reminder_scheduler),
+        "ingestor": (get_leader_lock(GMAIL_STATE_PATH + ".lock"), get_gmail_ingestor),
+    }
+
+    def run():
+        while pending:
+            for name, (lock, start) in list(pending.items()):
+                try:
+                    if not lock.acquire():
+                        workers["standby"].add(name)
+                        continue
+                    workers["standby"].discard(name)
+                    del pending[name]
+                    workers[name] = start()
+                except Exception as e:
+                    workers["error"] = e
+            if pending:
+                time.sleep(WORKER_TAKEOVER_SECONDS)
+
+    threading.Thread(target=run, name="background-workers", daemon=True).start()
+    return workers
+
+def apply_writes(mirror, store, upserts=(), deletes=()):
+    """Apply records returned by Airtable writes to the mirror, then to the shared dataset.
+
+    The mirror is written first and without the store's refresh lock, so a
+    save never waits on a background sync.
+    """
+    upserts, deletes = list(upserts), list(deletes)
+    version = mirror.apply(upserts, deletes)
+
+    def patch(dataset):
+        if dataset.version >= version and not dataset.partial:
+            return dataset  # built from the mirror after the write
+        return dataset.patched(upserts, deletes, version=version)
+
+    store.update(patch)
+
+def write_through(upserts=(), deletes=()):
+    """Apply records returned by Airtable writes to the mirror and the shared dataset."""
+    apply_writes(get_airtable_mirror(), get_dataset_store(), upserts, deletes)
+
+def airtable_read_records():
+    """Read the shared dataset of cleaned records."""
+    with get_metrics().timer("reminder_read_records_seconds"):
+        return load_dataset()
+
+@st.cache_resource(max_entries=1)
+def get_bill_schedule(_dataset, data_version):
+    """Build the sorted bill schedule once per data version (shared by all sessions)."""
+    from reminder.schedule import BillSchedule
+    metrics = get_metrics()
+    metrics.inc("reminder_cache_misses_total", cache="bill_schedule")
+    with metrics.timer("reminder_dataframe_build_seconds", frame="bill_schedule"):
+        return BillSchedule.from_dataset(_dataset)
+
+def load_bill_schedule(dataset=None):
+    """Return the bill schedule matching the given (default: current) dataset."""
+    dataset = dataset or load_bill_dataset()
+    get_metrics().inc("reminder_cache_lookups_total", cache="bill_schedule")
+    return get_bill_schedule(dataset, dataset.version)
+
+@st.cache_resource(max_entries=1)
+def get_analytics_summary(_dataset, data_version):
+    """Compute the Overview aggregates once per data version (shared by all sessions)."""
+    from reminder.analytics import AnalyticsSummary
+    metrics = get_metrics()
+    metrics.inc("reminder_cache_misses_total", cache="analytics")
+    with metrics.timer("reminder_dataframe_build_seconds", frame="analytics"):
+        return AnalyticsSummary(_dataset.table())
+
+def load_analytics_summary():
+    """Return the Overview aggregates matching the current dataset."""
+    dataset = load_dataset()
+    get_metrics().inc("reminder_cache_lookups_total", cache="analytics")
+    return get_analytics_summary(dataset, dataset.version)
+
+@st.cache_resource(max_entries=1)
+def get_company_profiles(_dataset, _schedule, data_version):
+    """Build every issuer's dashboard profile once per data version (shared by all sessions)."""
+    from reminder.profiles import CompanyProfiles
+    metrics = get_metrics()
+    metrics.inc("reminder_cache_misses_total", cache="company_profiles")
+    with metrics.timer("reminder_dataframe_build_seconds", frame="company_profiles"):
+        return CompanyProfiles(_dataset, _schedule)
+
+def load_company_profiles():
+    """Return the company profiles matching the current dataset."""
+    dataset = load_bill_dataset()
+    get_metrics().inc("reminder_cache_lookups_total", cache="company_profiles")
+    return get_company_profiles(dataset, load_bill_schedule(dataset), dataset.version)
+
+@st.cache_resource(max_entries=1)
+def get_search_index(_dataset, data_version):
+    """Build the issuer/ISIN typeahead indexes once per data version (shared by all sessions)."""
+    from reminder.views import SearchIndex
+    metrics = get_metrics()
+    metrics.inc("reminder_cache_misses_total", cache="search_index")
+    with metrics.timer("reminder_dataframe_build_seconds", frame="search_index"):
+        return SearchIndex(_dataset)
+
+def load_search_index(dataset):
+    """Return the typeahead indexes matching the given dataset."""
+    get_metrics().inc("reminder_cache_lookups_total", cache="search_index")
+    return get_search_index(dataset, dataset.version)
+
+@st.cache_resource
+def get_fuzzy_index():
+    """Fuzzy record index shared by all sessions, updated in place from mirror changes."""
+    from reminder.fuzzy import FuzzyIndex, search_rows
+    index = FuzzyIndex()
+
+    def on_change(changed, deleted):
+        index.upsert(search_rows(changed))
+        index.remove(deleted)
+
+    get_airtable_mirror().subscribe(on_change)
+    get_metrics().register(lambda: [
+        ("reminder_fuzzy_index_records", "gauge", "Records in the fuzzy search index.", {}, len(index)),
+    ])
+    return index
+
+def start_fuzzy_index(index, mirror):
+    """Build the fuzzy index from the synced mirror in the background (no-op once started)."""
+    from reminder.fuzzy import search_rows
+    return index.start(lambda: search_rows(mirror.records()))
+
+FUZZY_LIMIT = 100
+
+def fuzzy_search_ids(dataset, query):
+    """Record ids closest to ``query`` by issuer, ISIN, GSTIN, email or address, best first."""
+    from reminder.views import closest_ids
+    index = start_fuzzy_index(get_fuzzy_index(), get_airtable_mirror())
+    if not index.ready:
+        st.caption("⏳ Fuzzy search is still being built; try again in a moment.")
         return []
+    with get_metrics().timer("reminder_fuzzy_search_seconds"):
+        ids = closest_ids(dataset, index, query, FUZZY_LIMIT)
+    if not ids:
+        st.caption("No matches.")
+    return ids
+
+TYPEAHEAD_LIMIT = 50
+
+def typeahead(label, index, key, top_option, placeholder="Start typing an issuer or ISIN..."):
+    """Text box plus a short suggestion list served from a prefix index.
+
+    Only the first TYPEAHEAD_LIMIT matches are sent to the browser. Returns
+    ``(query, selection)``; selection is None while ``top_option`` is chosen.
+    """
+    query = st.text_input(label, key=f"{key}_query", placeholder=placeholder)
+    if not query.strip():
+        return query, None
+    count = index.count(query)
+    if not count:
+        return query, None
+    shown = f"first {TYPEAHEAD_LIMIT} of {count}" if count > TYPEAHEAD_LIMIT else f"{count}"
+    selection = st.selectbox(
+        f"Matches ({shown})",
+        options=[top_option] + index.suggest(query, TYPEAHEAD_LIMIT),
+        key=f"{key}_pick",
+    )
+    return query, (None if selection == top_option else selection)
 
 
 # def display_kpi_card(title, value, mom_change):
@@ -394,13 +878,11 @@ def overview_page():
     st.title("Overview")
     
     # Data is pre-loaded during login, so no spinner is needed here.
-    records = airtable_read_records()
+    dataset = airtable_read_records()
     
-    if records:
+    if len(dataset):
         try:
-            df = pd.DataFrame(records)
-            df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce').fillna(0.0)
-            analytics_df = df.copy()
+            summary = load_analytics_summary()
 
             # ===== ANALYTICS SECTION (Now includes KPIs) =====
             st.subheader("Analytics")
@@ -433,11 +915,11 @@ def overview_page():
             # --- Row 2: Core Metrics ---
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Total Records", len(df))
+                st.metric("Total Records", summary.total_records)
             with col2:
-                st.metric("Unique Companies", df['Issuer'].nunique())
+                st.metric("Unique Companies", summary.unique_companies)
             with col3:
-                total_bill_amount = analytics_df['Amount'].sum()
+                total_bill_amount = summary.total_amount
                 show_amount = st.checkbox("Show Total Value", value=False)
                 if show_amount:
                     st.metric("Total Billing value", f"₹{total_bill_amount:,.2f}")
@@ -449,78 +931,48 @@ def overview_page():
             # ===== New Entries Analysis =====
             st.subheader("New contracts")
             
-            incomplete_entries = analytics_df[
-                (analytics_df['ARN'].fillna('').str.strip() == '') &
-                (analytics_df['Issuer'].fillna('').str.strip() != '') &
-                (analytics_df['ISIN'].fillna('').str.strip() != '')
-            ]
+            incomplete_count = summary.incomplete_count
             
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("📥 New/Incomplete Entries", len(incomplete_entries))
+                st.metric("📥 New/Incomplete Entries", incomplete_count)
             with col2:
-                st.metric("⏳ Pending Completion", len(incomplete_entries))
+                st.metric("⏳ Pending Completion", incomplete_count)
             
-            if len(incomplete_entries) > 0:
-                with st.expander(f"🔍 View Incomplete Records ({len(incomplete_entries)} records)", expanded=False):
+            if incomplete_count > 0:
+                with st.expander(f"🔍 View Incomplete Records ({incomplete_count} records)", expanded=False):
                     st.write("**Records requiring completion:**")
-                    incomplete_display = incomplete_entries[['Issuer', 'ISIN', 'Status']].copy()
-                    st.dataframe(incomplete_display, use_container_width=True)
+                    st.dataframe(summary.incomplete, use_container_width=True)
             
             # ===== Bill Due Analysis =====
             st.subheader("📅 Bill Due Date Analysis")
             
             current_date = datetime.now().date()
-            bill_dates = []
-            for index, row in analytics_df.iterrows():
-                issuer_name = row['Issuer']
-                for i in range(1, 73):
-                    bill_date_col = f'Bill Date {i}'
-                    if bill_date_col in row and pd.notna(row[bill_date_col]) and row[bill_date_col] != '':
-                        try:
-                            bill_date = datetime.strptime(row[bill_date_col], '%Y-%m-%d').date()
-                            if bill_date >= current_date:
-                                days_until_due = (bill_date - current_date).days
-                                bill_dates.append({
-                                    'Issuer': issuer_name,
-                                    'Bill Date': bill_date,
-                                    'Days Until Due': days_until_due
-                                })
-                        except:
-                            continue
+            schedule = load_bill_schedule()
+            total_upcoming = schedule.count_upcoming(current_date)
             
-            if bill_dates:
-                bills_df = pd.DataFrame(bill_dates)
-                due_1_week = bills_df[bills_df['Days Until Due'] <= 7]
-                due_1_month = bills_df[bills_df['Days Until Due'] <= 30]
-                due_3_months = bills_df[bills_df['Days Until Due'] <= 90]
+            if total_upcoming:
+                due_1_week = schedule.due_within(7, current_date)
                 
                 col1, col2, col3, col4 = st.columns(4)
                 with col1: st.metric("🚨 Due in 1 Week", len(due_1_week))
-                with col2: st.metric("⚠️ Due in 1 Month", len(due_1_month))
-                with col3: st.metric("📋 Due in 3 Months", len(due_3_months))
-                with col4: st.metric("📊 Total Upcoming Bills", len(bills_df))
+                with col2: st.metric("⚠️ Due in 1 Month", schedule.count_due_within(30, current_date))
+                with col3: st.metric("📋 Due in 3 Months", schedule.count_due_within(90, current_date))
+                with col4: st.metric("📊 Total Upcoming Bills", total_upcoming)
                 
                 if len(due_1_week) > 0:
                     with st.expander(f"🚨 View Urgent Bills ({len(due_1_week)} bills due in 1 week)", expanded=False):
-                        st.dataframe(due_1_week.sort_values('Days Until Due'), use_container_width=True)
+                        st.dataframe(due_1_week, use_container_width=True)
             else:
                 st.info("No upcoming bill dates found in the database.")
             
             # ===== Company-wise Analysis =====
             st.subheader("🏢 Company-wise Analysis")
-            company_counts = analytics_df.groupby('Issuer').agg({
-                'ISIN': 'count',
-                'Amount': 'sum',
-                'ARN': lambda x: (x.fillna('').str.strip() != '').sum()
-            }).round(2)
-            
-            company_counts.columns = ['Total Records', 'Total Bill Amount', 'Completed Records']
-            company_counts['Completion Rate'] = (company_counts['Completed Records'] / company_counts['Total Records'] * 100).round(1)
-            company_counts['Total Bill Amount'] = company_counts['Total Bill Amount'].apply(lambda x: f"₹{x:,.2f}")
+            company_counts = summary.company_table
             
             with st.expander(f"📊 View Company-wise Analysis ({len(company_counts)} companies)", expanded=False):
-                st.dataframe(company_counts.sort_values('Total Records', ascending=False), use_container_width=True)
+                amounts = company_counts["Total Bill Amount"].map(lambda x: f"₹{x:,.2f}")
+                st.dataframe(company_counts.assign(**{"Total Bill Amount": amounts}), use_container_width=True)
             
             # # ===== Status Distribution =====
             # st.subheader("📊 Status Distribution")
@@ -529,120 +981,104 @@ def overview_page():
             
             # ===== Status Distribution =====
             st.subheader("📊 Status Distribution")
-            status_distribution = analytics_df['Status'].value_counts()
+            status_distribution = summary.status_counts
 
             # Create columns for each status. The number of columns adjusts to the number of unique statuses.
             cols = st.columns(len(status_distribution))
 
             # Iterate through the statuses and display each one in its own column as a metric.
-            for i, (status, count) in enumerate(status_distribution.items()):
+            for i, (status, count) in enumerate(status_distribution):
                 with cols[i]:
                     st.metric(label=status, value=count)
 
 
             # ===== Financial Health Indicators =====
             st.subheader("💡 Financial Health Indicators")
-            avg_bill_amount = analytics_df['Amount'].mean()
-            high_value_clients = len(analytics_df[analytics_df['Amount'] > avg_bill_amount * 2])
-            
             col1, col2, col3, col4 = st.columns(4)
-            with col1: st.metric("💰 Average Bill Amount", f"₹{avg_bill_amount:,.2f}")
-            with col2: st.metric("🌟 High Value Clients", high_value_clients)
-            with col3: st.metric("📊 Median Bill Amount", f"₹{analytics_df['Amount'].median():,.2f}")
-            with col4: st.metric("🏢 Active Companies", len(analytics_df[analytics_df['Amount'] > 0]))
+            with col1: st.metric("💰 Average Bill Amount", f"₹{summary.average_amount:,.2f}")
+            with col2: st.metric("🌟 High Value Clients", summary.high_value_clients)
+            with col3: st.metric("📊 Median Bill Amount", f"₹{summary.median_amount:,.2f}")
+            with col4: st.metric("🏢 Active Companies", summary.active_companies)
                 
         except Exception as e:
             st.error(f"Error displaying database: {str(e)}")
             st.info("Raw data preview:")
-            st.json(records[:3] if len(records) > 0 else {})
+            st.json(dataset.table().take(range(min(3, len(dataset)))).to_dict("records"))
     else:
         st.info("No records found in the database.")
 
 def database_page():
+    from reminder.views import PAGE_SIZES, page_count, page_frame, select_ids
+
     st.title("Database")
     
     # Data is pre-loaded during login
-    records = airtable_read_records()
+    dataset = load_dataset()
     
-    if records:
+    if len(dataset):
         try:
-            df = pd.DataFrame(records)
-            # Create a numeric 'Amount' column for calculations before formatting
-            df['NumericAmount'] = pd.to_numeric(df['Amount'], errors='coerce').fillna(0.0)
+            index = load_search_index(dataset)
 
             # --- Main Database View ---
             st.subheader("All Records")
             
-            # 1. Create a list for the main filter dropdown
-            issuer_list = sorted(df['Issuer'].unique())
-            isin_list = sorted(df['ISIN'].unique())
-            search_options_top = ["— Select to Filter by Issuer or ISIN —"] + issuer_list + isin_list
-
-            search_selection_top = st.selectbox(
-                "🔍 **Filter Table**",
-                options=search_options_top
+            # 1. Typeahead filter: a prefix keeps every match, a suggestion narrows to one value
+            query, selection = typeahead(
+                "🔍 **Filter Table**", index.any, key="db_filter", top_option="— All matches —"
             )
-
-            # 2. Filter the DataFrame for the main table view
-            if search_selection_top != "— Select to Filter by Issuer or ISIN —":
-                filtered_df = df[
-                    (df['Issuer'] == search_selection_top) | 
-                    (df['ISIN'] == search_selection_top)
-                ].copy()
-            else:
-                filtered_df = df.copy()
-            
-            # Format 'Amount' for display in the main table
-            filtered_df['Amount'] = filtered_df['NumericAmount'].apply(lambda x: f"₹{x:,.2f}" if x > 0 else "₹0.00")
-            
-            # Configure columns to hide
-            column_config_main = { 'NumericAmount': None } # Hide the numeric amount column
-            for i in range(2, 73):
-                column_config_main[f"Bill Date {i}"] = None
+            ids = select_ids(dataset, index.any, query, selection)
+            if not ids and query.strip():
+                # No issuer/ISIN prefix matched: fall back to the closest records, best first
+                ids = fuzzy_search_ids(dataset, query)
+                if ids:
+                    st.caption(f"No issuer or ISIN starts with that — {len(ids)} closest records by issuer, ISIN, GSTIN, email or address.")
+
+            # 2. Only the visible page is built and sent to the browser
+            nav_col1, nav_col2, nav_col3 = st.columns([1, 1, 2])
+            with nav_col1:
+                page_size = st.selectbox("Rows per page", PAGE_SIZES, key="db_page_size")
+            pages = page_count(len(ids), page_size)
+            if st.session_state.get("db_page", 1) > pages:
+                st.session_state.db_page = pages
+            with nav_col2:
+                page = st.number_input("Page", min_value=1, max_value=pages, step=1, key="db_page")
+            with nav_col3:
+                first_row = (page - 1) * page_size + 1 if ids else 0
+                st.caption(f"Rows {first_row}–{min(page * page_size, len(ids))} of {len(ids)} ({pages} pages)")
+
+            with get_metrics().timer("reminder_dataframe_build_seconds", frame="database"):
+                page_df = page_frame(dataset, ids, page, page_size)
 
             st.dataframe(
-                filtered_df.drop(columns=['NumericAmount']),
+                page_df,
                 use_container_width=True,
                 height=400,
                 hide_index=True,
-                column_config=column_config_main
+                column_config={'Record ID': None} # Hide the record id column
             )
 
             # --- Company Performance Dashboard Section ---
             st.divider()
             st.header("Company Performance Dashboard")
 
-            # 1. Create a second dropdown for the performance section
-            search_options_bottom = ["— Search for a Company to see its Performance —"] + issuer_list
-            
-            selection_bottom = st.selectbox(
-                "🏢 **Select a Company**", 
-                options=search_options_bottom
+            # 1. Second typeahead, over issuers only
+            _, selection_bottom = typeahead(
+                "🏢 **Select a Company**", index.issuers, key="db_company",
+                top_option="— Choose a company —", placeholder="Start typing a company name...",
             )
 
             # 2. If a company is selected, display its dashboard
-            if selection_bottom != "— Search for a Company to see its Performance —":
-                company_df = df[df['Issuer'] == selection_bottom].copy()
-                
-                # --- Calculate Metrics ---
-                total_billed_amount = company_df['NumericAmount'].sum()
-                total_records = len(company_df)
-                
-                all_dates = []
-                for i in range(1, 73):
-                    date_col = f'Bill Date {i}'
-                    # Coerce to datetime, invalid dates will become NaT
-                    valid_dates = pd.to_datetime(company_df[date_col], errors='coerce').dropna()
-                    all_dates.extend(valid_dates.tolist())
-                
-                all_dates = sorted(list(set(all_dates))) # Get unique sorted dates
-                
-                first_bill_date = all_dates[0] if all_dates else None
-                last_bill_date = all_dates[-1] if all_dates else None
-                
-                # Count upcoming bills
-                today = pd.Timestamp.now()
-                upcoming_bills_count = sum(1 for date in all_dates if date > today)
+            if selection_bottom is not None:
+                # --- Look up the precomputed profile ---
+                profile = load_company_profiles().get(selection_bottom)
+                if profile is None:
+                    st.info("This company's profile will be available after the next data refresh.")
+                    return
+                today = datetime.now().date()
+                total_billed_amount = profile.total_billed_amount
+                total_records = profile.total_records
+                first_bill_date = profile.first_bill_date
+                upcoming_bills_count = profile.upcoming_bills(today)
 
 
                 # --- Display Metrics ---
@@ -652,19 +1088,16 @@ def database_page():
                 metric_cols[1].metric("Total Records / ISINs", f"{total_records}")
                 metric_cols[2].metric("Upcoming Bills", f"{upcoming_bills_count}")
                 metric_cols[3].metric("First Bill Date", first_bill_date.strftime('%b %d, %Y') if first_bill_date else "N/A")
+                next_bill_date = profile.next_bill_date(today)
+                if next_bill_date:
+                    st.caption(f"⏭️ Next bill: {next_bill_date.strftime('%b %d, %Y')} · Last bill: {profile.last_bill_date.strftime('%b %d, %Y')}")
                 
                 # --- Display Bill Dates by Year ---
                 st.subheader("Billing History")
 
-                if all_dates:
-                    dates_by_year = {}
-                    for date in all_dates:
-                        year = date.year
-                        if year not in dates_by_year:
-                            dates_by_year[year] = []
-                        dates_by_year[year].append(date.strftime('%B %d, %Y'))
-                    
-                    for year in sorted(dates_by_year.keys(), reverse=True):
+                dates_by_year = profile.dates_by_year  # latest year first
+                if dates_by_year:
+                    for year in dates_by_year:
                         with st.expander(f"🗓️ **{year}** ({len(dates_by_year[year])} bills)"):
                             st.write(dates_by_year[year])
                 else:
@@ -673,7 +1106,7 @@ def database_page():
         except Exception as e:
             st.error(f"Error displaying database page: {str(e)}")
             st.info("Raw data preview:")
-            st.json(records[:3] if len(records) > 0 else {})
+            st.json(dataset.table().take(range(min(3, len(dataset)))).to_dict("records"))
     else:
         st.info("No records found in the database.")
 
@@ -732,14 +1165,144 @@ def new_entry_page():
                             "Bill Date 1": bill_date_1.strftime("%Y-%m-%d") if bill_date_1 else None,
                         }
                         
-                        table.create(new_record_data)
+                        created = get_airtable_client().create(new_record_data)
+                        write_through(upserts=[created])
                         st.success("✅ New entry created successfully!")
-                        airtable_read_records.clear()
                         
                 except Exception as e:
                     st.error(f"Failed to create new entry: {e}")
-        
+
+def bulk_import_page():
+    import pandas as pd
+    from reminder.bulk_import import ImportCheckpoint, iter_rows, map_columns, pending_rows, run_import, validate_rows
+
+    st.title("Bulk Import")
+    st.write("Upload a CSV or Excel file with one record per row. Column headers are matched to the New Record fields; **Issuer** and **ISIN** are required.")
+
+    uploaded_file = st.file_uploader("Records file", type=["csv", "xlsx"])
+    if uploaded_file is None:
+        return
+
+    # The file is streamed twice (validate now, import on click); its rows are never all held in memory.
+    def valid_rows(errors=None):
+        return validate_rows(iter_rows(uploaded_file, uploaded_file.name), mapping, errors)
+
+    try:
+        first_row = next(iter_rows(uploaded_file, uploaded_file.name), None)
+    except Exception as e:
+        st.error(f"❌ Could not read file: {e}")
+        return
+    if first_row is None:
+        st.warning("The file has no data rows.")
+        return
+
+    mapping, unmatched = map_columns(first_row.keys())
+    st.caption("Mapped columns: " + ", ".join(f"{header} → {field}" for header, field in mapping.items()))
+    if unmatched:
+        st.warning(f"Ignored columns: {', '.join(str(h) for h in unmatched)}")
+
+    existing_isins = load_dataset().by_isin
+    # Scoped to this file's contents: re-uploading it after an interrupted import resumes it.
+    checkpoint = ImportCheckpoint(ImportCheckpoint.path_for(IMPORT_CHECKPOINT_DIR, uploaded_file.getvalue()))
+    row_errors, valid_count = [], 0
+
+    def count_valid(rows):
+        nonlocal valid_count
+        for row in rows:
+            valid_count += 1
+            yield row
+
+    try:
+        new_count = sum(1 for _ in pending_rows(count_valid(valid_rows(row_errors)), existing_isins, checkpoint))
+    except Exception as e:
+        st.error(f"❌ Could not read file: {e}")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Rows in File", valid_count + len(row_errors))
+    col2.metric("✅ Ready to Import", new_count)
+    col3.metric("⏭️ Already in Table", valid_count - new_count)
+    col4.metric("❌ Invalid Rows", len(row_errors))
+    if row_errors:
+        with st.expander(f"🔍 View Invalid Rows ({len(row_errors)} rows)", expanded=False):
+            st.dataframe(pd.DataFrame(row_errors, columns=["Row", "Problem"]), use_container_width=True, hide_index=True)
+
+    if new_count and st.button(f"Import {new_count} Records", type="primary"):
+        progress = st.progress(0.0, text="Importing...")
+
+        def on_progress(finished, total):
+            progress.progress(finished / total, text=f"Imported {finished}/{total} batches")
+
+        result = run_import(
+            get_airtable_client(), valid_rows(), checkpoint=checkpoint,
+            existing_isins=existing_isins, total=new_count, on_progress=on_progress,
+        )
+        write_through(upserts=result.created)
+        checkpoint.discard()  # the created records are in the dataset now
+
+        if result.errors:
+            st.error(f"❌ {len(result.errors)} rows failed. Fix them and upload the file again: rows whose ISIN is already in the table are skipped, so only the missing rows are sent.")
+            st.dataframe(pd.DataFrame(result.errors, columns=["Row", "Problem"]), use_container_width=True, hide_index=True)
+        st.success(f"✅ Created {result.created_count} records ({result.skipped_rows} rows already in the table were skipped).")
+
+def bulk_edit_section(dataset):
+    """Set Status and/or ARN on many records at once through batch_update."""
+    import pandas as pd
+    from reminder.bulk_update import build_diffs, run_bulk_update
+
+    st.subheader("Bulk Edit")
+
+    # Typeahead over the shared ISIN index; picks accumulate in the session, so only
+    # the first TYPEAHEAD_LIMIT matches and the picked ISINs are sent to the browser.
+    chosen = st.session_state.setdefault("bulk_edit_isins", [])
+    _, selection = typeahead(
+        "🔍 **Find ISINs to update**", load_search_index(dataset).isins,
+        key="bulk_edit_search", top_option="— Choose an ISIN to add —", placeholder="Start typing an ISIN...",
+    )
+    if selection is not None and selection not in chosen and st.button(f"➕ Add {selection}"):
+        chosen.append(selection)
+    selected_isins = st.multiselect("Selected ISINs", options=chosen, default=chosen)
+    st.session_state.bulk_edit_isins = selected_isins
+    pasted_isins = st.text_area("Or paste ISINs (one per line or comma-separated)", height=100)
+    isins = list(dict.fromkeys(selected_isins + [i.strip() for i in re.split(r"[,\s]+", pasted_isins) if i.strip()]))
+    unknown_isins = [isin for isin in isins if isin not in dataset.by_isin]
+    if unknown_isins:
+        st.warning(f"Not found: {', '.join(unknown_isins)}")
+    record_ids = [record_id for isin in isins for record_id in dataset.by_isin.get(isin, [])]
+
+    col1, col2 = st.columns(2)
+    with col1:
+        new_status = st.text_input("Set Status", placeholder="Leave blank to keep")
+    with col2:
+        new_arn = st.text_input("Set ARN if ISIN NA (NSDL)", placeholder="Leave blank to keep")
+
+    changes = {}
+    if new_status.strip():
+        changes["Status"] = new_status.strip()
+    if new_arn.strip():
+        changes["ARN if ISIN NA (NSDL)"] = new_arn.strip()
+    if not record_ids or not changes:
+        return
+
+    diffs = build_diffs(get_airtable_mirror().records(record_ids), changes)
+    st.caption(f"{len(diffs)} of {len(record_ids)} selected records will change.")
+    if diffs and st.button(f"✅ Update {len(diffs)} Records", type="primary"):
+        progress = st.progress(0.0, text="Updating...")
+
+        def on_progress(finished, total):
+            progress.progress(finished / total, text=f"Updated {finished}/{total} batches")
+
+        result = run_bulk_update(get_airtable_client(), diffs, on_progress=on_progress)
+        write_through(upserts=result.updated)
+
+        if result.errors:
+            st.error(f"❌ {len(result.errors)} records failed to update.")
+            st.dataframe(pd.DataFrame(result.errors, columns=["Record ID", "Problem"]), use_container_width=True, hide_index=True)
+        st.success(f"✅ Updated {len(result.updated)} records.")
+
 def edit_page():
+    from reminder.normalize import safe_float
+
     st.title("Edit or Delete a Record")
 
     # Initialize session state to hold the selected record's data
@@ -749,42 +1312,47 @@ def edit_page():
         st.session_state.selected_record_id = None
 
     # --- Data Loading and Search UI ---
-    records = airtable_read_records()
-    if not records:
+    dataset = load_dataset()
+    if not len(dataset):
         st.error("No records found in the database.")
         return
 
-    # Create a list of unique issuers and ISINs for the dropdown
-    df = pd.DataFrame(records)
-    issuer_list = sorted(df['Issuer'].unique())
-    isin_list = sorted(df['ISIN'].unique())
-    search_options = ["— Search by Issuer or ISIN to Edit/Delete —"] + issuer_list + isin_list
-
-    # Use a dropdown for a fast search experience
-    search_selection = st.selectbox(
-        "🔍 **Find a record to edit or delete**",
-        options=search_options,
-        index=0 # Default to the placeholder
+    edit_mode = st.radio("Mode", ["Single Record", "Bulk Edit"], horizontal=True, label_visibility="collapsed")
+    if edit_mode == "Bulk Edit":
+        bulk_edit_section(dataset)
+        return
+
+    # Typeahead over the shared issuer/ISIN index for a fast search experience
+    search_index = load_search_index(dataset).any
+    search_query, search_selection = typeahead(
+        "🔍 **Find a record to edit or delete**", search_index,
+        key="edit_search", top_option="— Choose a match to Edit/Delete —",
     )
 
+    # Nothing starts with the query: offer the closest records by issuer, ISIN, GSTIN, email or address
+    closest = []
+    if search_selection is None and search_query.strip() and not search_index.count(search_query):
+        closest = fuzzy_search_ids(dataset, search_query)
+
     # --- Find and Display the Edit Form ---
-    if search_selection != "— Search by Issuer or ISIN to Edit/Delete —":
-        # Find the full record details from the original list
-        # We need the Airtable record ID which isn't in the DataFrame
-        raw_airtable_records = table.all()
-        
-        found_record = None
+    if search_selection is not None or closest:
+        # Resolve the selection through the issuer/ISIN indexes of the cached dataset
+        matching_ids = dataset.ids_for(search_selection) if search_selection is not None else closest
         airtable_id = None
 
-        for rec in raw_airtable_records:
-            fields = rec.get("fields", {})
-            if fields.get("Issuer") == search_selection or fields.get("ISIN") == search_selection:
-                found_record = fields
-                airtable_id = rec.get("id")
-                break
+        if len(matching_ids) > 1:
+            airtable_id = st.selectbox(
+                f"{len(matching_ids)} {'closest records' if closest else 'records match'} — choose one",
+                options=matching_ids,
+                format_func=lambda rid: f"{dataset.record(rid)['Issuer']} — {dataset.record(rid)['ISIN']} ({dataset.record(rid)['Status'] or 'No status'})",
+            )
+        elif matching_ids:
+            airtable_id = matching_ids[0]
         
-        if found_record:
-            st.session_state.selected_record_to_edit = found_record
+        # The form needs the raw Airtable fields, which only the mirror keeps.
+        found = get_airtable_mirror().records([airtable_id]) if airtable_id else []
+        if found:
+            st.session_state.selected_record_to_edit = found[0]["fields"]
             st.session_state.selected_record_id = airtable_id
         else:
             st.warning("Record not found.")
@@ -844,9 +1412,9 @@ def edit_page():
                         "No of ISIN": int(no_of_isins),
                         "ISIN allotment date": isin_allotment_date.strftime("%Y-%m-%d") if isin_allotment_date else None,
                     }
-                    table.update(st.session_state.selected_record_id, updated_data)
+                    updated = get_airtable_client().update(st.session_state.selected_record_id, updated_data)
+                    write_through(upserts=[updated])
                     st.success("✅ Record updated successfully!")
-                    airtable_read_records.clear()
                     st.session_state.selected_record_to_edit = None # Clear selection
                     time.sleep(1)
                     st.rerun()
@@ -856,9 +1424,9 @@ def edit_page():
             # --- Delete Logic ---
             if delete_submitted:
                 try:
-                    table.delete(st.session_state.selected_record_id)
+                    get_airtable_client().delete(st.session_state.selected_record_id)
+                    write_through(deletes=[st.session_state.selected_record_id])
                     st.success("❌ Record deleted successfully!")
-                    airtable_read_records.clear()
                     st.session_state.selected_record_to_edit = None # Clear selection
                     time.sleep(1)
                     st.rerun()
@@ -870,11 +1438,14 @@ def edit_page():
 if not check_authentication():
     st.stop()
 
+# Reminders and Gmail ingestion run per process, not per login; cached, so a no-op after the first start.
+workers = start_background_workers()
+
 with st.sidebar:
     st.markdown("<h1 style='text-align: center; color: #0d6efd;'>NIVIS</h1>", unsafe_allow_html=True)
     
-    pages = ["Overview", "Database", "New Record", "Edit Record", "Logout"]
-    icons = ["speedometer2", "table", "plus-square-dotted", "pencil-square", "box-arrow-right"]
+    pages = ["Overview", "Database", "New Record", "Bulk Import", "Edit Record", "Logout"]
+    icons = ["speedometer2", "table", "plus-square-dotted", "cloud-upload", "pencil-square", "box-arrow-right"]
 
     try:
         default_index = pages.index(st.session_state.page)
@@ -882,6 +1453,7 @@ with st.sidebar:
         default_index = 0
         st.session_state.page = pages[default_index]
 
+    from streamlit_option_menu import option_menu
     selected_page = option_menu(
         menu_title=None,
         options=pages,
@@ -908,13 +1480,51 @@ with st.sidebar:
         st.session_state.page = selected_page
         st.rerun()
 
-if st.session_state.page == "Logout":
-    logout()
-elif st.session_state.page == "Overview":
-    overview_page()
-elif st.session_state.page == "Database":
-    database_page()
-elif st.session_state.page == "New Record":
-    new_entry_page()
-elif st.session_state.page == "Edit Record":
-    edit_page()
+    store = get_dataset_store()
+    if store.ready:
+        st.caption(f"🔄 Data refreshed {store.age:.0f}s ago (took {store.last_refresh_duration:.1f}s)")
+    else:
+        st.caption("🔄 Loading data...")
+
+    if workers["error"] is not None:
+        st.caption(f"⚠️ Background workers failed to start: {workers['error']}")
+
+    scheduler = workers["scheduler"]
+    if "scheduler" in workers["standby"]:
+        st.caption("⏰ Reminders are sent by another app process")
+    if scheduler is not None and scheduler.last_error is not None:
+        st.caption(f"⏰ Reminders failed: {scheduler.last_error}")
+    elif scheduler is not None:
+        st.caption(f"⏰ {len(scheduler)} reminders scheduled, {scheduler.fired_count} sent")
+        mail_stats = get_mailer().stats()
+        if mail_stats["sent"] or mail_stats["failed"]:
+            st.caption(
+                f"📨 {mail_stats['sent']} emails sent, {mail_stats['failed']} failed "
+                f"({mail_stats['messages_per_second']}/s, {mail_stats['reuse_rate']:.0%} connection reuse)"
+            )
+
+    ingestor = workers["ingestor"]
+    if "ingestor" in workers["standby"]:
+        st.caption("📧 Gmail sync runs in another app process")
+    if ingestor is not None and ingestor.last_error is not None:
+        st.caption(f"📧 Gmail sync failed: {ingestor.last_error}")
+    elif ingestor is not None and ingestor.last_result is not None:
+        st.caption(f"📧 Gmail sync: {len(ingestor.last_result.updated)} records activated")
+
+    if is_admin():
+        with st.expander("📈 Performance"):
+            metrics_panel()
+
+with get_metrics().timer("reminder_page_render_seconds", page=st.session_state.page):
+    if st.session_state.page == "Logout":
+        logout()
+    elif st.session_state.page == "Overview":
+        overview_page()
+    elif st.session_state.page == "Database":
+        database_page()
+    elif st.session_state.page == "New Record":
+        new_entry_page()
+    elif st.session_state.page == "Bulk Import":
+        bulk_import_page()
+    elif st.session_state.page == "Edit Record":
+        edit_page()
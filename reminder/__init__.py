@@ -0,0 +1 @@
+"""Streamlit-free data layer for the Reminder app."""
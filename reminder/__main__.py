@@ -0,0 +1,5 @@
+import sys
+
+from reminder.cli import main
+
+sys.exit(main())
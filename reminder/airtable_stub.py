@@ -0,0 +1,228 @@
+"""In-memory stand-in for the parts of pyairtable's ``Table`` the app uses."""
+import copy
+import itertools
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+PAGE_SIZE = 100  # records per Airtable list request
+
+_TOKEN = re.compile(r"\s*(?:(\{[^}]*\})|('(?:[^'\\]|\\.)*')|([A-Z_]+)|(\()|(\))|(,)|(=))")
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _now_stamp():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+class _Formula:
+    """The small formula subset the app sends: field equality, AND/OR/NOT,
+    and IS_BEFORE/IS_AFTER on CREATED_TIME() or LAST_MODIFIED_TIME()."""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = []
+        position = 0
+        while position < len(text):
+            match = _TOKEN.match(text, position)
+            if not match or match.end() == position:
+                if text[position:].strip():
+                    raise ValueError(f"Unsupported formula: {text}")
+                break
+            self.tokens.append(match.groups())
+            position = match.end()
+        self.position = 0
+        self.evaluate = self._expression()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unsupported formula: {text}")
+
+    def _next(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def _expect(self, index):
+        token = self._next()
+        if token[index] is None:
+            raise ValueError(f"Unsupported formula: {self.text}")
+        return token[index]
+
+    def _expression(self):
+        field, string, name = self._next()[:3]
+        if field is not None:
+            self._expect(6)
+            value = re.sub(r"\\(.)", r"\1", self._expect(1)[1:-1])
+            field = field[1:-1]
+            return lambda record, modified: str(record["fields"].get(field, "")) == value
+        if name is None:
+            raise ValueError(f"Unsupported formula: {self.text}")
+        self._expect(3)
+        args = []
+        while self.tokens[self.position][4] is None:
+            if name == "DATETIME_PARSE":
+                stamp = _parse_time(self._expect(1)[1:-1])
+                args.append(lambda record, modified, stamp=stamp: stamp)
+            else:
+                args.append(self._expression())
+            if self.tokens[self.position][5] is not None:
+                self.position += 1
+        self._expect(4)
+
+        if name == "AND":
+            return lambda r, m: all(arg(r, m) for arg in args)
+        if name == "OR":
+            return lambda r, m: any(arg(r, m) for arg in args)
+        if name == "NOT":
+            return lambda r, m: not args[0](r, m)
+        if name == "IS_BEFORE":
+            return lambda r, m: args[0](r, m) < args[1](r, m)
+        if name == "IS_AFTER":
+            return lambda r, m: args[0](r, m) > args[1](r, m)
+        if name == "CREATED_TIME":
+            return lambda r, m: _parse_time(r["createdTime"])
+        if name == "LAST_MODIFIED_TIME":
+            return lambda r, m: m
+        if name == "DATETIME_PARSE":
+            return args[0]
+        raise ValueError(f"Unsupported formula function {name}: {self.text}")
+
+
+class StubTable:
+    """Airtable table held in memory, answering like ``pyairtable.Table``.
+
+    Supports ``all``/``iterate``/``first``/``get`` with ``fields=``,
+    ``formula=`` and ``max_records=``, and single and batch writes. Formulas
+    are limited to what the mirror and partitioned fetches send. ``latency``
+    seconds are spent per request (a page of 100 records on reads), so fetch
+    strategies can be compared without the network; ``requests`` counts them.
+    With a ``schema`` (list of field names), ``fields=`` naming any other
+    field is rejected the way Airtable answers 422 UNKNOWN_FIELD_NAME.
+    """
+
+    def __init__(self, records=(), latency=0.0, schema=None):
+        self.latency = latency
+        self.schema = list(schema) if schema is not None else None
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._records = {}
+        self._modified = {}
+        self._ids = itertools.count(1)
+        for record in records:
+            self._records[record["id"]] = {
+                "id": record["id"], "createdTime": record["createdTime"], "fields": dict(record["fields"]),
+            }
+            # Seeded records count as unmodified since they were created.
+            self._modified[record["id"]] = _parse_time(record["createdTime"])
+
+    def __len__(self):
+        return len(self._records)
+
+    def _request(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    # -------- READS -------- #
+    def field_names(self):
+        if self.schema is not None:
+            return list(self.schema)
+        with self._lock:
+            return sorted({name for record in self._records.values() for name in record["fields"]})
+
+    def iterate(self, fields=None, formula=None, max_records=None, page_size=PAGE_SIZE, **options):
+        unknown = [name for name in fields or () if self.schema is not None and name not in self.schema]
+        if unknown:
+            raise ValueError(f"422 UNKNOWN_FIELD_NAME: {unknown[0]!r}")
+        match = _Formula(formula).evaluate if formula else None
+        with self._lock:
+            rows = [
+                record for record in self._records.values()
+                if match is None or match(record, self._modified[record["id"]])
+            ]
+        if max_records is not None:
+            rows = rows[:max_records]
+        wanted = set(fields) if fields else None
+        for start in range(0, max(len(rows), 1), page_size):
+            self._request()
+            yield [
+                {
+                    "id": record["id"],
+                    "createdTime": record["createdTime"],
+                    "fields": (
+                        dict(record["fields"]) if wanted is None
+                        else {k: v for k, v in record["fields"].items() if k in wanted}
+                    ),
+                }
+                for record in rows[start:start + page_size]
+            ]
+
+    def all(self, **options):
+        return [record for page in self.iterate(**options) for record in page]
+
+    def first(self, **options):
+        records = self.all(max_records=1, **options)
+        return records[0] if records else None
+
+    def get(self, record_id, **options):
+        self._request()
+        with self._lock:
+            return copy.deepcopy(self._records[record_id])
+
+    # -------- WRITES -------- #
+    def create(self, fields, **options):
+        return self.batch_create([fields])[0]
+
+    def update(self, record_id, fields, **options):
+        return self.batch_update([{"id": record_id, "fields": fields}])[0]
+
+    def delete(self, record_id):
+        return self.batch_delete([record_id])[0]
+
+    def batch_create(self, records, **options):
+        created = []
+        for start in range(0, len(records), 10):
+            self._request()
+            with self._lock:
+                for fields in records[start:start + 10]:
+                    record_id = f"recStub{next(self._ids):010d}"
+                    record = {
+                        "id": record_id,
+                        "createdTime": _now_stamp(),
+                        "fields": {k: v for k, v in fields.items() if v not in (None, "")},
+                    }
+                    self._records[record_id] = record
+                    self._modified[record_id] = datetime.now(timezone.utc)
+                    created.append(copy.deepcopy(record))
+        return created
+
+    def batch_update(self, records, **options):
+        updated = []
+        for start in range(0, len(records), 10):
+            self._request()
+            with self._lock:
+                for change in records[start:start + 10]:
+                    record = self._records[change["id"]]
+                    for key, value in change["fields"].items():
+                        if value in (None, ""):
+                            record["fields"].pop(key, None)
+                        else:
+                            record["fields"][key] = value
+                    self._modified[change["id"]] = datetime.now(timezone.utc)
+                    updated.append(copy.deepcopy(record))
+        return updated
+
+    def batch_delete(self, record_ids):
+        deleted = []
+        for start in range(0, len(record_ids), 10):
+            self._request()
+            with self._lock:
+                for record_id in record_ids[start:start + 10]:
+                    del self._records[record_id]
+                    del self._modified[record_id]
+                    deleted.append({"id": record_id, "deleted": True})
+        return deleted
@@ -0,0 +1,42 @@
+"""Overview aggregates computed once per dataset version."""
+
+
+class AnalyticsSummary:
+    """Read-only Overview figures for one dataset snapshot.
+
+    Built once per data version and shared by every session, so widget
+    interactions on the Overview page only read these attributes.
+    """
+
+    def __init__(self, table):
+        df = table.frame  # a RecordTable's columns, read in place
+        amount = df["Amount"]
+        completed = df["ARN"] != ""
+
+        self.total_records = len(df)
+        self.unique_companies = df["Issuer"].nunique()
+        self.total_amount = float(amount.sum())
+
+        self.incomplete = df.loc[~completed & (df["Issuer"] != "") & (df["ISIN"] != ""), ["Issuer", "ISIN", "Status"]]
+        self.incomplete_count = len(self.incomplete)
+
+        self.company_table = self._company_table(df[["Issuer", "ISIN", "Amount"]].assign(Completed=completed))
+        self.status_counts = tuple(df["Status"].value_counts().items())
+
+        self.average_amount = float(amount.mean()) if len(df) else 0.0
+        self.median_amount = float(amount.median()) if len(df) else 0.0
+        self.high_value_clients = int((amount > self.average_amount * 2).sum())
+        self.active_companies = int((amount > 0).sum())
+
+    @staticmethod
+    def _company_table(df):
+        """Per-issuer record count, bill total and ARN completion rate (numbers; views format them)."""
+        table = df.groupby("Issuer", observed=True).agg(
+            **{
+                "Total Records": ("ISIN", "count"),
+                "Total Bill Amount": ("Amount", "sum"),
+                "Completed Records": ("Completed", "sum"),
+            }
+        ).round(2)
+        table["Completion Rate"] = (table["Completed Records"] / table["Total Records"] * 100).round(1)
+        return table.sort_values("Total Records", ascending=False)
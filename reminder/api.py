@@ -0,0 +1,216 @@
+"""Headless access to the Reminder data: the Airtable mirror, dataset and reports."""
+import os
+import threading
+from datetime import timedelta
+
+from reminder.mirror import AirtableMirror
+from reminder.partition import field_partitions
+
+DEFAULT_MIRROR_PATH = os.path.join(".reminder", "airtable_mirror.sqlite3")
+DEFAULT_SNAPSHOT_PATH = os.path.join(".reminder", "dataset_snapshot.arrow")
+DEFAULT_DEPOSITORIES = ("NSDL", "CDSL")
+
+DUE_COLUMNS = ["Issuer", "ISIN", "Email ID", "Bill Date", "Days Until Due", "Record ID"]
+INCOMPLETE_COLUMNS = ["Issuer", "ISIN", "Status"]
+COMPANY_COLUMNS = ["Issuer", "Total Records", "Total Bill Amount", "Completed Records", "Completion Rate"]
+
+
+def open_mirror(path=DEFAULT_MIRROR_PATH, depositories=DEFAULT_DEPOSITORIES, max_workers=4):
+    """Open the SQLite mirror with the app's projections.
+
+    Core fields are always synced; the bill-date block only once something needs it.
+    """
+    from reminder.normalize import BILL_DATE_FIELD_NAMES, CORE_FIELD_NAMES
+    projections = {"core": CORE_FIELD_NAMES, "bill_dates": BILL_DATE_FIELD_NAMES}
+    return AirtableMirror(
+        path,
+        projections=projections,
+        partitions=field_partitions("Depository", list(depositories)),
+        max_workers=max_workers,
+    )
+
+
+class ReminderData:
+    """The data behind the Streamlit pages, usable from scripts and cron jobs.
+
+    Reads the same SQLite mirror the app keeps, so a report only asks Airtable
+    for records modified since the last sync. Without a ``client`` it works
+    offline from whatever the mirror holds. The dataset is rebuilt only when
+    the mirror changes, and the bill schedule and Overview aggregates are
+    derived once per dataset.
+
+    With a ``snapshot_path``, each new dataset version is also written to a
+    memory-mapped Arrow snapshot (see ``reminder.snapshot``), and a fresh
+    process starts from it instead of re-normalizing the whole mirror.
+    """
+
+    def __init__(self, mirror, client=None, reconcile_after=None, snapshot_path=None):
+        self.mirror = mirror
+        self.client = client
+        self.reconcile_after = reconcile_after
+        self.snapshot_path = snapshot_path
+        self.restored = False
+        self._saved = None  # (version, bill block included) of the snapshot file
+        self._lock = threading.Lock()
+        self._dataset = None
+        self._derived = {}  # name -> (dataset, value)
+
+    @classmethod
+    def from_env(cls, offline=False, mirror_path=None, snapshot_path=None):
+        """Configure from the same environment variables as the app."""
+        mirror = open_mirror(
+            mirror_path or os.getenv("AIRTABLE_MIRROR_PATH", DEFAULT_MIRROR_PATH),
+            depositories=[
+                d.strip() for d in os.getenv("AIRTABLE_PARTITION_DEPOSITORIES", ",".join(DEFAULT_DEPOSITORIES)).split(",")
+                if d.strip()
+            ],
+            max_workers=int(os.getenv("AIRTABLE_FETCH_WORKERS", "4")),
+        )
+        client = None
+        if not offline:
+            from reminder.client import AirtableClient
+            client = AirtableClient(
+                os.getenv("AIRTABLE_PERSONAL_ACCESS_TOKEN"),
+                os.getenv("AIRTABLE_BASE_ID"),
+                os.getenv("AIRTABLE_TABLE_NAME"),
+            )
+        reconcile = timedelta(seconds=int(os.getenv("DATASET_RECONCILE_SECONDS", str(6 * 60 * 60))))
+        snapshot_path = snapshot_path if snapshot_path is not None else os.getenv("AIRTABLE_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+        return cls(mirror, client, reconcile_after=reconcile, snapshot_path=snapshot_path)
+
+    # -------- DATASET -------- #
+    def sync(self, projections=None, full=False):
+        """Bring the mirror up to date; returns the ``SyncResult``, or None when offline."""
+        if self.client is None:
+            return None
+        return self.mirror.sync(self.client, projections=projections, full=full, reconcile_after=self.reconcile_after)
+
+    def build(self, previous=None):
+        """Dataset for the mirror's current contents; ``previous`` is returned if nothing changed."""
+        from reminder.dataset import Dataset
+        has_bill_dates = "bill_dates" in self.mirror.active_projections()
+        version = self.mirror.version  # read first, so the records are at least this new
+        if (previous is not None and previous.version == version and not previous.partial
+                and previous.has_bill_dates == has_bill_dates):
+            return previous
+        return Dataset(self.mirror.records(), version=version, has_bill_dates=has_bill_dates,
+                       bill_reader=self.bill_dates)
+
+    def bill_dates(self, ids):
+        """Bill-date matrix of the given record ids, read from the mirror's bill-date projection.
+
+        The datasets' ``bill_reader``: rows are in ``ids`` order, NaT for
+        records the mirror no longer has.
+        """
+        from reminder.normalize import normalize_bill_dates
+        by_id = {r["id"]: r for r in self.mirror.records(ids)}
+        return normalize_bill_dates([by_id.get(record_id, {}) for record_id in ids])
+
+    def refresh(self, previous=None):
+        """Sync, then build (the loader the app's ``DatasetStore`` runs).
+
+        The first call returns the snapshot, when there is one, without
+        waiting on Airtable; ``restored`` is then set and the caller is
+        expected to refresh again to reconcile it.
+        """
+        if previous is None and not self.restored:
+            dataset = self.restore()
+            if dataset is not None:
+                self.restored = True
+                return dataset
+        self.sync()
+        dataset = self.build(previous)
+        self.save(dataset)
+        return dataset
+
+    # -------- SNAPSHOT -------- #
+    def restore(self):
+        """The snapshot written for this mirror, or None."""
+        if not self.snapshot_path:
+            return None
+        from reminder.snapshot import load_snapshot
+        dataset = load_snapshot(self.snapshot_path, self.mirror.mirror_id, bill_reader=self.bill_dates)
+        if dataset is not None:
+            self._saved = (dataset.version, dataset.bill_dates_ready())
+        return dataset
+
+    def save(self, dataset):
+        """Write ``dataset`` to the snapshot unless the file already holds it."""
+        if not self.snapshot_path or dataset.version < 0:
+            return
+        with_bills = dataset.bill_dates_ready()
+        if self._saved is not None and self._saved[0] == dataset.version and (self._saved[1] or not with_bills):
+            return
+        from reminder.snapshot import save_snapshot
+        try:
+            written = save_snapshot(dataset, self.snapshot_path, self.mirror.mirror_id)
+        except OSError:
+            return  # a missing snapshot only costs the next start-up a full build
+        if written is not None:
+            self._saved = (dataset.version, written)
+
+    def dataset(self, bill_dates=False):
+        """Sync and return the current dataset.
+
+        With ``bill_dates`` the bill-date block is fetched on first use.
+        """
+        with self._lock:
+            self.sync()
+            if bill_dates and self.client is not None and "bill_dates" not in self.mirror.active_projections():
+                self.sync(projections=["bill_dates"])
+            self._dataset = self.build(self._dataset or self.restore())
+            self.save(self._dataset)
+            return self._dataset
+
+    def _derive(self, name, dataset, factory):
+        with self._lock:
+            cached = self._derived.get(name)
+            if cached is not None and cached[0] is dataset:
+                return cached[1]
+        value = factory(dataset)
+        with self._lock:
+            self._derived[name] = (dataset, value)
+        return value
+
+    def schedule(self):
+        """``BillSchedule`` of the current dataset."""
+        return self._schedule(self.dataset(bill_dates=True))
+
+    def _schedule(self, dataset):
+        from reminder.schedule import BillSchedule
+        return self._derive("schedule", dataset, BillSchedule.from_dataset)
+
+    def summary(self):
+        """``AnalyticsSummary`` (the Overview aggregates) of the current dataset."""
+        from reminder.analytics import AnalyticsSummary
+        return self._derive("summary", self.dataset(), lambda d: AnalyticsSummary(d.table()))
+
+    # -------- REPORTS -------- #
+    def due(self, within, today=None):
+        """Yield a row per bill due between today and ``within`` days from now, soonest first."""
+        dataset = self.dataset(bill_dates=True)
+        rows, issuers, dates, days_until = self._schedule(dataset).due_slice(within, today)
+        frame = dataset.table().take(rows)
+        for issuer, isin, email, bill_date, days, record_id in zip(
+            issuers, frame["ISIN"].tolist(), frame["Email ID"].tolist(), dates, days_until, frame["Record ID"].tolist()
+        ):
+            yield {
+                "Issuer": issuer,
+                "ISIN": isin,
+                "Email ID": email,
+                "Bill Date": str(bill_date),
+                "Days Until Due": int(days),
+                "Record ID": record_id,
+            }
+
+    def incomplete(self):
+        """Yield the records still missing an ARN (Overview's "New contracts")."""
+        for issuer, isin, status in self.summary().incomplete.itertuples(index=False):
+            yield {"Issuer": issuer, "ISIN": isin, "Status": status}
+
+    def companies(self):
+        """Yield the per-issuer rows of Overview's company-wise analysis."""
+        table = self.summary().company_table
+        for issuer, row in zip(table.index, table.itertuples(index=False)):
+            values = [getattr(value, "item", lambda v=value: v)() for value in row]  # numpy -> Python
+            yield dict(zip(COMPANY_COLUMNS, [issuer] + values))
@@ -0,0 +1,59 @@
+"""Run Airtable batch calls on a bounded, rate-limited worker pool."""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
+# Airtable accepts at most 10 records per batch request.
+AIRTABLE_BATCH_SIZE = 10
+
+
+def chunked(items, size=AIRTABLE_BATCH_SIZE):
+    """Split a sequence into consecutive lists of at most ``size`` items."""
+    items = list(items)
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def iter_chunked(items, size=AIRTABLE_BATCH_SIZE):
+    """Like ``chunked``, but lazy: reads ``items`` only as batches are taken."""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_batches(call, batches, limiter=None, max_workers=4, on_done=None):
+    """Call ``call(batch)`` for every batch, keeping at most ``max_workers`` in flight.
+
+    With a ``limiter``, each call first takes a token from it so the pool as a
+    whole respects the rate limit; leave it out when ``call`` is already rate
+    limited (e.g. an ``AirtableClient``). ``batches`` is an iterable of
+    ``(key, batch)``. ``on_done(key, result, error)`` runs in the calling thread as each batch
+    finishes, so callers can update progress or checkpoints without locking.
+    """
+    def limited(batch):
+        if limiter is not None:
+            limiter.acquire()
+        return call(batch)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+        batches = iter(batches)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_workers:
+                try:
+                    key, batch = next(batches)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[pool.submit(limited, batch)] = key
+
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                error = future.exception()
+                if on_done:
+                    on_done(key, None if error else future.result(), error)
@@ -0,0 +1,273 @@
+"""Bulk CSV/XLSX import into Airtable with batch_create and a resumable checkpoint."""
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+from datetime import date, datetime
+
+import pandas as pd
+
+from reminder.batching import AIRTABLE_BATCH_SIZE, iter_chunked, run_batches
+from reminder.normalize import BILL_DATE_COUNT
+
+# Airtable field name -> kind. Same field names the New Record form sends.
+IMPORT_FIELDS = {
+    "Issuer": "text",
+    "ISIN": "text",
+    "ARN if ISIN NA (NSDL)": "text",
+    "Status": "text",
+    "No of ISIN": "int",
+    "Depository": "text",
+    "Company Referred By": "text",
+    "Email ID": "text",
+    "GSTIN": "text",
+    "Address": "text",
+    "Amount": "float",
+    "Company Link": "text",
+    "ISIN allotment date": "date",
+}
+IMPORT_FIELDS.update({f"Bill Date {i}": "date" for i in range(1, BILL_DATE_COUNT + 1)})
+REQUIRED_FIELDS = ["Issuer", "ISIN"]
+
+# Column headers of the Database page that differ from the Airtable field names.
+HEADER_ALIASES = {
+    "arn": "ARN if ISIN NA (NSDL)",
+    "no of isins": "No of ISIN",
+    "isin allotment date": "ISIN allotment date",
+}
+
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+# -------- READING -------- #
+def iter_rows(file, filename):
+    """Stream rows of a CSV or XLSX file as dicts keyed by the header row."""
+    file.seek(0)
+    if filename.lower().endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError("Reading .xlsx files requires openpyxl (pip install openpyxl)")
+        sheet = load_workbook(file, read_only=True, data_only=True).active
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, [])]
+        for values in rows:
+            if any(v not in (None, "") for v in values):
+                yield dict(zip(header, values))
+    else:
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        try:
+            for row in csv.DictReader(text):
+                if any((v or "").strip() for v in row.values() if isinstance(v, str)):
+                    yield row
+        finally:
+            text.detach()
+
+def map_columns(headers):
+    """Map file headers to Airtable field names (case-insensitive). Returns (mapping, unmatched)."""
+    by_lower = {name.lower(): name for name in IMPORT_FIELDS}
+    by_lower.update(HEADER_ALIASES)
+    mapping, unmatched = {}, []
+    for header in headers:
+        field = by_lower.get(str(header).strip().lower())
+        if field and field not in mapping.values():
+            mapping[header] = field
+        else:
+            unmatched.append(header)
+    return mapping, unmatched
+
+
+# -------- VALIDATION -------- #
+def parse_import_date(value):
+    """Return 'YYYY-MM-DD' for a date cell, None for an empty one; raise ValueError if invalid."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    text = str(value).strip()
+    if ISO_DATE.match(text):
+        return datetime.strptime(text, "%Y-%m-%d").strftime("%Y-%m-%d")
+    parsed = pd.to_datetime(text, errors="coerce", dayfirst=True)
+    if pd.isna(parsed):
+        raise ValueError(f"invalid date {text!r}")
+    return parsed.strftime("%Y-%m-%d")
+
+def convert_cell(kind, value):
+    """Convert one cell to the Airtable value for its field kind (None when empty)."""
+    if kind == "date":
+        return parse_import_date(value)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if kind == "float":
+        try:
+            return float(str(value).replace(",", "").replace("₹", "").strip())
+        except ValueError:
+            raise ValueError(f"invalid amount {value!r}")
+    if kind == "int":
+        try:
+            number = float(str(value).strip())
+        except ValueError:
+            raise ValueError(f"invalid number {value!r}")
+        if not number.is_integer():
+            raise ValueError(f"invalid number {value!r}")
+        return int(number)
+    return str(value).strip()
+
+def validate_rows(rows, mapping, errors=None):
+    """Validate rows as they stream past, yielding ``(row_number, fields)`` for each valid one.
+
+    Invalid rows are appended to ``errors`` as ``(row_number, message)``.
+    Row numbers count the header as row 1. Duplicate ISINs within the file are
+    rejected after their first occurrence.
+    """
+    seen_isins = set()
+    for row_number, row in enumerate(rows, start=2):
+        fields, problems = {}, []
+        for header, field in mapping.items():
+            try:
+                converted = convert_cell(IMPORT_FIELDS[field], row.get(header))
+            except ValueError as e:
+                problems.append(f"{field}: {e}")
+                continue
+            if converted is not None:
+                fields[field] = converted
+
+        for field in REQUIRED_FIELDS:
+            if not fields.get(field):
+                problems.append(f"{field} is required")
+        isin = fields.get("ISIN")
+        if isin and isin in seen_isins:
+            problems.append(f"duplicate ISIN {isin} in file")
+
+        if problems:
+            if errors is not None:
+                errors.append((row_number, "; ".join(problems)))
+        else:
+            seen_isins.add(isin)
+            yield row_number, fields
+
+
+# -------- CHECKPOINT -------- #
+class ImportCheckpoint:
+    """JSON-lines file recording the ISINs one upload's import already created.
+
+    One file per upload (see ``path_for``), appended after every batch, so
+    re-running that file after a crash or a closed tab skips what was
+    created. ``discard`` it once the import finishes: the records are in the
+    dataset by then, and a stale entry would keep an ISIN deleted later from
+    ever being imported again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.created = {}  # ISIN -> Airtable record id
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    self.created.update(zip(entry.get("isins", []), entry.get("ids", [])))
+
+    @staticmethod
+    def path_for(directory, content):
+        """Checkpoint path in ``directory`` for an upload with these bytes."""
+        return os.path.join(directory, hashlib.sha256(content).hexdigest() + ".jsonl")
+
+    def __contains__(self, isin):
+        return isin in self.created
+
+    def mark_created(self, isins, record_ids):
+        self.created.update(zip(isins, record_ids))
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"isins": isins, "ids": record_ids}) + "\n")
+
+    def discard(self):
+        """Delete the file (the import finished)."""
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# -------- IMPORT -------- #
+class ImportResult:
+    """Outcome of a bulk import run."""
+
+    def __init__(self):
+        self.created = []
+        self.errors = []
+        self.skipped_rows = 0
+        self.total_batches = 0
+
+    @property
+    def created_count(self):
+        return len(self.created)
+
+
+def pending_rows(valid_rows, existing_isins=(), checkpoint=None):
+    """The valid rows whose ISIN is neither in ``existing_isins`` nor in ``checkpoint`` (lazy)."""
+    for row_number, fields in valid_rows:
+        isin = fields["ISIN"]
+        if isin not in existing_isins and (checkpoint is None or isin not in checkpoint):
+            yield row_number, fields
+
+
+def run_import(table, valid_rows, checkpoint=None, existing_isins=(), total=None, limiter=None,
+               max_workers=4, batch_size=AIRTABLE_BATCH_SIZE, on_progress=None, typecast=True):
+    """Create the validated rows in Airtable with ``batch_create``, reading them lazily.
+
+    Rows whose ISIN is already in ``existing_isins`` (the table) or was
+    created by an earlier run recorded in ``checkpoint`` are skipped, so
+    re-running an interrupted or partly failed import, even from a corrected
+    file, only sends what is missing. A failed batch is reported against each
+    of its rows. ``total`` is the number of rows expected to be sent (see
+    ``pending_rows``); with it, ``on_progress(finished, total)`` is called
+    after every batch. Pass a ``limiter`` when ``table`` is a plain
+    pyairtable ``Table``.
+    """
+    checkpoint = checkpoint or ImportCheckpoint(None)
+    result = ImportResult()
+    result.total_batches = -(-total // batch_size) if total is not None else None
+    in_flight = {}  # batch index -> [(row_number, fields)]
+    finished = [0]
+    counts = {"read": 0, "sent": 0}
+
+    def read():
+        for row in valid_rows:
+            counts["read"] += 1
+            yield row
+
+    def on_done(index, created, error):
+        batch = in_flight.pop(index)
+        if error is not None:
+            message = f"Airtable rejected batch: {error}"
+            result.errors.extend((row_number, message) for row_number, _ in batch)
+        else:
+            result.created.extend(created)
+            checkpoint.mark_created([fields["ISIN"] for _, fields in batch], [r["id"] for r in created])
+        finished[0] += 1
+        if on_progress and result.total_batches:
+            on_progress(min(finished[0], result.total_batches), result.total_batches)
+
+    def todo():
+        for index, batch in enumerate(iter_chunked(pending_rows(read(), existing_isins, checkpoint), batch_size)):
+            counts["sent"] += len(batch)
+            in_flight[index] = batch
+            yield index, [fields for _, fields in batch]
+
+    run_batches(
+        lambda records: table.batch_create(records, typecast=typecast),
+        todo(),
+        limiter,
+        max_workers=max_workers,
+        on_done=on_done,
+    )
+    result.skipped_rows = counts["read"] - counts["sent"]
+    return result
@@ -0,0 +1,62 @@
+"""Bulk field updates across many records with batch_update."""
+from reminder.batching import AIRTABLE_BATCH_SIZE, chunked, run_batches
+
+
+def build_diffs(airtable_records, changes):
+    """Return one ``{"id", "fields"}`` update per record, holding only the fields that change.
+
+    ``airtable_records`` are the records' current raw fields (e.g. from
+    ``AirtableMirror.records``). Field names are compared case-insensitively,
+    and a missing field counts as empty. Records already matching every
+    change are left out.
+    """
+    diffs = []
+    for record in airtable_records:
+        current = {k.lower(): v for k, v in record.get("fields", {}).items()}
+        fields = {
+            field: value for field, value in changes.items()
+            if (current.get(field.lower()) or "") != (value or "")
+        }
+        if fields:
+            diffs.append({"id": record["id"], "fields": fields})
+    return diffs
+
+
+class BulkUpdateResult:
+    """Outcome of a bulk update run."""
+
+    def __init__(self):
+        self.updated = []
+        self.errors = []
+
+
+def run_bulk_update(table, diffs, limiter=None, max_workers=4,
+                    batch_size=AIRTABLE_BATCH_SIZE, on_progress=None, typecast=True):
+    """Send the diffs through ``batch_update`` in chunks of ten on the worker pool.
+
+    ``result.updated`` holds the records Airtable returned, ready to be written
+    through to the cached dataset in one step. A failed chunk is reported
+    against each of its record ids. Pass a ``limiter`` when ``table`` is a
+    plain pyairtable ``Table``.
+    """
+    batches = chunked(diffs, batch_size)
+    result = BulkUpdateResult()
+    finished = [0]
+
+    def on_done(index, updated, error):
+        if error is not None:
+            result.errors.extend((diff["id"], str(error)) for diff in batches[index])
+        else:
+            result.updated.extend(updated)
+        finished[0] += 1
+        if on_progress:
+            on_progress(finished[0], len(batches))
+
+    run_batches(
+        lambda batch: table.batch_update(batch, typecast=typecast),
+        enumerate(batches),
+        limiter,
+        max_workers=max_workers,
+        on_done=on_done,
+    )
+    return result
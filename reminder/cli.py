@@ -0,0 +1,103 @@
+"""Command line reports over the Reminder data, for cron jobs and scripts.
+
+Examples:
+    python -m reminder due --within 30 --format csv
+    python -m reminder companies --format json > companies.jsonl
+    python -m reminder incomplete --offline
+    python -m reminder sync --full
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import date
+
+from reminder.api import COMPANY_COLUMNS, DUE_COLUMNS, INCOMPLETE_COLUMNS, ReminderData
+
+
+# -------- OUTPUT -------- #
+def write_rows(rows, columns, fmt, out):
+    """Stream rows to ``out`` as they are produced; returns how many were written."""
+    count = 0
+    if fmt == "json":  # JSON Lines, one object per row
+        for row in rows:
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+        return count
+    writer = csv.DictWriter(out, fieldnames=columns, delimiter="\t" if fmt == "tsv" else ",",
+                            lineterminator="\n")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="reminder", description="Reminder data reports.")
+    parser.add_argument("--mirror", help="SQLite mirror path (default: $AIRTABLE_MIRROR_PATH)")
+    parser.add_argument("--offline", action="store_true",
+                        help="read the local mirror as it is, without contacting Airtable")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def report(name, help):
+        command = commands.add_parser(name, help=help)
+        command.add_argument("--format", choices=["csv", "tsv", "json"], default="csv",
+                             help="json writes one object per line")
+        return command
+
+    due = report("due", "bills due within the next N days, soonest first")
+    due.add_argument("--within", type=int, default=30, metavar="DAYS")
+    due.add_argument("--today", type=_date, help="report as of this date (default: today)")
+    report("companies", "per-issuer record counts, bill totals and ARN completion")
+    report("incomplete", "records still missing an ARN")
+    sync = commands.add_parser("sync", help="bring the local mirror up to date")
+    sync.add_argument("--full", action="store_true", help="refetch every record")
+    sync.add_argument("--bill-dates", action="store_true", help="include the bill-date block")
+    return parser
+
+
+def run(args, out):
+    data = ReminderData.from_env(offline=args.offline, mirror_path=args.mirror)
+    if args.command == "sync":
+        if data.client is None:
+            raise SystemExit("error: sync needs Airtable; drop --offline")
+        projections = data.mirror.active_projections()
+        if args.bill_dates and "bill_dates" not in projections:
+            projections.append("bill_dates")
+        result = data.sync(projections=projections, full=args.full)
+        print(f"{result} ({len(data.mirror)} records mirrored)", file=sys.stderr)
+        return 0
+
+    if args.command == "due":
+        rows, columns = data.due(args.within, args.today), DUE_COLUMNS
+    elif args.command == "companies":
+        rows, columns = data.companies(), COMPANY_COLUMNS
+    else:
+        rows, columns = data.incomplete(), INCOMPLETE_COLUMNS
+    count = write_rows(rows, columns, args.format, out)
+    print(f"{count} rows", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+    try:
+        return run(args, sys.stdout)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); don't let Python complain at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
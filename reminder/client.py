@@ -0,0 +1,216 @@
+"""Airtable client with rate limiting, retries, connection reuse and per-call metrics."""
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from reminder.ratelimit import TokenBucket
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CallStats:
+    """Aggregated metrics for one kind of client call (e.g. ``all``)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.requests = 0
+        self.retries = 0
+        self.bytes = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.throttled_seconds = 0.0
+
+    def as_dict(self):
+        return {
+            "call": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "requests": self.requests,
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "total_seconds": round(self.total_seconds, 3),
+            "avg_seconds": round(self.total_seconds / self.calls, 3) if self.calls else 0.0,
+            "max_seconds": round(self.max_seconds, 3),
+            "throttled_seconds": round(self.throttled_seconds, 3),
+        }
+
+
+class _CallContext:
+    """Per-thread counters for the client call currently in progress."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.bytes = 0
+        self.throttled_seconds = 0.0
+
+
+class _InstrumentedSession(requests.Session):
+    """Session that rate-limits, retries with jittered backoff and counts traffic."""
+
+    def __init__(self, limiter, local, max_retries, backoff_base, backoff_max, pool_size):
+        super().__init__()
+        self.limiter = limiter
+        self._local = local
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Keep-alive connections are reused across calls and threads.
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def _backoff(self, attempt, response):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        # Full jitter: random delay up to the exponential cap.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(self, method, url, **kwargs):
+        context = getattr(self._local, "context", None)
+        # A failed POST may already have created records, so only 429s are retried for it.
+        idempotent = method.upper() != "POST" or str(url).endswith("/listRecords")
+        for attempt in range(self.max_retries + 1):
+            waited = self.limiter.acquire()
+            response, error = None, None
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if context is not None:
+                context.requests += 1
+                context.throttled_seconds += waited
+                if response is not None:
+                    context.bytes += len(response.content)
+
+            if response is not None and response.status_code == 429:
+                retryable = True
+            else:
+                retryable = idempotent and (error is not None or response.status_code in RETRY_STATUSES)
+            if not retryable or attempt == self.max_retries:
+                if error is not None:
+                    raise error
+                return response
+            if context is not None:
+                context.retries += 1
+            time.sleep(self._backoff(attempt, response))
+
+
+class AirtableClient:
+    """Drop-in wrapper around a pyairtable ``Table``.
+
+    Every HTTP request (including each page of ``all()``) takes a token from
+    ``limiter``. 429 responses, and 5xx responses or connection errors on
+    idempotent requests, are retried with jittered exponential backoff. ``stats()`` reports latency, request (page)
+    counts, retries and response bytes per call type. pyairtable is imported and
+    the table built on the first call, so constructing the client is cheap.
+    """
+
+    def __init__(self, api_key, base_id, table_name, limiter=None, timeout=(5, 30),
+                 max_retries=5, backoff_base=0.5, backoff_max=30.0, pool_size=10,
+                 endpoint_url="https://api.airtable.com"):
+        self.limiter = limiter or TokenBucket()
+        self._local = threading.local()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+        self._settings = dict(
+            api_key=api_key, base_id=base_id, table_name=table_name, timeout=timeout,
+            max_retries=max_retries, backoff_base=backoff_base, backoff_max=backoff_max,
+            pool_size=pool_size, endpoint_url=endpoint_url,
+        )
+        self.api = None
+        self._table = None
+        self._table_lock = threading.Lock()
+
+    @property
+    def table(self):
+        """The underlying pyairtable ``Table``, built on first use."""
+        if self._table is None:
+            with self._table_lock:
+                if self._table is None:
+                    from pyairtable import Api
+
+                    s = self._settings
+                    api = Api(s["api_key"], timeout=s["timeout"], retry_strategy=False,
+                              endpoint_url=s["endpoint_url"])
+                    api.session = _InstrumentedSession(
+                        self.limiter, self._local, s["max_retries"], s["backoff_base"],
+                        s["backoff_max"], s["pool_size"],
+                    )
+                    api.api_key = s["api_key"]  # re-applies the auth header to the new session
+                    self.api = api
+                    self._table = api.table(s["base_id"], s["table_name"])
+        return self._table
+
+    # -------- METRICS -------- #
+    def _call(self, name, fn, *args, **kwargs):
+        context = _CallContext()
+        self._local.context = context
+        started = time.monotonic()
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            self._local.context = None
+            with self._stats_lock:
+                stats = self._stats.setdefault(name, CallStats(name))
+                stats.calls += 1
+                stats.errors += failed
+                stats.requests += context.requests
+                stats.retries += context.retries
+                stats.bytes += context.bytes
+                stats.total_seconds += elapsed
+                stats.max_seconds = max(stats.max_seconds, elapsed)
+                stats.throttled_seconds += context.throttled_seconds
+
+    def stats(self):
+        """Per-call-type metrics as a list of dicts."""
+        with self._stats_lock:
+            return [stats.as_dict() for stats in self._stats.values()]
+
+    # -------- TABLE API -------- #
+    def field_names(self):
+        """Field names as the table's schema spells them."""
+        return self._call("schema", lambda: [field.name for field in self.table.schema().fields])
+
+    def all(self, **options):
+        return self._call("all", self.table.all, **options)
+
+    def first(self, **options):
+        return self._call("first", self.table.first, **options)
+
+    def get(self, record_id, **options):
+        return self._call("get", self.table.get, record_id, **options)
+
+    def create(self, fields, **options):
+        return self._call("create", self.table.create, fields, **options)
+
+    def update(self, record_id, fields, **options):
+        return self._call("update", self.table.update, record_id, fields, **options)
+
+    def delete(self, record_id):
+        return self._call("delete", self.table.delete, record_id)
+
+    def batch_create(self, records, **options):
+        return self._call("batch_create", self.table.batch_create, records, **options)
+
+    def batch_update(self, records, **options):
+        return self._call("batch_update", self.table.batch_update, records, **options)
+
+    def batch_delete(self, record_ids):
+        return self._call("batch_delete", self.table.batch_delete, record_ids)
@@ -0,0 +1,201 @@
+"""Normalized records plus record-id keyed lookups for one data version."""
+import threading
+
+import numpy as np
+
+from reminder.normalize import BILL_DATE_COUNT, CORE_COLUMNS, normalize_bill_dates, normalize_records
+from reminder.table import RecordTable
+
+
+def _normalize_with_ids(airtable_records):
+    records = normalize_records(airtable_records, CORE_COLUMNS)
+    for r, record in zip(airtable_records, records):
+        record["Record ID"] = r["id"]
+    return records
+
+# Index lists may be shared with older snapshots, so patches replace them instead of mutating.
+def _index_add(index, key, record_id):
+    index[key] = index.get(key, []) + [record_id]
+
+def _index_remove(index, key, record_id):
+    remaining = [i for i in index.get(key, []) if i != record_id]
+    if remaining:
+        index[key] = remaining
+    else:
+        index.pop(key, None)
+
+
+class Dataset:
+    """Snapshot of the Airtable table shared by every page.
+
+    ``table()`` holds the normalized core rows the pages display as typed
+    columns, each row carrying its Airtable ``Record ID``; ``record()`` builds
+    one row's dict on demand. Raw Airtable fields are not kept: read them from
+    the mirror when a form needs them. ``has_bill_dates`` says whether the
+    records include the bill-date block; its ``datetime64`` matrix comes from
+    ``bill_reader(ids)`` (the mirror) when ``bill_dates()`` is first called,
+    or is normalized up front when there is no reader. ``by_issuer`` and
+    ``by_isin`` map a value to the ids of every record that has it, so a
+    selection resolves without a scan.
+
+    ``partial`` marks a write-through copy patched onto a dataset that had
+    missed earlier mirror changes; it is rebuilt from the mirror next time.
+    """
+
+    def __init__(self, airtable_records, version=0, has_bill_dates=False, bill_reader=None):
+        self.version = version
+        self.has_bill_dates = has_bill_dates
+        self.partial = False
+        bill_dates = None
+        if has_bill_dates and bill_reader is None:
+            bill_dates = normalize_bill_dates(airtable_records)  # the raw fields are not kept
+        self._lazy(table=RecordTable(_normalize_with_ids(airtable_records)), bill_dates=bill_dates, bill_reader=bill_reader)
+        self.ids = [r["id"] for r in airtable_records]
+        self._index()
+
+    @classmethod
+    def from_normalized(cls, table, version=0, has_bill_dates=False, bill_loader=None, bill_reader=None):
+        """Dataset from a ``RecordTable`` normalized earlier (e.g. read back from a snapshot).
+
+        ``bill_loader()``, if given, returns this dataset's bill-date matrix
+        cheaply (a snapshot's stored block); otherwise ``bill_reader(ids)``
+        builds it on first use.
+        """
+        new = cls.__new__(cls)
+        new.version = version
+        new.has_bill_dates = has_bill_dates
+        new.partial = False
+        new._lazy(table=table, bill_loader=bill_loader, bill_reader=bill_reader)
+        new.ids = table.frame["Record ID"].tolist()
+        new._index()
+        return new
+
+    def _lazy(self, table=None, bill_dates=None, bill_loader=None, bill_reader=None):
+        self._table = table
+        self._bill_dates = bill_dates
+        self._bill_loader = bill_loader
+        self._bill_reader = bill_reader
+        self._bill_lock = threading.Lock()
+
+    def _index(self):
+        self.row_of = {record_id: row for row, record_id in enumerate(self.ids)}
+        self.by_issuer = {}
+        self.by_isin = {}
+        frame = self._table.frame
+        for record_id, issuer, isin in zip(self.ids, frame["Issuer"].tolist(), frame["ISIN"].tolist()):
+            self.by_issuer.setdefault(issuer, []).append(record_id)
+            self.by_isin.setdefault(isin, []).append(record_id)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def record(self, record_id):
+        """Normalized record dict for an Airtable record id, built from the table."""
+        return self._table.row(self.row_of[record_id])
+
+    def table(self):
+        """The records as a ``RecordTable``."""
+        return self._table
+
+    def bill_dates(self):
+        """Bill Date 1..72 of every row as a ``datetime64[D]`` matrix (NaT where empty), loaded on first use.
+
+        The matrix may be a read-only view of a snapshot file; copy it before writing.
+        """
+        with self._bill_lock:
+            if self._bill_dates is None and self._bill_loader is not None:
+                self._bill_dates = self._bill_loader()
+            if self._bill_dates is None and self.has_bill_dates and self._bill_reader is not None:
+                self._bill_dates = self._bill_reader(self.ids)
+            if self._bill_dates is None:  # the records have no bill dates
+                self._bill_dates = np.full((len(self.ids), BILL_DATE_COUNT), np.datetime64("NaT"), dtype="datetime64[D]")
+            return self._bill_dates
+
+    def bill_dates_ready(self):
+        """Whether ``bill_dates()`` needs no reading (already done, or stored in a snapshot)."""
+        with self._bill_lock:
+            return self._bill_dates is not None or self._bill_loader is not None
+
+    def ids_for(self, value):
+        """Ids of records whose Issuer or ISIN equals value, in table order."""
+        ids = self.by_issuer.get(value, []) + self.by_isin.get(value, [])
+        return sorted(set(ids), key=self.row_of.__getitem__)
+
+    # -------- WRITE-THROUGH -------- #
+    def patched(self, upserts=(), deletes=(), version=None):
+        """Return a copy with the given Airtable records upserted and ids removed.
+
+        Only the touched rows are normalized and only their index entries are
+        rewritten; the table is patched column by column. The original dataset
+        is left untouched for concurrent readers.
+        """
+        new = Dataset.__new__(Dataset)
+        new.version = self.version + 1 if version is None else version
+        new.has_bill_dates = self.has_bill_dates
+        # A version more than one ahead means the mirror changed in between without this copy.
+        new.partial = self.partial or not self.version <= new.version <= self.version + 1
+        with self._bill_lock:
+            bill_dates = self._bill_dates
+        if bill_dates is None and self._bill_loader is not None:
+            bill_dates = self.bill_dates()  # a snapshot view: cheap now, and only valid for these rows
+        # Not loaded yet: the copy reads its own rows through the reader when needed.
+        new._lazy(bill_dates=bill_dates, bill_reader=self._bill_reader)  # matrix replaced below, never written in place
+        new.ids = list(self.ids)
+        new.row_of = self.row_of
+        new.by_issuer = dict(self.by_issuer)
+        new.by_isin = dict(self.by_isin)
+
+        source = None  # table row of each new row; past the end: the k-th upsert
+        deleted = {record_id for record_id in deletes if record_id in self.row_of}
+        for record_id in deleted:
+            new._unindex(record_id, self._keys(record_id))
+        if deleted:
+            keep = [row for row, record_id in enumerate(new.ids) if record_id not in deleted]
+            new.ids = [new.ids[row] for row in keep]
+            source = keep
+            if new._bill_dates is not None:
+                new._bill_dates = new._bill_dates[keep]
+            new.row_of = {record_id: row for row, record_id in enumerate(new.ids)}
+
+        upserts = list(upserts)
+        normalized = _normalize_with_ids(upserts)
+        if upserts:
+            if new.row_of is self.row_of:
+                new.row_of = dict(self.row_of)
+            if source is None:
+                source = list(range(len(self.ids)))
+            upserted = {}
+            for k, (r, record) in enumerate(zip(upserts, normalized)):
+                record_id = r["id"]
+                if record_id in new.row_of:
+                    new._unindex(record_id, upserted.get(record_id) or self._keys(record_id))
+                    source[new.row_of[record_id]] = len(self.ids) + k
+                else:
+                    new.row_of[record_id] = len(new.ids)
+                    new.ids.append(record_id)
+                    source.append(len(self.ids) + k)
+                upserted[record_id] = record
+                _index_add(new.by_issuer, record["Issuer"], record_id)
+                _index_add(new.by_isin, record["ISIN"], record_id)
+            if new._bill_dates is not None:
+                new._bill_dates = new._patched_bill_dates(upserts)
+        new._table = self._table if source is None else self._table.patched(source, normalized)
+        return new
+
+    def _patched_bill_dates(self, upserts):
+        """Copy of the bill-date matrix grown to every row, with the upserted rows replaced."""
+        matrix = self._bill_dates
+        grown = np.full((len(self.ids), matrix.shape[1]), np.datetime64("NaT"), dtype=matrix.dtype)
+        grown[:len(matrix)] = matrix
+        rows = [self.row_of[r["id"]] for r in upserts]
+        grown[rows] = normalize_bill_dates(upserts)
+        return grown
+
+    def _keys(self, record_id):
+        """Issuer and ISIN of a record, the values it is indexed under."""
+        row, frame = self.row_of[record_id], self._table.frame
+        return {"Issuer": frame["Issuer"].iat[row], "ISIN": frame["ISIN"].iat[row]}
+
+    def _unindex(self, record_id, old):
+        _index_remove(self.by_issuer, old["Issuer"], record_id)
+        _index_remove(self.by_isin, old["ISIN"], record_id)
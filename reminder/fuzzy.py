@@ -0,0 +1,203 @@
+"""Trigram inverted index serving ranked fuzzy record search."""
+import heapq
+import re
+import threading
+from collections import Counter, namedtuple
+
+from reminder.normalize import normalize_records
+
+Hit = namedtuple("Hit", "record_id score field")
+
+# Searched columns, strongest first; the weight breaks ties between equally good matches.
+SEARCH_FIELDS = [("Issuer", 3), ("ISIN", 3), ("GSTIN", 2), ("Email ID", 1.5), ("Address", 1)]
+SEARCH_COLUMNS = [column for column, _ in SEARCH_FIELDS]
+
+# Trigrams found in more than this share of the records carry little signal
+# ("ine" in every ISIN) and are skipped when the query has rarer ones.
+STOP_FRACTION = 0.2
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize_text(value):
+    """Case-folded words of ``value`` joined by single spaces."""
+    return " ".join(_SEPARATORS.split(str(value).casefold())).strip()
+
+
+def search_rows(airtable_records):
+    """The searched columns of Airtable records, as rows ``FuzzyIndex.upsert`` takes."""
+    rows = normalize_records(airtable_records, SEARCH_COLUMNS)
+    for r, row in zip(airtable_records, rows):
+        row["Record ID"] = r["id"]
+    return rows
+
+
+def trigrams(text):
+    """Set of three-character grams of normalized ``text``, padded so word edges count."""
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)} if text else set()
+
+
+class FuzzyIndex:
+    """Ranked partial/fuzzy lookups over the Issuer, ISIN, GSTIN, Email ID and Address of every record.
+
+    Each field keeps its own trigram -> [doc] postings. A query scores the
+    records sharing its trigrams by the best per-field coverage (share of
+    the query's trigrams found in one field), so typos and fragments still
+    match and only the postings of the query's trigrams are read.
+
+    ``upsert``/``remove`` apply record changes in place: a changed record
+    gets a new doc number and its old postings are left behind as stale
+    entries (lazy deletion), compacted once they outnumber live records.
+    """
+
+    def __init__(self, records=None):
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+        self.last_error = None
+        self._reset()
+        if records is not None:
+            self.upsert(records)
+            self._ready.set()
+
+    def _reset(self):
+        self._postings = [{} for _ in SEARCH_FIELDS]  # per field: trigram -> [doc]
+        self._docs = []    # doc -> record id, None once stale
+        self._texts = []   # doc -> normalized field values, None once stale
+        self._doc_of = {}  # record id -> live doc
+        self._stale = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._doc_of)
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self, initial):
+        """Index the rows returned by ``initial()`` on a daemon thread (idempotent) and return self.
+
+        ``initial()`` runs under the index lock, so changes notified while it
+        reads wait and are applied on top instead of being overwritten (it
+        must not wait on whatever sends those changes). A failed build is
+        retried by the next call.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._load, args=(initial,), name="fuzzy-index", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def _load(self, initial):
+        try:
+            with self._lock:
+                self._upsert(initial())
+        except Exception as e:
+            self.last_error = e
+            with self._lock:
+                self._thread = None  # the next start() retries
+            return
+        self._ready.set()
+
+    # -------- UPDATES -------- #
+    def upsert(self, records):
+        """Index new or changed records (normalized rows carrying "Record ID")."""
+        with self._lock:
+            self._upsert(records)
+
+    def _upsert(self, records):
+        for record in records:
+            record_id = record["Record ID"]
+            self._drop(record_id)
+            self._add(record_id, tuple(normalize_text(record.get(column, "")) for column in SEARCH_COLUMNS))
+        self._compact()
+
+    def remove(self, record_ids):
+        with self._lock:
+            for record_id in record_ids:
+                self._drop(record_id)
+            self._compact()
+
+    def _add(self, record_id, texts):
+        doc = len(self._docs)
+        self._docs.append(record_id)
+        self._texts.append(texts)
+        self._doc_of[record_id] = doc
+        for postings, text in zip(self._postings, texts):
+            for gram in trigrams(text):
+                entries = postings.get(gram)
+                if entries is None:
+                    postings[gram] = [doc]
+                else:
+                    entries.append(doc)
+
+    def _drop(self, record_id):
+        doc = self._doc_of.pop(record_id, None)
+        if doc is not None:
+            self._docs[doc] = None
+            self._texts[doc] = None
+            self._stale += 1
+
+    def _compact(self):
+        """Renumber the live records once stale docs outnumber them."""
+        if self._stale <= len(self._doc_of):
+            return
+        live = [(record_id, texts) for record_id, texts in zip(self._docs, self._texts) if record_id is not None]
+        self._reset()
+        for record_id, texts in live:
+            self._add(record_id, texts)
+
+    # -------- SEARCH -------- #
+    def search(self, query, limit=20, min_score=0.4):
+        """Up to ``limit`` Hits for ``query``, best first.
+
+        ``score`` is the share of the query's trigrams found in the record's
+        best-matching ``field``; records whose field contains the whole query
+        rank first.
+        """
+        text = normalize_text(query)
+        grams = trigrams(text)
+        if not grams:
+            return []
+        with self._lock:
+            frequency = {gram: sum(len(p.get(gram, ())) for p in self._postings) for gram in grams}
+            cutoff = STOP_FRACTION * max(len(self._doc_of), 1)
+            used = [gram for gram in grams if 0 < frequency[gram] <= cutoff]
+            if not used:
+                used = [gram for gram in grams if frequency[gram]]
+            if not used:
+                return []
+            # Skipped trigrams are taken as found, so a query with common ones can still score 1.0.
+            skipped = len(grams) - len(used)
+            needed = min_score * len(grams) - skipped
+            docs, texts = self._docs, self._texts
+            scored = []  # (-count, -weight, doc, field) per qualifying record and field
+            for field, (postings, (_, weight)) in enumerate(zip(self._postings, SEARCH_FIELDS)):
+                found = Counter()
+                for gram in used:
+                    found.update(postings.get(gram, ()))
+                scored.extend(
+                    (-count, -weight, doc, field) for doc, count in found.items()
+                    if count >= needed and docs[doc] is not None
+                )
+
+            # A field containing the whole query matches all but (at most) its two edge trigrams.
+            near = len(grams) - skipped - 2
+            contained = heapq.nsmallest(limit, (
+                entry for entry in scored if -entry[0] >= near and text in texts[entry[2]][entry[3]]
+            ))
+            closest = heapq.nsmallest(limit * len(SEARCH_FIELDS), scored)
+            hits, seen = [], set()
+            for exact, (count, _, doc, field) in [(True, e) for e in contained] + [(False, e) for e in closest]:
+                if doc in seen:
+                    continue
+                seen.add(doc)
+                score = 1.0 if exact else (skipped - count) / len(grams)
+                hits.append(Hit(docs[doc], round(score, 3), SEARCH_COLUMNS[field]))
+                if len(hits) == limit:
+                    break
+            return hits
@@ -0,0 +1,344 @@
+"""Incremental Gmail ingestion of "ISIN Activated" emails into Airtable Status updates."""
+import base64
+import json
+import os
+import re
+import threading
+import time
+
+from bs4 import BeautifulSoup
+
+from reminder.bulk_update import build_diffs, run_bulk_update
+from reminder.ratelimit import TokenBucket
+
+# Indian ISINs: "IN", nine alphanumerics, one check digit.
+ISIN_PATTERN = re.compile(r"\bIN[A-Z0-9]{9}[0-9]\b")
+
+# Gmail recommends at most 50 calls per batch request; messages.get costs
+# 5 of the 250 quota units a user may spend per second.
+GMAIL_BATCH_SIZE = 50
+GMAIL_GETS_PER_SECOND = 40
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# A message that still fails after this many polls is skipped for good.
+POISON_AFTER_POLLS = 3
+
+
+# -------- PARSING -------- #
+def _decode(data):
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4)).decode("utf-8", errors="replace")
+
+def message_subject(message):
+    """Subject header of a Gmail API message resource."""
+    for header in message.get("payload", {}).get("headers", []):
+        if header.get("name", "").lower() == "subject":
+            return header.get("value", "")
+    return ""
+
+def message_body(message):
+    """HTML body of a message (plain text if it has no HTML part)."""
+    html, text = [], []
+    stack = [message.get("payload", {})]
+    while stack:
+        part = stack.pop()
+        stack.extend(reversed(part.get("parts", [])))
+        data = part.get("body", {}).get("data")
+        if not data:
+            continue
+        if part.get("mimeType") == "text/html":
+            html.append(_decode(data))
+        elif part.get("mimeType") == "text/plain":
+            text.append(_decode(data))
+    return "\n".join(html or text)
+
+def extract_isins(html):
+    """ISINs mentioned in an email body, in order of first appearance."""
+    text = BeautifulSoup(html, "html.parser").get_text(" ")
+    return list(dict.fromkeys(ISIN_PATTERN.findall(text.upper())))
+
+
+# -------- STATE -------- #
+class IngestState:
+    """Ingestion progress persisted as a small JSON file.
+
+    ``history_id`` is the Gmail cursor and ``internal_date`` the receive
+    time (ms) of the newest activation email applied. ``failures`` counts
+    the polls each message failed to fetch in, and ``poisoned`` holds the
+    ids given up on.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.history_id = None
+        self.internal_date = None
+        self.failures = {}
+        self.poisoned = set()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            self.history_id = saved.get("history_id")
+            self.internal_date = saved.get("internal_date")
+            self.failures = saved.get("failures", {})
+            self.poisoned = set(saved.get("poisoned", []))
+
+    def save(self, history_id=None, internal_date=None):
+        if history_id is not None:
+            self.history_id = history_id
+        if internal_date is not None:
+            self.internal_date = max(internal_date, self.internal_date or 0)
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp = self.path + ".tmp"
+        with open(temp, "w") as f:
+            json.dump({
+                "history_id": self.history_id,
+                "internal_date": self.internal_date,
+                "failures": self.failures,
+                "poisoned": sorted(self.poisoned),
+            }, f)
+        os.replace(temp, self.path)
+
+
+class IngestResult:
+    """Outcome of one ingestion poll."""
+
+    def __init__(self):
+        self.messages = 0
+        self.isins = set()
+        self.unmatched = set()
+        self.updated = []
+        self.errors = []
+        self.poisoned = []
+
+    def __repr__(self):
+        return (
+            f"IngestResult(messages={self.messages}, isins={len(self.isins)}, "
+            f"updated={len(self.updated)}, unmatched={len(self.unmatched)}, errors={len(self.errors)}, "
+            f"poisoned={len(self.poisoned)})"
+        )
+
+
+# -------- INGESTION -------- #
+class GmailIngestor:
+    """Polls Gmail for activation emails and marks the matching records' Status.
+
+    The first poll lists the messages matching ``subject`` from the last
+    ``backfill_days`` and remembers the mailbox ``historyId``; later polls
+    only read the history since then. When that cursor has expired, the
+    resync only applies emails received after the newest one already applied,
+    so statuses changed by hand since are not set back.
+
+    Messages are fetched ``batch_size`` at a time in Gmail batch requests:
+    first their Subject header only, then the full body of the matching ones.
+    A message that cannot be fetched (a permanent error, or throttled in
+    ``POISON_AFTER_POLLS`` polls) is recorded as poisoned and skipped.
+    ``service`` is a Gmail API resource (``build("gmail", "v1", ...)``) or a
+    stub with the same interface. ``dataset_loader()`` returns the current
+    ``Dataset`` and ``record_loader(ids)`` those records' raw Airtable fields
+    (the mirror's ``records``); ``on_updated(records)`` receives the records
+    Airtable returned.
+    The cursor only advances once the Airtable updates went through.
+    """
+
+    def __init__(self, service, table, dataset_loader, record_loader, state_path=None, subject="ISIN Activated",
+                 status="Active", batch_size=GMAIL_BATCH_SIZE, limiter=None, max_attempts=3,
+                 on_updated=None, backfill_days=30):
+        self.service = service
+        self.table = table
+        self.dataset_loader = dataset_loader
+        self.record_loader = record_loader
+        self.state = IngestState(state_path)
+        self.subject = subject
+        self.status = status
+        self.batch_size = batch_size
+        self.limiter = limiter or TokenBucket(GMAIL_GETS_PER_SECOND, capacity=batch_size)
+        self.max_attempts = max_attempts
+        self.on_updated = on_updated
+        self.backfill_days = backfill_days
+
+        self.last_result = None
+        self.last_error = None
+        self.last_poll = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._wake = threading.Event()
+
+    # -------- MESSAGE IDS -------- #
+    def _list_all(self, after=None):
+        """Ids of messages matching the subject filter, received after ``after`` (epoch seconds) if given."""
+        users = self.service.users()
+        query = f'subject:"{self.subject}"' + (f" after:{int(after)}" if after is not None else "")
+        ids, token = [], None
+        while True:
+            response = users.messages().list(
+                userId="me", q=query, maxResults=500, pageToken=token
+            ).execute()
+            ids.extend(m["id"] for m in response.get("messages", []))
+            token = response.get("nextPageToken")
+            if not token:
+                return ids
+
+    def _list_since(self, history_id):
+        """Ids of messages added since ``history_id`` and the mailbox's new historyId.
+
+        Returns ``(None, None)`` when Gmail no longer has that much history.
+        """
+        users = self.service.users()
+        ids, token, latest = [], None, history_id
+        while True:
+            try:
+                response = users.history().list(
+                    userId="me", startHistoryId=history_id,
+                    historyTypes=["messageAdded"], pageToken=token,
+                ).execute()
+            except Exception as e:
+                if getattr(getattr(e, "resp", None), "status", None) == 404:
+                    return None, None
+                raise
+            for entry in response.get("history", []):
+                ids.extend(added["message"]["id"] for added in entry.get("messagesAdded", []))
+            latest = response.get("historyId", latest)
+            token = response.get("nextPageToken")
+            if not token:
+                return list(dict.fromkeys(ids)), latest
+
+    # -------- MESSAGES -------- #
+    def _fetch(self, message_ids, failed, **params):
+        """Fetch messages with batch requests, retrying throttled ones; yields each message.
+
+        Messages that could not be fetched are added to ``failed`` as
+        ``id -> (permanent, error)``. ``params`` go to ``messages.get``.
+        """
+        messages = self.service.users().messages()
+        attempts = {}
+        queue = list(message_ids)
+        while queue:
+            chunk, queue = queue[:self.batch_size], queue[self.batch_size:]
+            fetched, retry = [], []
+
+            def callback(request_id, response, exception):
+                if exception is None:
+                    fetched.append(response)
+                    return
+                status = getattr(getattr(exception, "resp", None), "status", None)
+                if status == 404:
+                    return  # deleted since it was listed
+                attempts[request_id] = attempts.get(request_id, 0) + 1
+                if status in RETRY_STATUSES and attempts[request_id] < self.max_attempts:
+                    retry.append(request_id)
+                else:
+                    failed[request_id] = (status not in RETRY_STATUSES, str(exception))
+
+            self.limiter.acquire(len(chunk))
+            batch = self.service.new_batch_http_request(callback=callback)
+            for message_id in chunk:
+                batch.add(messages.get(userId="me", id=message_id, **params), request_id=message_id)
+            batch.execute()
+            if retry:
+                time.sleep(min(2 ** max(attempts[i] for i in retry), 30))
+                queue.extend(retry)
+            yield from fetched
+
+    # -------- POLL -------- #
+    def poll(self):
+        """Process new activation emails once. Returns an ``IngestResult``."""
+        with self._lock:
+            result = IngestResult()
+            users = self.service.users()
+            message_ids, latest, watermark = None, None, None
+            if self.state.history_id:
+                message_ids, latest = self._list_since(self.state.history_id)
+            if message_ids is None:
+                # First run, or the cursor expired: take the cursor before listing so nothing is missed,
+                # and only list what is newer than the emails already applied (or the backfill window).
+                latest = users.getProfile(userId="me").execute()["historyId"]
+                watermark = self.state.internal_date
+                if watermark is None and self.backfill_days is not None:
+                    watermark = int((time.time() - self.backfill_days * 86400) * 1000)
+                message_ids = self._list_all(after=watermark // 1000 if watermark is not None else None)
+            message_ids = [i for i in message_ids if i not in self.state.poisoned]
+
+            failed = {}
+            subject = self.subject.lower()
+            matching, newest = [], None
+            for message in self._fetch(message_ids, failed, format="metadata", metadataHeaders=["Subject"]):
+                received = int(message.get("internalDate", 0))
+                if subject not in message_subject(message).lower():
+                    continue
+                if watermark is not None and received <= watermark:
+                    continue
+                matching.append(message["id"])
+                newest = max(received, newest or 0)
+            for message in self._fetch(matching, failed, format="full"):
+                result.messages += 1
+                result.isins.update(extract_isins(message_body(message)))
+            blocked = self._record_failures(failed, result)
+
+            dataset = self.dataset_loader()
+            record_ids = []
+            for isin in sorted(result.isins):
+                ids = dataset.by_isin.get(isin, [])
+                record_ids.extend(ids)
+                if not ids:
+                    result.unmatched.add(isin)
+
+            diffs = build_diffs(self.record_loader(record_ids), {"Status": self.status}) if record_ids else []
+            if diffs:
+                update = run_bulk_update(self.table, diffs)
+                result.updated = update.updated
+                result.errors.extend(update.errors)
+                if update.updated and self.on_updated:
+                    self.on_updated(update.updated)
+
+            if not result.errors and not blocked:
+                self.state.save(latest, newest)
+            else:
+                self.state.save()  # keep the failure counts; the cursor stays for a retry
+            self.last_result = result
+            self.last_poll = time.time()
+            return result
+
+    def _record_failures(self, failed, result):
+        """Count fetch failures; poison the permanent or repeated ones. Returns whether any should be retried."""
+        blocked = False
+        for message_id, (permanent, error) in failed.items():
+            count = self.state.failures.get(message_id, 0) + 1
+            if permanent or count >= POISON_AFTER_POLLS:
+                self.state.failures.pop(message_id, None)
+                self.state.poisoned.add(message_id)
+                result.poisoned.append((message_id, error))
+            else:
+                self.state.failures[message_id] = count
+                result.errors.append((message_id, error))
+                blocked = True
+        for message_id in list(self.state.failures):
+            if message_id not in failed:
+                del self.state.failures[message_id]  # fetched fine this time
+        return blocked
+
+    # -------- WORKER -------- #
+    def start(self, interval=300):
+        """Poll every ``interval`` seconds on a daemon thread (idempotent); returns self."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, args=(interval,), name="gmail-ingest", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def _run(self, interval):
+        while True:
+            try:
+                self.poll()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def request_poll(self):
+        """Ask the worker to poll as soon as possible."""
+        self._wake.set()
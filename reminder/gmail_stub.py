@@ -0,0 +1,170 @@
+"""In-memory stand-in for the parts of the Gmail API used by ``GmailIngestor``."""
+import base64
+import copy
+import itertools
+import re
+import time
+
+
+class StubHttpError(Exception):
+    """Error shaped like ``googleapiclient.errors.HttpError`` (has ``resp.status``)."""
+
+    def __init__(self, status, message=""):
+        super().__init__(f"HTTP {status} {message}".strip())
+        self.resp = type("Response", (), {"status": status})()
+
+
+class _Request:
+    def __init__(self, service, fn):
+        self._service = service
+        self._fn = fn
+
+    def execute(self):
+        self._service.requests += 1
+        return self._fn()
+
+
+class _Batch:
+    def __init__(self, service, callback):
+        self._service = service
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id=None):
+        self._requests.append((request_id, request))
+
+    def execute(self):
+        self._service.batches += 1
+        for request_id, request in self._requests:
+            try:
+                response, error = request._fn(), None
+            except Exception as e:
+                response, error = None, e
+            self._callback(request_id, response, error)
+
+
+class _Resource:
+    def __init__(self, **methods):
+        self.__dict__.update(methods)
+
+
+class StubGmailService:
+    """Mailbox held in memory, with history ids, paging and batch requests.
+
+    ``add_message`` delivers an HTML email. ``throttle(n)`` makes the next
+    ``n`` ``messages.get`` calls fail with 429, ``break_message(id, status)``
+    makes every fetch of one message fail and ``expire_history()`` makes older
+    history ids return 404, so retries, poison messages and cursor resets can
+    be tried without a Google account. ``requests`` and ``batches`` count
+    round trips and ``fetched`` counts messages got per ``format``.
+    """
+
+    def __init__(self, page_size=100):
+        self.page_size = page_size
+        self.messages = {}
+        self.history = []  # (history id, message id)
+        self.history_floor = 0
+        self.requests = 0
+        self.batches = 0
+        self.fetched = {}
+        self.broken = {}
+        self._throttled = 0
+        self._clock = int(time.time() * 1000)
+        self._ids = itertools.count(1)
+        self._history_id = 1000
+
+    # -------- MAILBOX -------- #
+    def add_message(self, subject, html):
+        message_id = f"msg{next(self._ids):08d}"
+        self._clock += 1000
+        data = base64.urlsafe_b64encode(html.encode()).decode().rstrip("=")
+        self.messages[message_id] = {
+            "id": message_id,
+            "internalDate": str(self._clock),
+            "payload": {
+                "mimeType": "multipart/alternative",
+                "headers": [{"name": "Subject", "value": subject}],
+                "parts": [{"mimeType": "text/html", "body": {"data": data}}],
+            },
+        }
+        self._history_id += 1
+        self.history.append((self._history_id, message_id))
+        return message_id
+
+    def throttle(self, count):
+        self._throttled = count
+
+    def break_message(self, message_id, status=400):
+        self.broken[message_id] = status
+
+    def expire_history(self):
+        self.history_floor = self._history_id
+
+    # -------- API SURFACE -------- #
+    def users(self):
+        return _Resource(
+            getProfile=self._get_profile,
+            messages=lambda: _Resource(list=self._list_messages, get=self._get_message),
+            history=lambda: _Resource(list=self._list_history),
+        )
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+    def _page(self, items, token):
+        start = int(token or 0)
+        end = start + self.page_size
+        return items[start:end], (str(end) if end < len(items) else None)
+
+    def _get_profile(self, userId):
+        return _Request(self, lambda: {"historyId": str(self._history_id)})
+
+    def _list_messages(self, userId, q="", maxResults=None, pageToken=None):
+        def run():
+            wanted = q.split('"')[1].lower() if '"' in q else ""
+            after = re.search(r"\bafter:(\d+)", q)
+            after = int(after.group(1)) * 1000 if after else 0
+            ids = [
+                m["id"] for m in reversed(list(self.messages.values()))
+                if wanted in m["payload"]["headers"][0]["value"].lower() and int(m["internalDate"]) >= after
+            ]
+            page, token = self._page([{"id": i} for i in ids], pageToken)
+            return {"messages": page, "nextPageToken": token} if token else {"messages": page}
+        return _Request(self, run)
+
+    def _get_message(self, userId, id, format="full", metadataHeaders=None):
+        def run():
+            if self._throttled:
+                self._throttled -= 1
+                raise StubHttpError(429, "rateLimitExceeded")
+            if id in self.broken:
+                raise StubHttpError(self.broken[id], "failed")
+            if id not in self.messages:
+                raise StubHttpError(404, "not found")
+            self.fetched[format] = self.fetched.get(format, 0) + 1
+            message = self.messages[id]
+            if format != "metadata":
+                return message
+            wanted = {name.lower() for name in metadataHeaders or ()}
+            message = copy.deepcopy(message)
+            payload = message["payload"]
+            payload["headers"] = [h for h in payload["headers"] if not wanted or h["name"].lower() in wanted]
+            del payload["parts"]
+            return message
+        return _Request(self, run)
+
+    def _list_history(self, userId, startHistoryId, historyTypes=None, pageToken=None):
+        def run():
+            start = int(startHistoryId)
+            if start < self.history_floor:
+                raise StubHttpError(404, "history expired")
+            entries = [
+                {"id": str(h), "messagesAdded": [{"message": {"id": m}}]}
+                for h, m in self.history if h > start
+            ]
+            page, token = self._page(entries, pageToken)
+            response = {"history": page, "historyId": str(self._history_id)}
+            if token:
+                response["nextPageToken"] = token
+            return response
+        return _Request(self, run)
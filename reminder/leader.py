@@ -0,0 +1,46 @@
+"""Exclusive file lock electing the one process that runs a background worker."""
+import os
+
+try:
+    import fcntl
+except ImportError:  # no flock (Windows): every process counts as the leader
+    fcntl = None
+
+
+class LeaderLock:
+    """Non-blocking exclusive ``flock`` on ``path``, held for the life of the process.
+
+    Every app process sharing the state directory calls ``acquire``; only the
+    one that gets the lock starts the worker. The OS releases it when that
+    process exits, so another process's next ``acquire`` takes over.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        """True if this process holds the lock (now or already)."""
+        if self._file is not None or fcntl is None:
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        f = open(self.path, "a+")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(f"{os.getpid()}\n")  # for whoever wonders which process runs it
+        f.flush()
+        self._file = f
+        return True
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
@@ -0,0 +1,245 @@
+"""Pooled SMTP delivery with a bounded send queue, retries and throughput stats."""
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import Future
+
+# Connection-level failures: the session is dropped and the message retried.
+DISCONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError, OSError)
+
+
+def _close(conn):
+    try:
+        conn.quit()
+    except Exception:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class SMTPPool:
+    """Up to ``size`` logged-in SMTP sessions, reused across messages.
+
+    A session idle for longer than ``max_idle`` seconds is closed and replaced
+    instead of being reused, since servers drop quiet connections.
+    """
+
+    def __init__(self, host, port, username=None, password=None, size=2, starttls=True,
+                 timeout=30, max_idle=120, factory=smtplib.SMTP):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.factory = factory
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []  # (connection, last used)
+        self._lock = threading.Lock()
+
+        self.opened = 0
+        self.reused = 0
+
+    def _connect(self):
+        conn = self.factory(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            conn.starttls()
+        if self.username:
+            conn.login(self.username, self.password)
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def acquire(self):
+        """Return a logged-in session, waiting while all ``size`` are in use."""
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    conn, last_used = self._idle.pop()
+                if time.monotonic() - last_used > self.max_idle:
+                    _close(conn)
+                    continue
+                with self._lock:
+                    self.reused += 1
+                return conn
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, broken=False):
+        """Return a session to the pool, or close it if it failed."""
+        if broken:
+            _close(conn)
+        else:
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            _close(conn)
+
+
+class Mailer:
+    """Send queue drained by worker threads that share an ``SMTPPool``.
+
+    ``submit`` blocks while ``queue_size`` messages are waiting (backpressure)
+    and returns a ``Future`` resolving to True, or to the error once
+    ``max_attempts`` are used up. Disconnects and 4xx replies are retried with
+    exponential backoff on a fresh session; 5xx replies fail immediately.
+    ``on_delivery(seconds, error)`` is called after each message with the
+    time from first attempt to outcome (error is None on success).
+    """
+
+    def __init__(self, pool, workers=2, queue_size=500, max_attempts=3, backoff=1.0, on_delivery=None):
+        self.pool = pool
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.on_delivery = on_delivery
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self._first_send = None
+        self._last_send = None
+
+    def start(self):
+        """Start the worker threads (idempotent) and return self."""
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work, name=f"mailer-{len(self._threads)}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def submit(self, message, timeout=None):
+        """Queue a ``email.message.Message``; raises ``queue.Full`` after ``timeout``."""
+        self.start()
+        future = Future()
+        self._queue.put((message, future), timeout=timeout)
+        return future
+
+    def send_all(self, messages, timeout=None):
+        """Queue messages and wait for them. Returns ``(sent, errors)``."""
+        futures = [self.submit(message, timeout) for message in messages]
+        errors = []
+        for future in futures:
+            error = future.result()
+            if error is not True:
+                errors.append(error)
+        return len(futures) - len(errors), errors
+
+    # -------- WORKERS -------- #
+    def _work(self):
+        while True:
+            message, future = self._queue.get()
+            try:
+                result = self._deliver(message)
+            except Exception as e:
+                # Anything _deliver did not expect still resolves the future; the worker lives on.
+                result = e
+            try:
+                future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, message):
+        started = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            error = None
+            try:
+                conn = self.pool.acquire()
+            except Exception as e:
+                conn, error = None, e
+            if conn is not None:
+                try:
+                    conn.send_message(message)
+                except smtplib.SMTPResponseException as e:
+                    # A rejected message leaves the session usable.
+                    self.pool.release(conn)
+                    error = e
+                    if e.smtp_code >= 500:
+                        break
+                except smtplib.SMTPRecipientsRefused as e:
+                    self.pool.release(conn)
+                    error = e
+                    break
+                except DISCONNECT_ERRORS as e:
+                    self.pool.release(conn, broken=True)
+                    error = e
+                except Exception as e:
+                    # Not an SMTP reply (e.g. a malformed message): drop the session, don't retry.
+                    self.pool.release(conn, broken=True)
+                    error = e
+                    break
+                else:
+                    self.pool.release(conn)
+                    self._record(started, error=None)
+                    return True
+            if attempt < self.max_attempts:
+                with self._lock:
+                    self.retried += 1
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+        self._record(started, error)
+        return error
+
+    def _record(self, started, error):
+        finished = time.monotonic()
+        with self._lock:
+            if error is None:
+                self.sent += 1
+                self._first_send = self._first_send if self._first_send is not None else started
+                self._last_send = finished
+            else:
+                self.failed += 1
+        if self.on_delivery is not None:
+            try:
+                self.on_delivery(finished - started, error)
+            except Exception:
+                pass  # a broken observer must not change the delivery outcome
+
+    # -------- STATS -------- #
+    def stats(self):
+        """Delivery counts, messages/second and how often pooled sessions were reused."""
+        with self._lock:
+            elapsed = (self._last_send - self._first_send) if self.sent else 0.0
+            sessions = self.pool.opened + self.pool.reused
+            return {
+                "sent": self.sent,
+                "failed": self.failed,
+                "retried": self.retried,
+                "queued": self._queue.qsize(),
+                "connections_opened": self.pool.opened,
+                "connections_reused": self.pool.reused,
+                "reuse_rate": round(self.pool.reused / sessions, 3) if sessions else 0.0,
+                "messages_per_second": round(self.sent / elapsed, 1) if elapsed > 0 else 0.0,
+            }
+
+
+def group_by_recipient(reminders, fallback=None):
+    """Map each email address to its reminders; reminders without one go to ``fallback``.
+
+    A cell holding several addresses (comma or semicolon separated) sends to
+    each of them.
+    """
+    digests = {}
+    for reminder in reminders:
+        addresses = [a.strip() for a in (reminder.email or "").replace(";", ",").split(",") if a.strip()]
+        for address in addresses or ([fallback] if fallback else []):
+            digests.setdefault(address, []).append(reminder)
+    return digests
@@ -0,0 +1,238 @@
+"""Low-overhead in-process metrics with a Prometheus text-format export."""
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (seconds) of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        name + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+class Metrics:
+    """Counters and latency histograms keyed by name and labels.
+
+    Recording takes one lock and a bisect, so the instrumentation can stay on
+    in production. ``register(collector)`` adds a function called only at
+    export time that returns ``(name, kind, help, labels, value)`` samples,
+    for components that already keep their own stats (Airtable client,
+    mailer, dataset store).
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}    # name -> {label key: value}
+        self._histograms = {}  # name -> {label key: _Histogram}
+        self._help = {}
+        self._collectors = []
+        self.exporter_error = None  # last OSError writing the file or binding the port
+
+    def describe(self, name, help):
+        self._help[name] = help
+
+    def register(self, collector):
+        self._collectors.append(collector)
+
+    # -------- RECORDING -------- #
+    def inc(self, name, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = _label_key(labels)
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.counts[slot] += 1
+            histogram.count += 1
+            histogram.sum += seconds
+            if seconds > histogram.max:
+                histogram.max = seconds
+
+    def timer(self, name, **labels):
+        """Context manager observing the wall time of its block."""
+        return _Timer(self, name, labels)
+
+    # -------- READING -------- #
+    def _collected(self):
+        samples = []
+        for collector in list(self._collectors):
+            try:
+                samples.extend(collector())
+            except Exception:
+                continue  # a broken collector must not break the export
+        return samples
+
+    def snapshot(self):
+        """Rows for display: one per histogram series (count, avg, max) and counter series."""
+        rows = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                for key, h in sorted(series.items()):
+                    rows.append({
+                        "metric": name, "labels": dict(key), "count": h.count,
+                        "avg_ms": round(h.sum / h.count * 1000, 1) if h.count else 0.0,
+                        "max_ms": round(h.max * 1000, 1), "value": round(h.sum, 3),
+                    })
+            for name, series in sorted(self._counters.items()):
+                for key, value in sorted(series.items()):
+                    rows.append({"metric": name, "labels": dict(key), "count": None,
+                                 "avg_ms": None, "max_ms": None, "value": value})
+        for name, kind, help, labels, value in self._collected():
+            rows.append({"metric": name, "labels": labels, "count": None,
+                         "avg_ms": None, "max_ms": None, "value": value})
+        return rows
+
+    def ratio(self, numerator, denominator, **labels):
+        """Ratio of two counters with the same labels, or None while the denominator is 0."""
+        key = _label_key(labels)
+        with self._lock:
+            top = self._counters.get(numerator, {}).get(key, 0)
+            bottom = self._counters.get(denominator, {}).get(key, 0)
+        return top / bottom if bottom else None
+
+    def to_prometheus(self):
+        """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+
+        def header(name, kind):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                header(name, "counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                header(name, "histogram")
+                for key, h in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float("inf"),), h.counts):
+                        cumulative += count
+                        le = (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(key, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(h.sum)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+
+        collected = {}
+        for name, kind, help, labels, value in self._collected():
+            collected.setdefault((name, kind, help), []).append((labels, value))
+        for (name, kind, help), samples in sorted(collected.items()):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    # -------- EXPORT -------- #
+    def write_prometheus(self, path):
+        """Atomically write the export to ``path`` (e.g. for node_exporter's textfile collector)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def _export_failed(self, error, target):
+        self.exporter_error = error
+        self.inc("reminder_metrics_export_errors_total", target=target)
+
+    def start_exporter(self, path=None, port=None, interval=15, host="127.0.0.1"):
+        """Write the export to ``path`` every ``interval`` seconds and/or serve it on ``/metrics``.
+
+        Failures do not raise: they are counted in
+        ``reminder_metrics_export_errors_total`` and kept in ``exporter_error``.
+        """
+        if path:
+            def write_forever():
+                while True:
+                    try:
+                        self.write_prometheus(path)
+                    except OSError as e:
+                        self._export_failed(e, "file")
+                    time.sleep(interval)
+            threading.Thread(target=write_forever, name="metrics-writer", daemon=True).start()
+        if port:
+            try:
+                server = ThreadingHTTPServer((host, port), _Handler)
+            except OSError as e:
+                self._export_failed(e, "http")
+                return None
+            server.daemon_threads = True
+            server.metrics = self
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            return server
+        return None
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "started")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.started, **self.labels)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.metrics.to_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,333 @@
+"""Local SQLite mirror of the Airtable table, kept current with incremental syncs."""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from reminder.partition import created_time_partitions, fetch_partitioned
+
+# Re-read a little before the last sync to cover clock skew between us and Airtable.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def modified_since_formula(since):
+    """Airtable formula matching records modified after the given UTC datetime."""
+    stamp = since.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    return f"IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{stamp}'))"
+
+
+class SyncResult:
+    """Summary of a single mirror sync."""
+
+    def __init__(self, full, changed, deleted):
+        self.full = full
+        self.changed = changed
+        self.deleted = deleted
+
+    def __repr__(self):
+        return f"SyncResult(full={self.full}, changed={self.changed}, deleted={self.deleted})"
+
+
+class AirtableMirror:
+    """SQLite copy of an Airtable table.
+
+    The table is synced in named projections, each a list of field names sent
+    as Airtable's ``fields=`` parameter (``None`` means every field). Each
+    projection keeps its own watermark. Its first sync pulls every record;
+    later syncs only fetch records whose LAST_MODIFIED_TIME() is after the
+    previous sync. Deletions are detected with an ID-only pass that requests a
+    single small field. A projection becomes active the first time it is
+    synced and is kept current by every later ``sync()``.
+
+    Full pulls are split into ``max_workers`` partitions fetched in parallel:
+    CREATED_TIME() ranges of equal size once the mirror knows the table, the
+    ``partitions`` formulas (e.g. from ``field_partitions``) on a cold start.
+
+    Projection field names are matched to the table's schema without regard
+    to case the first time the mirror syncs (``table.field_names()``), so a
+    differently cased field in the base does not fail the fetch; names the
+    schema lacks are left out of the request.
+
+    ``version`` counts the changes to the mirrored rows. It is kept in the
+    SQLite file, so it survives restarts and is shared by every process
+    using the mirror; ``mirror_id`` tells one mirror file from another.
+    """
+
+    def __init__(self, path, projections=None, id_field="ISIN", partitions=None, max_workers=4):
+        self.path = path
+        self.projections = projections or {"all": None}
+        self.id_field = id_field
+        self.partitions = partitions or []
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._canonical = None  # lower-cased field name -> name in the table's schema
+        self._listeners = []
+        self._changes = queue.Queue()  # (changed ids, deleted ids) not yet sent to listeners
+        self._notifier = None
+        self.last_listener_error = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                " id TEXT PRIMARY KEY,"
+                " created_time TEXT,"
+                " fields TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('mirror_id', ?)", (uuid.uuid4().hex,)
+            )
+            self.mirror_id = self._get_meta("mirror_id")
+
+    # -------- METADATA -------- #
+    def _get_meta(self, key):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def _version(self):
+        return int(self._get_meta("version") or 0)
+
+    def _bump_version(self):
+        self._set_meta("version", str(self._version() + 1))
+
+    @property
+    def version(self):
+        with self._lock:
+            return self._version()
+
+    def last_sync(self, projection=None):
+        """Return the UTC datetime of a projection's last successful sync, or None."""
+        projection = projection or next(iter(self.projections))
+        with self._lock:
+            value = self._get_meta(f"last_sync:{projection}")
+        return datetime.fromisoformat(value) if value else None
+
+    def last_full_sync(self):
+        """Return the UTC datetime of the last full (reconciling) sync, or None."""
+        with self._lock:
+            value = self._get_meta("last_full_sync")
+        return datetime.fromisoformat(value) if value else None
+
+    def active_projections(self):
+        """Projections that have been synced at least once (always including the first)."""
+        first = next(iter(self.projections))
+        return [
+            name for name in self.projections
+            if name == first or self.last_sync(name) is not None
+        ]
+
+    # -------- SYNC -------- #
+    def sync(self, table, projections=None, full=False, reconcile_after=None):
+        """Bring the given projections (default: the active ones) up to date.
+
+        With ``reconcile_after`` (a timedelta), the sync becomes a full refetch
+        once that long has passed since the last full sync.
+        """
+        started = datetime.now(timezone.utc)
+        active = self.active_projections()
+        names = list(projections or active)
+        if reconcile_after is not None:
+            last_full = self.last_full_sync()
+            full = full or last_full is None or started - last_full > reconcile_after
+
+        fetched = []  # (projection fields, records)
+        live_ids = None
+        id_fields = self._resolve(table, [self.id_field])
+        if not id_fields and self._canonical:
+            id_fields = [next(iter(self._canonical.values()))]  # any one field keeps the ID pass small
+        for name in names:
+            fields = self.projections[name]
+            if fields:
+                fields = self._resolve(table, fields) or id_fields
+            options = {"fields": fields} if fields else {}
+            last = self.last_sync(name)
+            if full or last is None:
+                records = fetch_partitioned(
+                    table, self._partition_formulas(), self.max_workers, **options
+                )
+                live_ids = {r["id"] for r in records}
+            else:
+                records = table.all(formula=modified_since_formula(last - SYNC_OVERLAP), **options)
+            fetched.append((fields, records))
+        if live_ids is None:
+            live_ids = {r["id"] for r in table.all(fields=id_fields)}
+
+        with self._lock, self._conn:
+            updated = set()
+            for fields, records in fetched:
+                updated.update(self._upsert(records, fields))
+            known_ids = {row[0] for row in self._conn.execute("SELECT id FROM records")}
+            stale_ids = known_ids - live_ids
+            self._conn.executemany(
+                "DELETE FROM records WHERE id = ?", [(i,) for i in stale_ids]
+            )
+            for name in names:
+                self._set_meta(f"last_sync:{name}", started.isoformat())
+            if full and set(names) >= set(active):
+                self._set_meta("last_full_sync", started.isoformat())
+            if updated or stale_ids:
+                self._bump_version()
+
+        self._notify(updated, stale_ids)
+        return SyncResult(full, len(updated), len(stale_ids))
+
+    def _resolve(self, table, fields):
+        """``fields`` as the table's schema spells them, without the ones it lacks.
+
+        The schema is read once; if it cannot be read (no ``field_names``, the
+        token lacks schema access, or it is empty) the names are used as given.
+        """
+        if self._canonical is None:
+            try:
+                names = table.field_names()
+            except Exception:
+                names = None
+            if not names:
+                return list(fields)
+            self._canonical = {name.lower(): name for name in names}
+        resolved = [self._canonical.get(name.lower()) for name in fields]
+        return [name for name in resolved if name]
+
+    # -------- CHANGE LISTENERS -------- #
+    def subscribe(self, listener):
+        """Call ``listener(changed_records, deleted_ids)`` after every sync or apply that changes rows.
+
+        Listeners run in order on one background thread, so a write never
+        waits for them; ``changed_records`` are read when they are called.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, changed_ids, deleted_ids):
+        if not self._listeners or not (changed_ids or deleted_ids):
+            return
+        self._changes.put((list(changed_ids), list(deleted_ids)))
+        with self._lock:
+            if self._notifier is None:
+                self._notifier = threading.Thread(target=self._deliver, name="mirror-listeners", daemon=True)
+                self._notifier.start()
+
+    def _deliver(self):
+        while True:
+            changed_ids, deleted_ids = self._changes.get()
+            try:
+                changed = self.records(changed_ids) if changed_ids else []
+                for listener in list(self._listeners):
+                    try:
+                        listener(changed, deleted_ids)
+                    except Exception as e:
+                        self.last_listener_error = e
+            except Exception as e:  # the mirror could not be read; keep the thread alive
+                self.last_listener_error = e
+            finally:
+                self._changes.task_done()
+
+    def wait_for_listeners(self):
+        """Block until every change so far has been delivered to the listeners."""
+        self._changes.join()
+
+    def _partition_formulas(self):
+        """Balanced created-time ranges from the mirrored rows, else the configured partitions."""
+        if self.max_workers < 2:
+            return []
+        with self._lock:
+            created = [row[0] for row in self._conn.execute(
+                "SELECT created_time FROM records WHERE created_time IS NOT NULL ORDER BY created_time"
+            )]
+        if len(created) < self.max_workers * 100:
+            return self.partitions
+        step = len(created) / self.max_workers
+        boundaries = {
+            datetime.fromisoformat(created[int(step * i)].replace("Z", "+00:00"))
+            for i in range(1, self.max_workers)
+        }
+        return created_time_partitions(boundaries)
+
+    def _upsert(self, airtable_records, projection=None):
+        """Write records whose fields differ from the mirror; return their ids.
+
+        With a ``projection`` (list of field names), only those fields are
+        replaced and the record's other mirrored fields are kept.
+        """
+        ids = [r["id"] for r in airtable_records]
+        existing = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            existing.update(self._conn.execute(
+                f"SELECT id, fields FROM records WHERE id IN ({placeholders})", chunk
+            ))
+        projected = {name.lower() for name in projection} if projection else None
+        rows = []
+        for r in airtable_records:
+            fields = r.get("fields", {})
+            if projected is not None and r["id"] in existing:
+                kept = {
+                    k: v for k, v in json.loads(existing[r["id"]]).items()
+                    if k.lower() not in projected
+                }
+                fields = {**kept, **fields}
+            fields = json.dumps(fields, sort_keys=True)
+            if existing.get(r["id"]) != fields:
+                rows.append((r["id"], r.get("createdTime"), fields))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO records (id, created_time, fields) VALUES (?, ?, ?)",
+            rows,
+        )
+        return [row[0] for row in rows]
+
+    def apply(self, upserts=(), deletes=()):
+        """Write records returned by Airtable writes straight into the mirror.
+
+        Returns the mirror version after the change.
+        """
+        deletes = list(deletes)
+        with self._lock, self._conn:
+            updated = self._upsert(list(upserts))
+            removed = self._conn.executemany(
+                "DELETE FROM records WHERE id = ?", [(i,) for i in deletes]
+            ).rowcount
+            if updated or removed:
+                self._bump_version()
+            version = self._version()
+        self._notify(updated, deletes if removed else [])
+        return version
+
+    # -------- READS -------- #
+    def records(self, ids=None):
+        """Return mirrored records (all, or those with the given ids) shaped like ``Table.all()``."""
+        with self._lock:
+            if ids is None:
+                rows = self._conn.execute(
+                    "SELECT id, created_time, fields FROM records ORDER BY created_time, id"
+                ).fetchall()
+            else:
+                ids, rows = list(ids), []
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows.extend(self._conn.execute(
+                        f"SELECT id, created_time, fields FROM records WHERE id IN ({placeholders})", chunk
+                    ))
+        return [
+            {"id": record_id, "createdTime": created, "fields": json.loads(fields)}
+            for record_id, created, fields in rows
+        ]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
@@ -0,0 +1,191 @@
+"""Turn raw Airtable field dicts into the flat records the pages display."""
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+
+BILL_DATE_COUNT = 72
+BILL_DATE_COLUMNS = [f"Bill Date {i}" for i in range(1, BILL_DATE_COUNT + 1)]
+
+# (display column, lower-cased Airtable field name, kind) in display order.
+RECORD_FIELDS = [
+    ("Depository", "depository", "text"),
+    ("ISIN", "isin", "text"),
+    ("Issuer", "issuer", "text"),
+    ("ARN", "arn if isin na (nsdl)", "text"),
+    ("Status", "status", "text"),
+    ("No of ISINs", "no of isin", "text"),
+    ("ISIN Allotment Date", "isin allotment date", "date"),
+    ("GSTIN", "gstin", "text"),
+    ("Address", "address", "text"),
+    ("Company Link", "company link", "text"),
+    ("Email ID", "email id", "text"),
+    ("Company Referred By", "company referred by", "text"),
+    ("Amount", "amount", "amount"),
+] + [(column, column.lower(), "date") for column in BILL_DATE_COLUMNS]
+
+# Columns every page needs. The rest of the bill-date block loads lazily.
+CORE_COLUMNS = [column for column, _, _ in RECORD_FIELDS[:13]] + ["Bill Date 1"]
+
+# Airtable field names (as the New Record form writes them) for each fetch projection.
+CORE_FIELD_NAMES = [
+    "Depository", "ISIN", "Issuer", "ARN if ISIN NA (NSDL)", "Status", "No of ISIN",
+    "ISIN allotment date", "GSTIN", "Address", "Company Link", "Email ID",
+    "Company Referred By", "Amount", "Bill Date 1",
+]
+BILL_DATE_FIELD_NAMES = list(BILL_DATE_COLUMNS)
+
+
+# -------- SCALAR HELPERS -------- #
+def safe_float(value):
+    """Safely convert value to float, return 0.0 if conversion fails"""
+    if value is None or value == "":
+        return 0.0
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+def safe_date_string(date_str):
+    """Safely format date string, return empty string if invalid"""
+    if not date_str:
+        return ""
+    try:
+        if isinstance(date_str, str):
+            # Added dayfirst=True to correctly parse D/M/Y formats; formats vary per cell,
+            # so pandas' "could not infer format" / dayfirst warnings are expected noise
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                parsed_date = pd.to_datetime(date_str, errors='coerce', dayfirst=True)
+            if pd.isna(parsed_date):
+                return ""
+            return parsed_date.strftime('%Y-%m-%d')
+        return date_str
+    except:
+        return ""
+
+
+# -------- PER-RECORD PATH -------- #
+def normalize_record(fields):
+    """Normalize one record's fields cell by cell (reference implementation)."""
+    f_lower = {k.lower(): v for k, v in fields.items()}
+    record = {}
+    for column, source, kind in RECORD_FIELDS:
+        if kind == "text":
+            record[column] = str(f_lower.get(source, "")).strip()
+        elif kind == "amount":
+            record[column] = safe_float(f_lower.get(source, 0))
+        else:
+            record[column] = safe_date_string(f_lower.get(source, ""))
+    return record
+
+
+# -------- BATCH PATH -------- #
+# UTC offset at the end of a timestamp ("...T00:00:00.000Z", "... 10:30+05:30").
+_UTC_OFFSET = re.compile(r"\d:\d\d(?::\d\d(?:\.\d+)?)?\s*(Z|[+-]\d\d:?\d\d)$", re.IGNORECASE)
+
+def _parse_batch(values):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed = pd.to_datetime(
+            pd.Series(values, dtype=object), format="mixed", dayfirst=True, errors="coerce"
+        )
+    formatted = parsed.dt.strftime('%Y-%m-%d').fillna("")
+    return dict(zip(values, formatted.tolist()))
+
+def parse_date_strings(values):
+    """Map each distinct date string to its ``safe_date_string`` output.
+
+    All values are parsed in one vectorized ``pd.to_datetime`` call. When the
+    batch is rejected as a whole (mixed time zones), values are regrouped by
+    UTC offset and each group is parsed in one call; only a group that still
+    fails falls back to the scalar parser, so the output always matches
+    ``safe_date_string``.
+    """
+    values = list(values)
+    if not values:
+        return {}
+    try:
+        return _parse_batch(values)
+    except (ValueError, TypeError, OverflowError):
+        pass
+    groups = {}
+    for value in values:
+        match = _UTC_OFFSET.search(value.strip())
+        offset = match.group(1).upper().replace(":", "") if match else ""
+        groups.setdefault(offset, []).append(value)
+    result = {}
+    for group in groups.values():
+        try:
+            result.update(_parse_batch(group))
+        except (ValueError, TypeError, OverflowError):
+            result.update({value: safe_date_string(value) for value in group})
+    return result
+
+def normalize_records(airtable_records, columns=None):
+    """Normalize a list of Airtable records, parsing every date column in one pass.
+
+    ``columns`` limits the output to those display columns (default: all).
+    """
+    spec = RECORD_FIELDS
+    if columns is not None:
+        wanted = set(columns)
+        spec = [field for field in RECORD_FIELDS if field[0] in wanted]
+    date_sources = [src for _, src, kind in spec if kind == "date"]
+
+    lowered = [
+        {k.lower(): v for k, v in r.get("fields", {}).items()} for r in airtable_records
+    ]
+    # Raw date matrix: one row per record, one cell per date column.
+    matrix = [[f.get(src, "") for src in date_sources] for f in lowered]
+    parsed = parse_date_strings({
+        value for row in matrix for value in row if value and isinstance(value, str)
+    })
+
+    records = []
+    for f, row in zip(lowered, matrix):
+        dates = iter(row)
+        record = {}
+        for column, source, kind in spec:
+            if kind == "text":
+                record[column] = str(f.get(source, "")).strip()
+            elif kind == "amount":
+                record[column] = safe_float(f.get(source, 0))
+            else:
+                value = next(dates)
+                if not value:
+                    record[column] = ""
+                elif isinstance(value, str):
+                    record[column] = parsed[value]
+                else:
+                    record[column] = value
+        records.append(record)
+    return records
+
+
+def normalize_bill_dates(airtable_records):
+    """Bill Date 1..72 of each record as one ``datetime64[D]`` matrix, NaT where empty.
+
+    Row ``i`` belongs to ``airtable_records[i]``. Only the filled cells are
+    visited and each distinct string is parsed once (as ``parse_date_strings``
+    does); values that are not date strings, or do not parse, stay NaT.
+    """
+    column_of = {column.lower(): i for i, column in enumerate(BILL_DATE_COLUMNS)}
+    rows, columns, values = [], [], []
+    for row, r in enumerate(airtable_records):
+        for key, value in r.get("fields", {}).items():
+            column = column_of.get(key.lower())
+            if column is not None and value and isinstance(value, str):
+                rows.append(row)
+                columns.append(column)
+                values.append(value)
+
+    matrix = np.full((len(airtable_records), BILL_DATE_COUNT), np.datetime64("NaT"), dtype="datetime64[D]")
+    if values:
+        parsed = parse_date_strings(set(values))
+        distinct = list(parsed)
+        days = np.array([parsed[value] or "NaT" for value in distinct], dtype="datetime64[D]")
+        position = {value: i for i, value in enumerate(distinct)}
+        matrix[rows, columns] = days[[position[value] for value in values]]
+    return matrix
@@ -0,0 +1,109 @@
+"""Per-issuer Company Performance Dashboard profiles, built once per data version."""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+class CompanyProfile:
+    """Figures and billing history of one issuer.
+
+    ``bill_dates`` are the issuer's unique bill dates (sorted
+    ``datetime64[D]``); ``dates_by_year`` maps each year to them formatted
+    for display, latest year first.
+    """
+
+    __slots__ = ("issuer", "total_billed_amount", "total_records", "bill_dates", "dates_by_year")
+
+    def __init__(self, issuer, total_billed_amount, total_records, bill_dates, dates_by_year):
+        self.issuer = issuer
+        self.total_billed_amount = total_billed_amount
+        self.total_records = total_records
+        self.bill_dates = bill_dates
+        self.dates_by_year = dates_by_year
+
+    @property
+    def first_bill_date(self):
+        return self.bill_dates[0].item() if len(self.bill_dates) else None
+
+    @property
+    def last_bill_date(self):
+        return self.bill_dates[-1].item() if len(self.bill_dates) else None
+
+    def _after(self, today):
+        return np.searchsorted(self.bill_dates, np.datetime64(today or date.today(), "D"), side="right")
+
+    def upcoming_bills(self, today=None):
+        """Number of unique bill dates after ``today``."""
+        return int(len(self.bill_dates) - self._after(today))
+
+    def next_bill_date(self, today=None):
+        """First bill date after ``today``, or None."""
+        position = self._after(today)
+        return self.bill_dates[position].item() if position < len(self.bill_dates) else None
+
+
+class CompanyProfiles:
+    """Every issuer's CompanyProfile, looked up by issuer name.
+
+    Amount totals are one ``bincount`` over the Issuer codes of the
+    dataset's RecordTable and the bill dates come from the BillSchedule,
+    split per issuer after one stable sort, so the build costs a few array
+    passes rather than one scan per company.
+    Each distinct date is formatted once for the whole table.
+    """
+
+    def __init__(self, dataset, schedule):
+        frame = dataset.table().frame
+        codes = frame["Issuer"].cat.codes.to_numpy()
+        names = frame["Issuer"].cat.categories.tolist()
+        amounts = frame["Amount"].to_numpy()
+        totals = np.bincount(codes, weights=amounts, minlength=len(names)) if len(names) else []
+        counts = np.bincount(codes, minlength=len(names)) if len(names) else []
+
+        dates_of = self._dates_by_issuer(schedule)
+        empty = (np.array([], dtype="datetime64[D]"), {})
+        self._profiles = {}
+        for code, issuer in enumerate(names):
+            bill_dates, by_year = dates_of.get(issuer, empty)
+            self._profiles[issuer] = CompanyProfile(
+                issuer, float(totals[code]), int(counts[code]), bill_dates, by_year
+            )
+
+    @staticmethod
+    def _dates_by_issuer(schedule):
+        """issuer -> (unique sorted bill dates, {year: formatted dates}) from the schedule."""
+        if not len(schedule):
+            return {}
+        codes, names = pd.factorize(pd.Series(schedule.issuers, dtype=object))
+        order = np.argsort(codes, kind="stable")  # the schedule is date-sorted, so dates stay sorted per issuer
+        codes, dates = codes[order], schedule.dates[order]
+        keep = np.ones(len(dates), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (dates[1:] != dates[:-1])
+        codes, dates = codes[keep], dates[keep]
+
+        days, day_of = np.unique(dates, return_inverse=True)
+        labels = np.array([day.item().strftime("%B %d, %Y") for day in days], dtype=object)[day_of].tolist()
+        years = (days.astype("datetime64[Y]").astype(int) + 1970)[day_of]
+
+        # Runs of one (issuer, year), in issuer then date order.
+        starts = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (years[1:] != years[:-1])])
+        ends = np.r_[starts[1:], len(codes)].tolist()
+        codes = codes.tolist()
+        result, first, by_year = {}, 0, {}
+        for start, end, year in zip(starts.tolist(), ends, years[starts].tolist()):
+            by_year[year] = labels[start:end]
+            if end == len(codes) or codes[end] != codes[start]:  # last run of this issuer
+                result[names[codes[start]]] = (dates[first:end], dict(reversed(by_year.items())))
+                first, by_year = end, {}
+        return result
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def __contains__(self, issuer):
+        return issuer in self._profiles
+
+    def get(self, issuer):
+        """The issuer's CompanyProfile, or None for an unknown issuer."""
+        return self._profiles.get(issuer)
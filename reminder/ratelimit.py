@@ -0,0 +1,34 @@
+"""Thread-safe token bucket used to stay under Airtable's request rate limit."""
+import threading
+import time
+
+# Airtable allows 5 requests per second per base.
+AIRTABLE_REQUESTS_PER_SECOND = 5
+
+
+class TokenBucket:
+    """Blocking token bucket: ``acquire()`` waits until a request may be sent."""
+
+    def __init__(self, rate=AIRTABLE_REQUESTS_PER_SECOND, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until ``tokens`` are available, then take them. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
@@ -0,0 +1,87 @@
+"""Sorted bill schedule with binary-search range queries."""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+class BillSchedule:
+    """Every (bill date, record row, issuer) triple, sorted by bill date.
+
+    ``rows`` are positions in the record list the schedule was built from.
+    Range queries use ``np.searchsorted`` on the date column, so their cost
+    does not grow with the number of records.
+    """
+
+    def __init__(self, dates, rows, issuers):
+        self.dates = dates
+        self.rows = rows
+        self.issuers = issuers
+        self._by_issuer = {}
+        if len(issuers):
+            self._by_issuer = pd.Series(issuers).groupby(issuers, sort=False).indices
+
+    @classmethod
+    def from_dataset(cls, dataset):
+        """Build the schedule from a dataset's bill-date matrix and Issuer column."""
+        rows, columns = np.nonzero(~np.isnat(dataset.bill_dates()))
+        dates = dataset.bill_dates()[rows, columns]
+        order = np.argsort(dates, kind="stable")  # ties stay in row, then column order
+        rows = rows[order].astype(np.int64)
+        return cls(dates[order], rows, dataset.table().issuers(rows))
+
+    def __len__(self):
+        return len(self.dates)
+
+    # -------- RANGE QUERIES -------- #
+    def _bounds(self, start, end):
+        """Index range of bills with start <= date <= end."""
+        lo = np.searchsorted(self.dates, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self.dates, np.datetime64(end, "D"), side="right")
+        return lo, max(lo, hi)
+
+    def count_between(self, start, end):
+        """Number of bills dated between start and end (inclusive)."""
+        lo, hi = self._bounds(start, end)
+        return int(hi - lo)
+
+    def count_due_within(self, days, today=None):
+        """Number of bills due between today and today + days."""
+        today = today or date.today()
+        return self.count_between(today, today + timedelta(days=days))
+
+    def count_upcoming(self, today=None):
+        """Number of bills dated today or later."""
+        today = today or date.today()
+        lo = np.searchsorted(self.dates, np.datetime64(today, "D"), side="left")
+        return int(len(self.dates) - lo)
+
+    def due_slice(self, days, today=None):
+        """``(rows, issuers, dates, days until due)`` arrays for bills due within ``days``, soonest first."""
+        today = today or date.today()
+        lo, hi = self._bounds(today, today + timedelta(days=days))
+        dates = self.dates[lo:hi]
+        return self.rows[lo:hi], self.issuers[lo:hi], dates, (dates - np.datetime64(today, "D")).astype(np.int64)
+
+    def due_within(self, days, today=None):
+        """DataFrame of bills due within the given number of days, soonest first."""
+        _, issuers, dates, days_until = self.due_slice(days, today)
+        return pd.DataFrame({
+            "Issuer": issuers,
+            "Bill Date": [d.item() for d in dates],
+            "Days Until Due": days_until,
+        })
+
+    # -------- PER-ISSUER QUERIES -------- #
+    def issuer_dates(self, issuer):
+        """Sorted unique bill dates for one issuer."""
+        positions = self._by_issuer.get(issuer)
+        if positions is None:
+            return np.array([], dtype="datetime64[D]")
+        return np.unique(self.dates[positions])
+
+    def upcoming_for_issuer(self, issuer, today=None):
+        """Sorted unique bill dates for one issuer that fall after today."""
+        today = today or date.today()
+        dates = self.issuer_dates(issuer)
+        return dates[np.searchsorted(dates, np.datetime64(today, "D"), side="right"):]
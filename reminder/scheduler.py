@@ -0,0 +1,343 @@
+"""Heap-based scheduler that fires reminders ahead of bill due dates."""
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from datetime import time as clock
+
+from reminder.normalize import BILL_DATE_COLUMNS, normalize_records
+
+Reminder = namedtuple("Reminder", "record_id issuer email column bill_date fire_at")
+
+# Re-check at least this often so clock jumps and DST changes are picked up.
+MAX_SLEEP_SECONDS = 3600
+RETRY_SECONDS = 60
+
+
+class NotifyError(Exception):
+    """Raised by ``notify`` when only some reminders went out.
+
+    ``reminders`` are the ones to retry; they may carry a narrowed ``email``
+    (only the addresses that failed).
+    """
+
+    def __init__(self, message, reminders):
+        super().__init__(message)
+        self.reminders = list(reminders)
+
+
+def _key(reminder):
+    return reminder.record_id, reminder.column, reminder.bill_date
+
+
+class ReminderScheduler:
+    """Priority queue of bill reminders, keyed by fire time.
+
+    Every future ``Bill Date N`` becomes one heap entry firing ``lead_days``
+    before the bill at ``fire_time`` (in ``tz``). ``notify(reminders)``
+    receives all reminders that came due together; if it raises, they are
+    retried after ``RETRY_SECONDS`` (only ``NotifyError.reminders`` when it
+    raises that).
+
+    Record changes are applied with ``upsert``/``remove``: the record's old
+    heap entries are invalidated by bumping its generation (lazy deletion)
+    and only its new events are pushed, so nothing is rescanned. The time
+    of the last fired batch is persisted to ``state_path``; after a restart,
+    events at or before it are not fired again.
+    """
+
+    def __init__(self, notify, lead_days=7, fire_time=clock(9, 0), tz=None, state_path=None):
+        self.notify = notify
+        self.lead = timedelta(days=lead_days)
+        self.fire_time = fire_time
+        self.tz = tz
+        self.state_path = state_path
+
+        self._heap = []  # (fire timestamp, seq, record id, generation, reminder)
+        self._seq = itertools.count()
+        self._generation = {}
+        self._known = {}  # record id -> {(column, bill date)} scheduled or already fired
+        self._pending = {}  # record id -> live heap entries
+        self._stale = 0
+        self._fire_times = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._held_through = None  # delivered past a failed entry; see _fired
+
+        self.fired_through = self._load_cursor()
+        self.fired_count = 0
+        self.last_fired_at = None
+        self.last_error = None
+
+    # -------- CURSOR -------- #
+    def _load_cursor(self):
+        if self.state_path and os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                return json.load(f).get("fired_through")
+        return None
+
+    def _save_cursor(self, timestamp):
+        self.fired_through = timestamp
+        if not self.state_path:
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp = self.state_path + ".tmp"
+        with open(temp, "w") as f:
+            json.dump({"fired_through": timestamp}, f)
+        os.replace(temp, self.state_path)
+
+    # -------- EVENTS -------- #
+    def _fire_at(self, bill_date):
+        """Fire datetime and timestamp for a bill date (memoized: dates repeat a lot)."""
+        cached = self._fire_times.get(bill_date)
+        if cached is None:
+            fire_at = datetime.combine(bill_date - self.lead, self.fire_time)
+            if hasattr(self.tz, "localize"):
+                fire_at = self.tz.localize(fire_at)
+            else:
+                fire_at = fire_at.replace(tzinfo=self.tz)
+            cached = self._fire_times[bill_date] = (fire_at, fire_at.timestamp())
+        return cached
+
+    def _today(self):
+        return datetime.now(self.tz).date()
+
+    def _reminders(self, airtable_records):
+        """(record id, [(fire timestamp, Reminder), ...]) for each record's future bill dates."""
+        today = self._today()
+        normalized = normalize_records(airtable_records, ["Issuer", "Email ID"] + BILL_DATE_COLUMNS)
+        for record, fields in zip(airtable_records, normalized):
+            reminders = []
+            for column in BILL_DATE_COLUMNS:
+                value = fields.get(column)
+                if not value:
+                    continue
+                try:
+                    bill_date = date.fromisoformat(value)
+                except ValueError:
+                    continue
+                if bill_date >= today:
+                    fire_at, timestamp = self._fire_at(bill_date)
+                    reminders.append((timestamp, Reminder(
+                        record["id"], fields["Issuer"], fields["Email ID"], column, bill_date, fire_at
+                    )))
+            yield record["id"], reminders
+
+    def _schedule(self, record_id, reminders, previous=None):
+        """Queue a record's reminders under a new generation (caller holds the lock).
+
+        Events at or before the cursor have already fired and are dropped,
+        unless the record did not have them before (``previous``), e.g. a
+        bill added inside the lead time. ``previous=None`` treats every event
+        as known, as after a restart.
+        """
+        self._stale += self._pending.get(record_id, 0)
+        generation = self._generation.get(record_id, 0) + 1
+        self._generation[record_id] = generation
+        self._known[record_id] = set()
+        entries = []
+        for timestamp, reminder in reminders:
+            key = (reminder.column, reminder.bill_date)
+            self._known[record_id].add(key)
+            if self.fired_through is not None and timestamp <= self.fired_through \
+                    and (previous is None or key in previous):
+                continue
+            entries.append((timestamp, next(self._seq), record_id, generation, reminder))
+        self._pending[record_id] = len(entries)
+        return entries
+
+    def load(self, airtable_records):
+        """Replace the whole schedule (one heapify, used at start-up)."""
+        with self._cond:
+            self._heap, self._generation, self._known, self._pending = [], {}, {}, {}
+            self._stale = 0
+            for record_id, reminders in self._reminders(airtable_records):
+                self._heap.extend(self._schedule(record_id, reminders))
+            heapq.heapify(self._heap)
+            self._cond.notify_all()
+
+    def upsert(self, airtable_records):
+        """Reschedule only the given (changed or new) records."""
+        with self._cond:
+            for record_id, reminders in self._reminders(list(airtable_records)):
+                previous = self._known.get(record_id, set())
+                for entry in self._schedule(record_id, reminders, previous):
+                    heapq.heappush(self._heap, entry)
+            self._compact()
+            self._cond.notify_all()
+
+    def remove(self, record_ids):
+        """Drop every pending reminder of the given records."""
+        with self._cond:
+            for record_id in record_ids:
+                if record_id in self._generation:
+                    self._stale += self._pending.pop(record_id, 0)
+                    self._known.pop(record_id, None)
+                    self._generation[record_id] += 1
+            self._compact()
+            self._cond.notify_all()
+
+    def _compact(self):
+        """Rebuild the heap once invalidated entries outnumber live ones."""
+        if self._stale > len(self._heap) // 2:
+            self._heap = [e for e in self._heap if self._generation.get(e[2]) == e[3]]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap) - self._stale
+
+    def next_fire_time(self):
+        """Timestamp of the next live reminder, or None."""
+        with self._cond:
+            self._drop_stale_head()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale_head(self):
+        while self._heap and self._generation.get(self._heap[0][2]) != self._heap[0][3]:
+            heapq.heappop(self._heap)
+            self._stale -= 1
+
+    # -------- FIRING -------- #
+    def run_pending(self, now=None):
+        """Fire every reminder due at ``now`` (a timestamp); returns them."""
+        now = time.time() if now is None else now
+        due = []
+        with self._cond:
+            self._drop_stale_head()
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if self._generation.get(entry[2]) == entry[3]:
+                    due.append(entry)
+                    self._pending[entry[2]] -= 1
+                else:
+                    self._stale -= 1
+        if not due:
+            return []
+        try:
+            self.notify([entry[4] for entry in due])
+        except NotifyError as e:
+            retry = {_key(r): r for r in e.reminders}
+            failed = [entry[:4] + (retry[_key(entry[4])],) for entry in due if _key(entry[4]) in retry]
+            self._requeue(failed)
+            self._fired([entry for entry in due if _key(entry[4]) not in retry], failed)
+            raise
+        except Exception:
+            self._requeue(due)
+            raise
+        self._fired(due)
+        return [entry[4] for entry in due]
+
+    def _requeue(self, entries):
+        with self._cond:
+            for entry in entries:
+                if self._generation.get(entry[2]) == entry[3]:
+                    self._pending[entry[2]] += 1
+                    heapq.heappush(self._heap, entry)
+
+    def _fired(self, entries, failed=()):
+        """Count delivered entries and move the cursor past them.
+
+        The cursor stays below the earliest ``failed`` entry, so a restart
+        before the retry succeeds fires it again (and may repeat digests that
+        share its fire time) rather than losing it. Delivered entries held
+        back that way move it once a batch goes out in full.
+        """
+        if not entries:
+            return
+        limit = min((entry[0] for entry in failed), default=None)
+        through = [entry[0] for entry in entries if limit is None or entry[0] < limit]
+        held = [entry[0] for entry in entries if limit is not None and entry[0] >= limit]
+        if limit is None and self._held_through is not None:
+            through.append(self._held_through)
+            self._held_through = None
+        elif held:
+            self._held_through = max(held + [self._held_through or held[0]])
+        if through:
+            self._save_cursor(max(through))
+        self.fired_count += len(entries)
+        self.last_fired_at = time.time()
+
+    # -------- WORKER -------- #
+    def start(self, initial=None, backfill=None):
+        """Run the scheduler on a daemon thread (idempotent) and return self.
+
+        ``initial()``, if given, returns the Airtable records to ``load`` on
+        that thread before the first wait, keeping start-up off the caller.
+        ``backfill()``, if given, then runs on a thread of its own to fetch
+        data the initial records lacked; it reports changes through
+        ``upsert``. Either is retried with exponential backoff (from
+        ``RETRY_SECONDS`` up to ``MAX_SLEEP_SECONDS``) until it succeeds.
+        """
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, args=(initial, backfill), name="reminder-scheduler", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _retry(self, step):
+        """Run ``step()``, retrying with backoff; False if stopped first."""
+        delay, error = RETRY_SECONDS, None
+        while True:
+            try:
+                step()
+                if error is not None and self.last_error is error:
+                    self.last_error = None  # leave errors from firing in place
+                return True
+            except Exception as e:
+                self.last_error = error = e
+            if not self._pause(delay):
+                return False
+            delay = min(delay * 2, MAX_SLEEP_SECONDS)
+
+    def _pause(self, seconds):
+        """Wait ``seconds`` unless stopped first; False if stopped.
+
+        Schedule changes notify the same condition, so this keeps waiting
+        until the deadline instead of retrying on every upsert.
+        """
+        deadline = time.time() + seconds
+        with self._cond:
+            while not self._stopped and time.time() < deadline:
+                self._cond.wait(deadline - time.time())
+            return not self._stopped
+
+    def _run(self, initial, backfill):
+        if initial is not None and not self._retry(lambda: self.load(initial())):
+            return
+        if backfill is not None:
+            threading.Thread(
+                target=self._retry, args=(backfill,), name="reminder-backfill", daemon=True
+            ).start()
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                self._drop_stale_head()
+                delay = self._heap[0][0] - time.time() if self._heap else MAX_SLEEP_SECONDS
+                if delay > 0:
+                    # Woken early by upsert/remove/stop when the schedule changes.
+                    self._cond.wait(min(delay, MAX_SLEEP_SECONDS))
+                    continue
+            try:
+                self.run_pending()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                if not self._pause(RETRY_SECONDS):
+                    return
@@ -0,0 +1,102 @@
+"""Local SMTP server that accepts and keeps every message (an aiosmtpd-style sink)."""
+import socketserver
+import threading
+from email import message_from_bytes
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        sink = self.server.sink
+        with sink.lock:
+            sink.connections += 1
+        if sink.connect_delay:
+            sink.delay_event.wait(sink.connect_delay)
+        self.reply("220 localhost SMTP sink ready")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif verb == "HELO":
+                self.reply("250 localhost")
+            elif verb == "AUTH":
+                with sink.lock:
+                    sink.logins += 1
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip().strip("<>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                if sink.delay:
+                    sink.delay_event.wait(sink.delay)
+                with sink.lock:
+                    sink.messages.append((sender, recipients, message_from_bytes(b"".join(lines))))
+                self.reply("250 OK: queued")
+                sender, recipients = None, []
+            elif verb == "RSET":
+                sender, recipients = None, []
+                self.reply("250 OK")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPSink:
+    """Threaded SMTP server on localhost for exercising the mailer without a real relay.
+
+    Accepts any login, stores ``(sender, recipients, message)`` in
+    ``messages`` and counts ``connections`` and ``logins``. It does not speak
+    STARTTLS, so connect with ``SMTPPool(..., starttls=False)``. ``delay``
+    (per message) and ``connect_delay`` (per connection, standing in for the
+    TLS handshake and login) mimic a remote relay.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0, connect_delay=0.0):
+        self.messages = []
+        self.connections = 0
+        self.logins = 0
+        self.delay = delay
+        self.connect_delay = connect_delay
+        self.delay_event = threading.Event()
+        self.lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.sink = self
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
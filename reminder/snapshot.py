@@ -0,0 +1,122 @@
+"""Memory-mapped Arrow snapshot of the normalized dataset, for instant restarts."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from reminder.dataset import Dataset
+from reminder.normalize import BILL_DATE_COUNT, CORE_COLUMNS
+from reminder.table import TABLE_COLUMNS, RecordTable
+
+try:
+    import pyarrow as pa
+except ImportError:  # snapshots are skipped without pyarrow
+    pa = None
+
+FORMAT = "3"
+
+# Few distinct values, so they are stored dictionary-encoded.
+DICTIONARY_COLUMNS = {"Depository", "Issuer", "Status", "Company Referred By"}
+
+# The bill-date matrix, one fixed-size list of int64 day numbers (NaT included) per row.
+BILL_DATES_COLUMN = "Bill Dates"
+
+
+def _record_table(table):
+    """``RecordTable`` of the core columns, converted column by column.
+
+    Text columns become ``string`` arrays over the mapped Arrow buffers and
+    dictionary columns become categoricals, with categories sorted as
+    ``RecordTable`` builds them.
+    """
+    strings = {pa.string(): pd.StringDtype(), pa.large_string(): pd.StringDtype()}
+    frame = table.select(TABLE_COLUMNS).to_pandas(types_mapper=strings.get)
+    for name in DICTIONARY_COLUMNS:
+        categories = frame[name].cat.categories
+        if not categories.is_monotonic_increasing:
+            frame[name] = frame[name].cat.reorder_categories(categories.sort_values())
+    return RecordTable.from_frame(frame)
+
+
+def _bill_dates(column):
+    """The bill-date matrix stored in ``column``, viewing the mapped file when it is one chunk."""
+    chunks = [chunk.flatten().to_numpy() for chunk in column.chunks]
+    days = chunks[0] if len(chunks) == 1 else np.concatenate(chunks or [np.array([], dtype=np.int64)])
+    return days.view("datetime64[D]").reshape(-1, BILL_DATE_COUNT)
+
+
+def save_snapshot(dataset, path, mirror_id):
+    """Write ``dataset`` to ``path`` as an uncompressed Arrow IPC (Feather v2) file.
+
+    The bill-date block is included once it is loaded
+    (``Dataset.bill_dates_ready``). The file is replaced atomically, so processes that still map
+    the previous one keep reading it. Returns whether the block was written,
+    or None without pyarrow.
+    """
+    if pa is None:
+        return None
+    import pyarrow.feather as feather
+
+    frame = dataset.table().frame
+
+    def column(name):
+        values = frame[name]
+        if name in DICTIONARY_COLUMNS:  # the categorical's codes and categories as they are
+            return pa.DictionaryArray.from_arrays(
+                values.cat.codes.to_numpy().astype(np.int32), pa.array(values.cat.categories.tolist(), type=pa.string())
+            )
+        return pa.array(values, type=pa.float64() if name == "Amount" else pa.string())
+
+    columns = {name: column(name) for name in CORE_COLUMNS}
+    columns["Record ID"] = pa.array(dataset.ids, type=pa.string())
+    with_bills = dataset.bill_dates_ready()
+    if with_bills:
+        days = pa.array(np.ascontiguousarray(dataset.bill_dates()).view(np.int64).ravel())
+        columns[BILL_DATES_COLUMN] = pa.FixedSizeListArray.from_arrays(days, BILL_DATE_COUNT)
+
+    table = pa.table(columns).replace_schema_metadata({
+        "reminder_snapshot": FORMAT,
+        "mirror_id": mirror_id or "",
+        "version": str(dataset.version),
+        "has_bill_dates": "1" if dataset.has_bill_dates else "0",
+        "bill_block": "1" if with_bills else "0",
+    })
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    # One record batch, so the bill-date matrix reads back as a single view.
+    feather.write_feather(table, tmp, compression="uncompressed", chunksize=max(len(dataset), 1))
+    os.replace(tmp, path)
+    return with_bills
+
+
+def load_snapshot(path, mirror_id=None, bill_reader=None):
+    """Dataset read from a snapshot file, or None (missing, unreadable, other format or mirror).
+
+    The file is memory-mapped: the text columns and the bill-date matrix stay
+    in the mapping, which processes on the same host share through the page
+    cache; the matrix is a read-only view. Without a stored bill-date block,
+    ``bill_reader(ids)`` (see ``Dataset``) reads it when first needed.
+    """
+    if pa is None or not os.path.exists(path):
+        return None
+    try:
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    except (OSError, pa.ArrowException):
+        return None
+    meta = {key.decode(): value.decode() for key, value in (table.schema.metadata or {}).items()}
+    if meta.get("reminder_snapshot") != FORMAT or (mirror_id and meta.get("mirror_id") != mirror_id):
+        return None
+
+    bill_loader = None
+    if meta.get("bill_block") == "1":
+        bill_loader = lambda: _bill_dates(table.column(BILL_DATES_COLUMN))
+    return Dataset.from_normalized(
+        _record_table(table),
+        version=int(meta["version"]),
+        # Without the block or a reader, the bill dates could not be read back.
+        has_bill_dates=meta.get("has_bill_dates") == "1" and (bill_loader or bill_reader) is not None,
+        bill_loader=bill_loader,
+        bill_reader=bill_reader,
+    )
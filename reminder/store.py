@@ -0,0 +1,117 @@
+"""Process-wide dataset holder with a stale-while-revalidate background refresh."""
+import threading
+import time
+
+
+class DatasetStore:
+    """Holds the latest good dataset snapshot and refreshes it off the request path.
+
+    ``loader(previous)`` builds a new snapshot; it may return ``previous`` when
+    nothing changed. Readers get the current snapshot immediately and only
+    wait for the very first load. A failed refresh keeps the last good
+    snapshot and records the error.
+
+    Write-through patches (``update``) never wait on a refresh: they replace
+    the current snapshot at once and are replayed on the snapshot the
+    refresh under way installs, since it may have been built before them.
+    """
+
+    def __init__(self, loader, interval=120):
+        self._loader = loader
+        self.interval = interval
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pending = None  # patches made while a refresh runs, else None
+
+        self.loaded_at = None
+        self.last_refresh_duration = None
+        self.last_error = None
+        self.refresh_count = 0
+
+    def start(self):
+        """Start the background refresh thread (idempotent) and return self."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="dataset-refresher", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            self.refresh()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def refresh(self):
+        """Load a new snapshot now, in the calling thread."""
+        with self._refresh_lock:
+            started = time.monotonic()
+            with self._lock:
+                self._pending = []
+                previous = self._snapshot
+            snapshot, error = None, None
+            try:
+                snapshot = self._loader(previous)
+            except Exception as e:
+                error = e
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if error is None:
+                    try:
+                        for patch in pending:
+                            snapshot = patch(snapshot)
+                    except Exception as e:
+                        error = e
+                if error is None:
+                    self._snapshot = snapshot
+                    self.loaded_at = time.time()
+                self.last_error = error
+                self.last_refresh_duration = time.monotonic() - started
+                self.refresh_count += 1
+            self._ready.set()
+
+    def update(self, patch):
+        """Replace the snapshot with ``patch(snapshot)`` (used for write-through).
+
+        Does not wait for a refresh in progress; ``patch`` is applied again to
+        the snapshot that refresh produces, so it must be idempotent. Returns
+        the new snapshot, or None before the first load (which then reads the
+        written data itself).
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None:
+                snapshot = self._snapshot = patch(snapshot)
+            if self._pending is not None:
+                self._pending.append(patch)
+            return snapshot
+
+    def request_refresh(self):
+        """Ask the background thread to refresh as soon as possible."""
+        self.start()
+        self._wake.set()
+
+    def get(self, timeout=None):
+        """Return the current snapshot, waiting only for the first load."""
+        self.start()
+        if self._snapshot is None:
+            self._ready.wait(timeout)
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise self.last_error or TimeoutError("Dataset is still warming up")
+        return snapshot
+
+    @property
+    def ready(self):
+        return self._snapshot is not None
+
+    @property
+    def age(self):
+        """Seconds since the current snapshot was loaded, or None."""
+        return None if self.loaded_at is None else time.time() - self.loaded_at
@@ -0,0 +1,113 @@
+"""Synthetic Airtable payloads shaped like the production base, for benchmarks and local runs."""
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from reminder.normalize import BILL_DATE_COUNT
+
+_NAME_PARTS = [
+    "Shree", "Bharat", "Indo", "Sai", "Om", "Ganesh", "Apex", "Zenith", "Vardhman", "Sun",
+    "Lotus", "Pioneer", "Kaveri", "Himalaya", "Tata", "Galaxy", "Everest", "Prime", "Aditya", "Nova",
+]
+_NAME_SECTORS = [
+    "Infra", "Finance", "Textiles", "Pharma", "Steels", "Agro", "Realty", "Capital", "Foods", "Power",
+    "Chemicals", "Motors", "Logistics", "Securities", "Housing", "Ventures",
+]
+_NAME_SUFFIXES = ["Limited", "Private Limited", "Ltd", "Pvt. Ltd.", "LLP"]
+_CITIES = ["Mumbai", "Delhi", "Pune", "Ahmedabad", "Chennai", "Kolkata", "Bengaluru", "Jaipur", "Indore", "Surat"]
+_STATUSES = ["Active", "Pending", "Closed", "active", "Pending ", "On Hold", ""]
+_STATUS_WEIGHTS = [40, 25, 20, 3, 3, 4, 5]
+_REFERRERS = ["", "", "", "Direct", "CA Sharma", "Website", "Existing client"]
+_ISIN_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _issuer_names(count, rng):
+    names = set()
+    while len(names) < count:
+        name = f"{rng.choice(_NAME_PARTS)} {rng.choice(_NAME_SECTORS)} {rng.choice(_NAME_SUFFIXES)}"
+        if len(names) >= len(_NAME_PARTS) * len(_NAME_SECTORS):
+            name = f"{name} {len(names)}"
+        names.add(name)
+    return sorted(names)
+
+
+def _date_string(day, rng):
+    """One bill date in a format seen in the base (mostly ISO, some typed by hand)."""
+    roll = rng.random()
+    if roll < 0.55:
+        return day.isoformat()
+    if roll < 0.75:
+        return f"{day.day:02d}/{day.month:02d}/{day.year}"
+    if roll < 0.85:
+        return f"{day.day}/{day.month}/{day.year}"
+    if roll < 0.93:
+        return f"{day.day:02d}-{day.month:02d}-{day.year}"
+    if roll < 0.98:
+        return f"{day.isoformat()}T00:00:00.000Z"
+    return rng.choice(["TBD", "N/A", "due soon"])
+
+
+def _amount(rng):
+    roll = rng.random()
+    if roll < 0.6:
+        return rng.choice([1500, 2500, 5000, 7500, 10000, 25000])
+    if roll < 0.8:
+        return f"{rng.randint(500, 50000)}.{rng.randint(0, 99):02d}"
+    if roll < 0.95:
+        return 0
+    return rng.choice(["", "N/A"])
+
+
+def make_records(count, seed=0, issuers=None, mean_bill_dates=8, today=None):
+    """Build ``count`` Airtable records like ``Table.all()`` returns.
+
+    Issuers repeat with a skewed distribution (about one per six records by
+    default, a few very large), the 72 bill-date columns are sparse (about
+    ``mean_bill_dates`` per record, a few full), and dates come in the mixed
+    formats the batch normalizer has to handle. Records are in creation order.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    names = _issuer_names(issuers or max(10, count // 6), rng)
+    weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(names))]
+    chosen = rng.choices(names, weights=weights, k=count)
+    created = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    step = timedelta(days=3 * 365) / max(count, 1)
+
+    records = []
+    for i, issuer in enumerate(chosen):
+        fields = {
+            "Depository": rng.choices(["NSDL", "CDSL", ""], weights=[55, 40, 5])[0],
+            "ISIN": "INE" + "".join(rng.choice(_ISIN_CHARS) for _ in range(9)),
+            "Issuer": issuer if rng.random() > 0.02 else f" {issuer} ",
+            "Status": rng.choices(_STATUSES, weights=_STATUS_WEIGHTS)[0],
+            "No of ISIN": rng.randint(1, 5),
+            "ISIN allotment date": _date_string(today - timedelta(days=rng.randint(30, 2000)), rng),
+            "GSTIN": f"{rng.randint(1, 37):02d}AAAC{rng.randint(1000, 9999)}A1Z{rng.randint(1, 9)}",
+            "Address": f"{rng.randint(1, 300)}, {rng.choice(_NAME_PARTS)} Nagar, {rng.choice(_CITIES)}",
+            "Email ID": (
+                f"accounts{i % 97}@example.com" if rng.random() > 0.1
+                else f"cfo{i % 13}@example.com; accounts{i % 97}@example.com"
+            ),
+            "Company Referred By": rng.choice(_REFERRERS),
+            "Amount": _amount(rng),
+        }
+        if rng.random() < 0.65:
+            fields["ARN if ISIN NA (NSDL)"] = f"ARN{rng.randint(100000, 999999)}"
+        if rng.random() < 0.5:
+            fields["Company Link"] = f"https://example.com/company/{i}"
+
+        # Monthly to yearly bills around today, some columns left blank.
+        bill_count = min(BILL_DATE_COUNT, int(rng.expovariate(1 / mean_bill_dates)) if mean_bill_dates else 0)
+        day = today - timedelta(days=rng.randint(0, 720))
+        interval = rng.choice([30, 90, 180, 365])
+        for column in range(1, bill_count + 1):
+            if rng.random() > 0.1:
+                fields[f"Bill Date {column}"] = _date_string(day, rng)
+            day += timedelta(days=interval)
+
+        records.append({
+            "id": f"rec{i:014d}",
+            "createdTime": (created + step * i).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            "fields": {k: v for k, v in fields.items() if v != ""},
+        })
+    return records
@@ -0,0 +1,93 @@
+"""Typed column store of the core records, built once per data version."""
+import numpy as np
+import pandas as pd
+
+from reminder.normalize import CORE_COLUMNS
+
+# Few distinct values, so one small integer code per row instead of a string.
+CATEGORY_COLUMNS = ["Depository", "Issuer", "Status", "Company Referred By"]
+TABLE_COLUMNS = CORE_COLUMNS + ["Record ID"]
+
+
+def _column(name, values):
+    if name in CATEGORY_COLUMNS:
+        return pd.Categorical(values)
+    if name == "Amount":
+        return np.array(values, dtype=float)
+    return pd.array(values, dtype="string")
+
+
+def _merged_categorical(old, new, order):
+    """Categorical of ``old`` followed by ``new`` taken at ``order``, with sorted, used categories only."""
+    categories = old.categories.union(new.categories) if len(old.categories) else new.categories
+    codes = []
+    for part in (old, new):
+        if part.categories.equals(categories):
+            codes.append(np.asarray(part.codes))
+        else:
+            codes.append(categories.get_indexer(part.categories)[part.codes])
+    codes = np.concatenate(codes)[order]
+    used = np.bincount(codes, minlength=len(categories)) > 0
+    if not used.all():  # a deleted or edited row held the last use of a value
+        codes = (np.cumsum(used) - 1)[codes]
+        categories = categories[used]
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+class RecordTable:
+    """The core columns of a dataset's records as one typed DataFrame.
+
+    Depository, Issuer, Status and Company Referred By are categoricals with
+    sorted categories, Amount is float64 and the other text columns use the
+    ``string`` dtype. Rows are in dataset order, so ``Dataset.row_of``
+    positions index it directly. Pages read columns of ``frame`` as they are,
+    or ``take`` only the rows they show; ``row`` builds one record dict when a
+    form needs it.
+    """
+
+    def __init__(self, records):
+        columns = {name: _column(name, [record[name] for record in records]) for name in TABLE_COLUMNS}
+        self.frame = pd.DataFrame(columns, columns=TABLE_COLUMNS)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Wrap a DataFrame that already has the ``TABLE_COLUMNS`` dtypes."""
+        new = cls.__new__(cls)
+        new.frame = frame
+        return new
+
+    def __len__(self):
+        return len(self.frame)
+
+    def row(self, position):
+        """Record dict of one row position, with Python values."""
+        record = {name: self.frame[name].iat[position] for name in TABLE_COLUMNS}
+        record["Amount"] = float(record["Amount"])
+        return record
+
+    def take(self, rows):
+        """DataFrame of the given row positions, in that order."""
+        return self.frame.take(rows).reset_index(drop=True)
+
+    def issuers(self, rows):
+        """Issuer of each given row position, as an object array."""
+        issuer = self.frame["Issuer"].cat
+        return np.asarray(issuer.categories, dtype=object)[issuer.codes.to_numpy()[rows]]
+
+    def patched(self, source, records):
+        """Table whose row ``i`` is row ``source[i]`` of this table, or of ``records`` past its end.
+
+        Each column is one concatenation and one take (categoricals work on
+        their codes), so a write-through copies the columns instead of
+        rebuilding them from record dicts.
+        """
+        order = np.asarray(source, dtype=np.intp)
+        extra = RecordTable(records).frame
+        columns = {}
+        for name in TABLE_COLUMNS:
+            old, new = self.frame[name], extra[name]
+            if name in CATEGORY_COLUMNS:
+                columns[name] = _merged_categorical(old.array, new.array, order)
+            else:
+                columns[name] = pd.concat([old, new], ignore_index=True).take(order).array
+        return RecordTable.from_frame(pd.DataFrame(columns, columns=TABLE_COLUMNS))
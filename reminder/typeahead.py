@@ -0,0 +1,42 @@
+"""Sorted prefix index serving typeahead suggestions by binary search."""
+import bisect
+
+# Sorts after any character a key can continue with, so [key, key + _END) spans every key with that prefix.
+_END = "\U0010ffff"
+
+
+class PrefixIndex:
+    """Case-insensitive prefix lookups over a fixed set of values (e.g. issuers and ISINs).
+
+    The values are sorted once, when the index is built for a data version.
+    ``count`` costs two bisects and ``suggest`` a bisect plus ``limit``
+    items, so neither grows with the table.
+    """
+
+    def __init__(self, values):
+        entries = sorted({(value.strip().casefold(), value) for value in values if value and value.strip()})
+        self._keys = [key for key, _ in entries]
+        self._values = [value for _, value in entries]
+
+    def __len__(self):
+        return len(self._values)
+
+    def _range(self, prefix):
+        key = prefix.strip().casefold()
+        lo = bisect.bisect_left(self._keys, key)
+        return lo, bisect.bisect_left(self._keys, key + _END, lo)
+
+    def count(self, prefix):
+        """Number of values starting with ``prefix``."""
+        lo, hi = self._range(prefix)
+        return hi - lo
+
+    def suggest(self, prefix, limit=50):
+        """Up to ``limit`` values starting with ``prefix``, in alphabetical order."""
+        lo, hi = self._range(prefix)
+        return self._values[lo:min(hi, lo + limit)]
+
+    def matches(self, prefix):
+        """Every value starting with ``prefix``."""
+        lo, hi = self._range(prefix)
+        return self._values[lo:hi]
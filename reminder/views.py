@@ -0,0 +1,51 @@
+"""Data behind the Database page, computed without Streamlit."""
+from reminder.typeahead import PrefixIndex
+
+PAGE_SIZES = [25, 50, 100]
+
+
+class SearchIndex:
+    """Typeahead indexes for one dataset version: issuers alone, ISINs alone, and both."""
+
+    def __init__(self, dataset):
+        self.issuers = PrefixIndex(dataset.by_issuer)
+        self.isins = PrefixIndex(dataset.by_isin)
+        self.any = PrefixIndex(list(dataset.by_issuer) + list(dataset.by_isin))
+
+
+def select_ids(dataset, index, query="", selection=None):
+    """Ids of the records to list, in table order.
+
+    ``selection`` (an exact Issuer or ISIN) wins over ``query``, which keeps
+    records whose Issuer or ISIN starts with it; with neither, every record.
+    """
+    if selection is not None:
+        return dataset.ids_for(selection)
+    if not query.strip():
+        return dataset.ids
+    ids = set()
+    for value in index.matches(query):
+        ids.update(dataset.by_issuer.get(value, ()))
+        ids.update(dataset.by_isin.get(value, ()))
+    return sorted(ids, key=dataset.row_of.__getitem__)
+
+
+def closest_ids(dataset, fuzzy, query, limit=100):
+    """Ids of the records best matching ``query`` in a FuzzyIndex, best first.
+
+    Hits the dataset does not hold yet (the index follows the mirror) are skipped.
+    """
+    return [hit.record_id for hit in fuzzy.search(query, limit) if hit.record_id in dataset.row_of]
+
+
+def page_count(total, page_size):
+    return max(1, -(-total // page_size))
+
+
+def page_frame(dataset, ids, page, page_size):
+    """DataFrame of one page (1-based) of ``ids``, with Amount formatted for display."""
+    start = (page - 1) * page_size
+    df = dataset.table().take([dataset.row_of[record_id] for record_id in ids[start:start + page_size]])
+    df["Amount"] = [f"₹{x:,.2f}" if x > 0 else "₹0.00" for x in df["Amount"]]
+    return df
+
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+
+from reminder.scheduler import NotifyError, ReminderScheduler
+
+
+def record(record_id, *bill_dates, email="accounts@example.com"):
+    fields = {"Issuer": f"Issuer {record_id}", "Email ID": email}
+    for n, bill_date in enumerate(bill_dates, start=1):
+        fields[f"Bill Date {n}"] = bill_date.isoformat()
+    return {"id": record_id, "fields": fields}
+
+
+class ReminderSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.state_path = os.path.join(tempfile.mkdtemp(), "scheduler_state.json")
+        self.today = date.today()
+        self.due = self.today + timedelta(days=3)  # fire time (7 days ahead) already passed
+        self.later = self.today + timedelta(days=30)
+        self.sent = []
+
+    def scheduler(self, notify=None):
+        return ReminderScheduler(notify or self.sent.extend, lead_days=7, state_path=self.state_path)
+
+    def test_cursor_survives_restart(self):
+        records = [record("rec1", self.due, self.later), record("rec2", self.due)]
+        scheduler = self.scheduler()
+        scheduler.load(records)
+        fired = scheduler.run_pending()
+        self.assertEqual({(r.record_id, r.bill_date) for r in fired}, {("rec1", self.due), ("rec2", self.due)})
+
+        restarted = self.scheduler()
+        self.assertEqual(restarted.fired_through, scheduler.fired_through)
+        restarted.load(records)
+        self.assertEqual(restarted.run_pending(), [])
+        self.assertEqual(len(restarted), 1)  # only rec1's later bill is left
+
+    def test_upsert_drops_fired_events(self):
+        scheduler = self.scheduler()
+        scheduler.load([record("rec1", self.due, self.later)])
+        self.assertEqual(len(scheduler.run_pending()), 1)
+
+        # An unrelated edit re-sends the record with the same bill dates.
+        scheduler.upsert([record("rec1", self.due, self.later, email="new@example.com")])
+        self.assertEqual(scheduler.run_pending(), [])
+        self.assertEqual(len(scheduler), 1)
+
+        # A bill added inside the lead time was never fired, so it still is.
+        added = self.today + timedelta(days=2)
+        scheduler.upsert([record("rec1", self.due, self.later, added)])
+        self.assertEqual([r.bill_date for r in scheduler.run_pending()], [added])
+
+    def test_partial_failure_requeues_only_failed(self):
+        attempts = []
+
+        def notify(reminders):
+            attempts.append(reminders)
+            if len(attempts) == 1:
+                raise NotifyError("one digest failed", [r for r in reminders if r.record_id == "rec2"])
+
+        scheduler = self.scheduler(notify)
+        scheduler.load([record("rec1", self.due), record("rec2", self.due)])
+        with self.assertRaises(NotifyError):
+            scheduler.run_pending()
+        self.assertEqual(len(scheduler), 1)
+        self.assertEqual([r.record_id for r in scheduler.run_pending()], ["rec2"])
+
+    def test_stop_interrupts_retry_wait(self):
+        failed = threading.Event()
+
+        def notify(reminders):
+            failed.set()
+            raise RuntimeError("SMTP down")
+
+        scheduler = self.scheduler(notify)
+        scheduler.start(lambda: [record("rec1", self.due)])
+        self.assertTrue(failed.wait(5))
+        started = time.time()
+        scheduler.stop()
+        scheduler._thread.join(5)
+        self.assertFalse(scheduler._thread.is_alive())
+        self.assertLess(time.time() - started, 5)
+        self.assertIsInstance(scheduler.last_error, RuntimeError)
+
+
+if __name__ == "__main__":
+    unittest.main()